@@ -0,0 +1,52 @@
+"""indexes for hot cart, dish and order queries
+
+Revision ID: 5d2b7e9c4a10
+Revises: e3a5c8f1d6b2
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2b7e9c4a10'
+down_revision: Union[str, Sequence[str], None] = 'e3a5c8f1d6b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (имя, таблица, колонки, условие частичного индекса)
+INDEXES = [
+    # get_current_cart: user_id = ? AND is_current AND status = ?
+    ('ix_carts_user_current', 'carts', ['user_id', 'status'], 'is_current'),
+    # get_carts_by_order, сводки заказа и триггер суммы заказа
+    ('ix_carts_order_status', 'carts', ['delivery_order_id', 'status'], 'delivery_order_id IS NOT NULL'),
+    # История корзин пользователя
+    ('ix_carts_user_created', 'carts', ['user_id', 'created_at'], None),
+    # Блюда категории в меню и настройках: category_id = ? AND is_active ORDER BY display_order
+    ('ix_dishes_active_category_order', 'dishes', ['category_id', 'display_order'], 'is_active'),
+    # Заказы за день для ролей без ограничений, новые сначала
+    ('ix_orders_created_at', 'delivery_orders', ['created_at', 'id'], None),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY не блокирует запись, но не может выполняться в транзакции
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name, table, columns, unique=False,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where) if where else None,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
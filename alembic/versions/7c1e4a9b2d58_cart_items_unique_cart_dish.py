@@ -0,0 +1,37 @@
+"""cart_items unique (cart_id, dish_id)
+
+Revision ID: 7c1e4a9b2d58
+Revises: 0355093e8fe6
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e4a9b2d58'
+down_revision: Union[str, Sequence[str], None] = '0355093e8fe6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Оставляем по одной (последней) строке на пару корзина-блюдо перед созданием ограничения
+    op.execute(
+        """
+        DELETE FROM cart_items AS ci
+        USING cart_items AS newer
+        WHERE ci.cart_id = newer.cart_id
+          AND ci.dish_id = newer.dish_id
+          AND ci.id < newer.id
+        """
+    )
+    op.create_unique_constraint('uq_cart_items_cart_dish', 'cart_items', ['cart_id', 'dish_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_cart_items_cart_dish', 'cart_items', type_='unique')
@@ -0,0 +1,130 @@
+"""incremental cart and order totals
+
+Revision ID: b42f9d6e1a73
+Revises: 7c1e4a9b2d58
+Create Date: 2026-10-17 12:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b42f9d6e1a73'
+down_revision: Union[str, Sequence[str], None] = '7c1e4a9b2d58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Пересчитываем суммы один раз, дальше их поддерживают триггеры
+    op.execute(
+        """
+        UPDATE carts AS c
+        SET total_price = COALESCE(
+            (SELECT SUM(ci.amount * ci.price_at_time) FROM cart_items AS ci WHERE ci.cart_id = c.id), 0
+        )
+        """
+    )
+    op.execute(
+        """
+        UPDATE delivery_orders AS o
+        SET total_amount = COALESCE(
+            (SELECT SUM(c.total_price) FROM carts AS c
+             WHERE c.delivery_order_id = o.id AND c.status = 'ORDERED'), 0
+        )
+        """
+    )
+
+    # Позиция корзины меняет сумму корзины на разницу старой и новой стоимости
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION cart_items_apply_total_delta() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'UPDATE' AND NEW.cart_id = OLD.cart_id THEN
+                IF NEW.amount * NEW.price_at_time <> OLD.amount * OLD.price_at_time THEN
+                    UPDATE carts
+                    SET total_price = COALESCE(total_price, 0)
+                        + NEW.amount * NEW.price_at_time - OLD.amount * OLD.price_at_time
+                    WHERE id = NEW.cart_id;
+                END IF;
+                RETURN NULL;
+            END IF;
+
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE carts
+                SET total_price = COALESCE(total_price, 0) - OLD.amount * OLD.price_at_time
+                WHERE id = OLD.cart_id;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                UPDATE carts
+                SET total_price = COALESCE(total_price, 0) + NEW.amount * NEW.price_at_time
+                WHERE id = NEW.cart_id;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER cart_items_total_delta
+        AFTER INSERT OR DELETE OR UPDATE OF cart_id, amount, price_at_time ON cart_items
+        FOR EACH ROW EXECUTE FUNCTION cart_items_apply_total_delta()
+        """
+    )
+
+    # В сумму заказа входят только корзины в статусе ORDERED, как и при прежнем пересчете
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION carts_apply_order_total_delta() RETURNS trigger AS $$
+        DECLARE
+            old_part double precision := 0;
+            new_part double precision := 0;
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE')
+                AND OLD.status = 'ORDERED' AND OLD.delivery_order_id IS NOT NULL THEN
+                old_part := COALESCE(OLD.total_price, 0);
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE')
+                AND NEW.status = 'ORDERED' AND NEW.delivery_order_id IS NOT NULL THEN
+                new_part := COALESCE(NEW.total_price, 0);
+            END IF;
+
+            IF TG_OP = 'UPDATE' AND NEW.delivery_order_id IS NOT DISTINCT FROM OLD.delivery_order_id THEN
+                IF new_part <> old_part THEN
+                    UPDATE delivery_orders
+                    SET total_amount = total_amount + new_part - old_part
+                    WHERE id = NEW.delivery_order_id;
+                END IF;
+                RETURN NULL;
+            END IF;
+
+            IF old_part <> 0 THEN
+                UPDATE delivery_orders SET total_amount = total_amount - old_part WHERE id = OLD.delivery_order_id;
+            END IF;
+            IF new_part <> 0 THEN
+                UPDATE delivery_orders SET total_amount = total_amount + new_part WHERE id = NEW.delivery_order_id;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER carts_order_total_delta
+        AFTER INSERT OR DELETE OR UPDATE OF total_price, status, delivery_order_id ON carts
+        FOR EACH ROW EXECUTE FUNCTION carts_apply_order_total_delta()
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS carts_order_total_delta ON carts")
+    op.execute("DROP FUNCTION IF EXISTS carts_apply_order_total_delta()")
+    op.execute("DROP TRIGGER IF EXISTS cart_items_total_delta ON cart_items")
+    op.execute("DROP FUNCTION IF EXISTS cart_items_apply_total_delta()")
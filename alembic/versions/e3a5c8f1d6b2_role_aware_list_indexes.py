@@ -0,0 +1,35 @@
+"""indexes for role-aware order and user lists
+
+Revision ID: e3a5c8f1d6b2
+Revises: b42f9d6e1a73
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a5c8f1d6b2'
+down_revision: Union[str, Sequence[str], None] = 'b42f9d6e1a73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Заказы за день, созданные доставщиком: creator_id = ? AND created_at в пределах дня
+    op.create_index('ix_orders_creator_date', 'delivery_orders', ['creator_id', 'created_at'], unique=False)
+    # Списки пользователей по ролям, видимым администратору, в порядке регистрации
+    op.create_index(
+        'ix_users_active_role_created', 'users', ['role', 'created_at'],
+        unique=False, postgresql_where=sa.text('is_active'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_active_role_created', table_name='users')
+    op.drop_index('ix_orders_creator_date', table_name='delivery_orders')
@@ -6,50 +6,66 @@ from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
 from aiogram.filters import ExceptionTypeFilter
 from aiogram.fsm.storage.base import DefaultKeyBuilder
-from aiogram.fsm.storage.redis import RedisStorage
 
-from aiogram_dialog import setup_dialogs
+from aiogram_dialog import BgManagerFactory, setup_dialogs
 from aiogram_dialog.api.entities import DIALOG_EVENT_NAME
 from aiogram_dialog.api.exceptions import UnknownIntent, UnknownState
 from fluentogram import TranslatorHub
 
 from app.bot.dialogs.flows import dialogs
+from app.bot.dialogs.utils.message_manager import message_manager
 from app.bot.first_admin_creation import create_admin
 from app.bot.handlers import routers
 from app.bot.handlers.errors import on_unknown_intent, on_unknown_state
 from app.bot.i18n.translator_hub import create_translator_hub
+from app.bot.middlewares.counter_clicks import CounterClickCoalescingMiddleware
 from app.bot.middlewares.database import DbSessionMiddleware
 from app.bot.middlewares.get_user import GetUserMiddleware
 from app.bot.middlewares.i18n import TranslatorRunnerMiddleware
 from app.bot.middlewares.shadow_ban import ShadowBanMiddleware
+from app.bot.webhook import run_webhook
 
 from app.infrastructure.database.db import async_session_maker
 from app.infrastructure.cache import get_redis_pool
+from app.infrastructure.cache.invalidation import invalidation_bus
+from app.infrastructure.cache.menu_cache import menu_cache
+from app.infrastructure.cache.order_summary_cache import order_summary_cache
+from app.infrastructure.cache.redis_storage import FastRedisStorage
+from app.infrastructure.cache.user_cache import user_cache
+from app.services.scheduler.taskiq_broker import broker
 
-from config.config import get_config
+from config.config import AppConfig, get_config
 
 logger = logging.getLogger(__name__)
 
 
-async def main():
-    config = get_config()
+def create_bot(config: AppConfig) -> Bot:
+    return Bot(token=config.bot.token,
+               default=DefaultBotProperties(parse_mode=ParseMode(config.bot.parse_mode)))
 
-    redis_client: redis.asyncio.Redis = await get_redis_pool(
-        host=config.redis.host,
-        port=config.redis.port,
-        db=config.redis.database,
-        username=config.redis.username,
-        password=config.redis.password,
-    )
 
-    bot = Bot(token=config.bot.token,
-              default=DefaultBotProperties(parse_mode=ParseMode(config.bot.parse_mode)))
+async def start_caches(_cache_pool: redis.asyncio.Redis) -> None:
+    user_cache.setup(_cache_pool)
+    menu_cache.setup(_cache_pool)
+    order_summary_cache.setup(_cache_pool, async_session_maker)
+    message_manager.setup(_cache_pool)
+    await invalidation_bus.start(_cache_pool)
+
+
+async def stop_caches() -> None:
+    await invalidation_bus.stop()
+
 
-    storage = RedisStorage(
+def setup_dispatcher(config: AppConfig, redis_client: redis.asyncio.Redis) -> tuple[Dispatcher, BgManagerFactory]:
+    """Собирает диспетчер с хранилищем, middleware, роутерами и диалогами"""
+    storage = FastRedisStorage(
         redis=redis_client,
         key_builder=DefaultKeyBuilder(
             with_destiny=True,
         ),
+        state_ttl=config.storage.state_ttl,
+        data_ttl=config.storage.data_ttl,
+        compress_threshold=config.storage.compress_threshold,
     )
 
     dp = Dispatcher(storage=storage)
@@ -58,11 +74,20 @@ async def main():
 
     translator_hub: TranslatorHub = create_translator_hub()
 
+    # Клиент taskiq: рассылки ставятся в очередь NATS и выполняются воркерами taskiq
+    dp.startup.register(broker.startup)
+    dp.shutdown.register(broker.shutdown)
+
+    # Кеши процесса и подписка на инвалидации от других процессов и реплик
+    dp.startup.register(start_caches)
+    dp.shutdown.register(stop_caches)
+
     dp.workflow_data.update(
         bot_locales=sorted(config.i18n.locales),
         translator_hub=translator_hub,
         _cache_pool=cache_pool,
     )
+
     logger.info("Registering error handlers")
     dp.errors.register(
         on_unknown_intent,
@@ -78,6 +103,8 @@ async def main():
     dp.update.outer_middleware(GetUserMiddleware())
     dp.update.outer_middleware(ShadowBanMiddleware())
     dp.update.outer_middleware(TranslatorRunnerMiddleware())
+    # До setup_dialogs: лишние нажатия ➕/➖ отсекаются раньше загрузки контекста диалога
+    dp.callback_query.outer_middleware(CounterClickCoalescingMiddleware())
 
     logger.info("Including routers")
     dp.include_routers(*routers)
@@ -92,7 +119,7 @@ async def main():
     dp.errors.middleware(TranslatorRunnerMiddleware())
 
     logger.info("Setting up dialogs")
-    bg_factory = setup_dialogs(dp)
+    bg_factory = setup_dialogs(dp, message_manager=message_manager)
     dp.workflow_data.update(bg_factory=bg_factory)
 
     logger.info("Including observers middlewares")
@@ -101,13 +128,42 @@ async def main():
     dp.observers[DIALOG_EVENT_NAME].outer_middleware(ShadowBanMiddleware())
     dp.observers[DIALOG_EVENT_NAME].outer_middleware(TranslatorRunnerMiddleware())
 
+    return dp, bg_factory
+
+
+async def main():
+    config = get_config()
+
+    redis_client: redis.asyncio.Redis = await get_redis_pool(
+        host=config.redis.host,
+        port=config.redis.port,
+        db=config.redis.database,
+        username=config.redis.username,
+        password=config.redis.password,
+    )
+
+    bot = create_bot(config)
+    dp, bg_factory = setup_dispatcher(config, redis_client)
+    cache_pool: redis.asyncio.Redis = redis_client
+
     await create_admin(config=config, async_session_maker=async_session_maker)
 
     try:
-        await dp.start_polling(
-            bot,
-            bg_factory=bg_factory,
-        ),
+        if config.bot.run_mode == "webhook":
+            logger.info("Starting bot in webhook mode")
+            await run_webhook(
+                bot=bot,
+                dp=dp,
+                config=config.webhook,
+                bg_factory=bg_factory,
+            )
+        else:
+            logger.info("Starting bot in polling mode")
+            await bot.delete_webhook()
+            await dp.start_polling(
+                bot,
+                bg_factory=bg_factory,
+            )
     except Exception as e:
         logger.exception(e)
     finally:
@@ -1,7 +1,7 @@
 from aiogram_dialog import Dialog, Window
 from aiogram_dialog.widgets.text import Const, Format
 from aiogram_dialog.widgets.kbd import (
-    Back, Select, ScrollingGroup, Cancel, SwitchTo, Button
+    Back, Select, ScrollingGroup, Cancel, SwitchTo, Button, Column
 )
 from aiogram_dialog.widgets.input import MessageInput
 
@@ -14,6 +14,7 @@ from app.bot.dialogs.flows.cart.handlers import (
     selected_order_from_history, send_all_carts_message
 )
 from app.bot.dialogs.flows.menu_view.handlers import on_add_more_dishes_click
+from app.bot.dialogs.utils.pagination import keyset_pager
 from app.bot.dialogs.utils.roles_utils import role_required
 from app.infrastructure.database.enums import UserRole
 
@@ -181,7 +182,7 @@ cart_dialog = Dialog(
             "Всего заказов: {total_orders}\n"
             "Общая сумма: {total_spent:.2f} ₽\n\n"
         ),
-        ScrollingGroup(
+        Column(
             Select(
                 Format("{item[0]}"),
                 id="history_cart_select",
@@ -189,10 +190,8 @@ cart_dialog = Dialog(
                 items="carts",
                 on_click=selected_order_from_history,
             ),
-            id="history_group",
-            width=1,
-            height=8,
         ),
+        keyset_pager("cart_history_scroll"),
         SwitchTo(
             Const("⬅️ Назад"),
             id="back_to_main_from_history",
@@ -3,6 +3,7 @@ from typing import Dict, Any
 from aiogram_dialog import DialogManager
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.bot.dialogs.utils.pagination import get_keyset_page
 from app.infrastructure.database.enums.cart_statuses import CartStatus
 from app.infrastructure.database.enums.order_statuses import OrderStatus
 from app.infrastructure.database.models import DeliveryOrderModel, CartModel, UserModel, CartItemModel, DishModel
@@ -139,9 +140,19 @@ async def get_cart_history(
         user_row: UserModel,
         **kwargs
 ) -> Dict[str, Any]:
-    # Получаем все корзины пользователя, кроме текущей
-    user_carts = await CartRepository(session).get_user_carts_exclude_current(
-        user_id=user_row.id,
+    # Корзины пользователя, кроме текущей, постранично
+    cart_repo = CartRepository(session)
+    total_orders, total_spent = await cart_repo.get_user_cart_history_stats(user_row.id)
+
+    async def count() -> int:
+        return total_orders
+
+    user_carts, _, pages = await get_keyset_page(
+        dialog_manager,
+        scroll_id="cart_history_scroll",
+        page_size=8,
+        fetch=lambda cursor, offset: cart_repo.get_user_cart_history_page(user_row.id, cursor=cursor, offset=offset),
+        count=count,
     )
 
     carts_info = []
@@ -154,8 +165,9 @@ async def get_cart_history(
 
     return {
         "carts": carts_info,
-        "total_orders": len(user_carts),
-        "total_spent": sum(cart.total_price or 0 for cart in user_carts)
+        "total_orders": total_orders,
+        "total_spent": total_spent,
+        "pages": pages
     }
 
 
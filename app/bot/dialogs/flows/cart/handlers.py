@@ -84,9 +84,7 @@ async def on_update_amount(
                 )
                 await message.answer(f"✅ Количество обновлено: {new_amount}")
 
-        # Обновляем общую сумму корзины
-        await CartRepository(session).update_cart_total_price(cart_id)
-
+        # Общую сумму корзины обновляет триггер в базе
         # Возвращаемся к редактированию корзины
         await dialog_manager.switch_to(CartSG.edit_cart)
 
@@ -150,22 +148,19 @@ async def send_all_carts_message(
             await callback.answer("Заказ не выбран", show_alert=True)
             return
 
-        # Получаем заказ с корзинами
-        order = await OrderRepository(session).get_order_with_carts(order_id)
-
-        if not order or not order.carts:
-            await callback.answer("Заказ или корзины не найдены", show_alert=True)
-            return
-
         # Получаем chat_id для отправки сообщения
         chat_id = callback.message.chat.id
 
         # Формируем сообщение со всеми корзинами
-        await send_carts_summary_message(
+        sent = await send_carts_summary_message(
             bot=callback.bot,
             chat_id=chat_id,
-            order=order,
+            order_id=order_id,
+            session=session,
         )
+        if not sent:
+            await callback.answer("Заказ или корзины не найдены", show_alert=True)
+            return
         await callback.answer()
 
     except Exception:
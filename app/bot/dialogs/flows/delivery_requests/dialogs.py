@@ -13,6 +13,7 @@ from app.bot.dialogs.flows.delivery_requests.handlers import create_order, delet
     on_restaurant_selected, user_bank_button_on_click, on_order_selected, on_status_selected, \
     on_comment_entered_for_delivery
 from app.bot.dialogs.flows.delivery_requests.states import DeliverySG
+from app.bot.dialogs.utils.pagination import keyset_pager
 
 delivery_dialog = Dialog(
     # Главное окно заявок 🚚
@@ -150,7 +151,7 @@ delivery_dialog = Dialog(
     # 🗑️ Удалить заявку
     Window(
         Const("🗑️ Выберите заявку для удаления:"),
-        ScrollingGroup(
+        Column(
             Select(
                 Format("{item[0]}"),
                 id="delete_order",
@@ -158,10 +159,8 @@ delivery_dialog = Dialog(
                 items="orders",
                 on_click=delete_order
             ),
-            id="orders_group",
-            width=1,
-            height=5,
         ),
+        keyset_pager("today_orders_scroll"),
         SwitchTo(Const("⬅️ Назад"), state=DeliverySG.main, id="back_button"),
         state=DeliverySG.delete_list,
         getter=get_today_orders
@@ -170,7 +169,7 @@ delivery_dialog = Dialog(
     # today orders list
     Window(
         Const("Выберите заявку для изменения статуса:"),
-        ScrollingGroup(
+        Column(
             Select(
                 Format("{item[0]}"),
                 id="select_order",
@@ -178,10 +177,8 @@ delivery_dialog = Dialog(
                 items="orders",
                 on_click=on_order_selected,
             ),
-            id="order_list",
-            width=1,
-            height=5,
         ),
+        keyset_pager("today_orders_scroll"),
         SwitchTo(Const("⬅️ Назад"), state=DeliverySG.main, id="back_button"),
         state=DeliverySG.delivery_list,
         getter=get_today_orders
@@ -3,9 +3,9 @@ from datetime import datetime
 from aiogram_dialog import DialogManager
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.bot.dialogs.utils.pagination import get_keyset_page
 from app.infrastructure.database.enums.order_statuses import OrderStatus
 from app.infrastructure.database.enums.payment_methods import PaymentMethod
-from app.infrastructure.database.enums.user_roles import UserRole
 from app.infrastructure.database.models import UserModel, RestaurantModel
 from app.infrastructure.database.query.restaurant_queries import RestaurantRepository
 from app.infrastructure.database.query.order_queries import OrderRepository
@@ -84,15 +84,25 @@ async def get_today_orders(
         user_row: UserModel,
         **kwargs
 ) -> dict:
-    today = datetime.now().today()
+    today = datetime.now().date()
+    order_repo = OrderRepository(session)
+
+    # Фильтрация по правам выполняется в запросе
+    orders, _, pages = await get_keyset_page(
+        dialog_manager,
+        scroll_id="today_orders_scroll",
+        page_size=5,
+        fetch=lambda cursor, offset: order_repo.get_visible_orders_by_date_page(
+            today, user_row.role, user_row.id, cursor=cursor, offset=offset, limit=5
+        ),
+        count=lambda: order_repo.count_visible_orders_by_date(today, user_row.role, user_row.id),
+        params=today.isoformat(),
+    )
 
-    orders = await OrderRepository(session).get_orders_by_date(today)
-
-    # Фильтрация по правам
-    if user_row.role == UserRole.DELIVERY:
-        orders = [order for order in orders if order.creator_id == user_row.id]
-
-    return {"orders": [(f"Заявка #{order.id} - {order.status.value}", order.id) for order in orders]}
+    return {
+        "orders": [(f"Заявка #{order.id} - {order.status.value}", order.id) for order in orders],
+        "pages": pages
+    }
 
 
 async def get_order_statuses(
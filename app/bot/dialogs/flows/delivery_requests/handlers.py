@@ -182,9 +182,7 @@ async def create_order(
     )
 
     await send_order_notifications(
-        bot=callback.bot,
         deliverer=user,
-        session=session,
         order_id=order.id,
         restaurant_name=restaurant_name,
         phone=phone,
@@ -241,8 +239,6 @@ async def on_status_selected(
     # 2. Отправляем всем сообщение о смене статуса
     if order and old_status:
         await send_status_notification_to_all(
-            bot=callback.bot,
-            session=session,
             order=order,
             old_status=old_status,
             new_status=new_status,
@@ -254,6 +250,8 @@ async def on_status_selected(
         await send_carts_summary_message(
             bot=callback.bot,
             chat_id=callback.message.chat.id,
+            order_id=order.id,
+            session=session,
             order=order,
         )
 
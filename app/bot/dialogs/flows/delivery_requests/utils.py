@@ -1,124 +1,64 @@
-import asyncio
 import logging
 
-from aiogram import Bot
-from aiogram.enums import ParseMode
-from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
-from sqlalchemy.ext.asyncio import AsyncSession
-
+from app.infrastructure.database.enums.order_statuses import OrderStatus
 from app.infrastructure.database.models import UserModel, DeliveryOrderModel
-from app.infrastructure.database.query.user_queries import UserRepository
+from app.services.scheduler.tasks import broadcast_new_order, broadcast_status_change
 
 logger = logging.getLogger(__name__)
 
 
 async def send_order_notifications(
-        bot: Bot,
-        session: AsyncSession,
         order_id: int,
         restaurant_name: str,
         phone: str,
         bank: str,
         deliverer: UserModel,
         comment: str,
-        delay_seconds: float = 0.06  # 20 сообщений в секунду (меньше лимита Telegram 30/сек)
 ) -> None:
-    try:
-        # Получаем активных пользователей (исключая определенные роли и создателя)
-        users = await UserRepository(session).get_active_users_except(
-            exclude_telegram_id=deliverer.telegram_id
-        )
+    """Ставит рассылку о новой заявке в очередь taskiq"""
+    message_text = (
+        f"@{deliverer.username}\n"
+        f"📦 <b>Новая заявка #{order_id}</b>\n"
+        f"📍 Ресторан: {restaurant_name}\n"
+        f"📞 Телефон: <code>{phone}</code>\n"
+        f"🏦 Банк: {bank}\n\n"
+        f"Комментарий: {comment}\n\n"
+        f"<i>Чтобы сделать заказ, перейдите в раздел 'Меню'</i>"
+    )
 
-        message_text = (
-            f"@{deliverer.username}\n"
-            f"📦 <b>Новая заявка #{order_id}</b>\n"
-            f"📍 Ресторан: {restaurant_name}\n"
-            f"📞 Телефон: <code>{phone}</code>\n"
-            f"🏦 Банк: {bank}\n\n"
-            f"Комментарий: {comment}\n\n"
-            f"<i>Чтобы сделать заказ, перейдите в раздел 'Меню'</i>"
+    try:
+        await broadcast_new_order.kiq(
+            order_id=order_id,
+            text=message_text,
+            exclude_telegram_id=deliverer.telegram_id,
         )
-
-        success_count = 0
-        error_count = 0
-
-        # Отправляем сообщения с задержкой
-        for user in users:
-            try:
-                await bot.send_message(
-                    chat_id=user.telegram_id,
-                    text=message_text,
-                    parse_mode=ParseMode.HTML
-                )
-                success_count += 1
-
-                # Задержка между сообщениями
-                await asyncio.sleep(delay_seconds)
-
-            except TelegramForbiddenError:
-                # Пользователь заблокировал бота
-                logger.warning("User  blocked the bot", user.telegram_id)
-                error_count += 1
-
-            except TelegramRetryAfter as e:
-                # Превышение лимитов, ждем указанное время
-                logger.warning("Rate limit exceeded. Waiting %s seconds", e.retry_after)
-                await asyncio.sleep(e.retry_after)
-
-            except Exception as e:
-                logger.error(f"Failed to send notification to %s: %s", user.telegram_id, str(e))
-                error_count += 1
-
-        logger.info("Notifications sent: %s successful, %s failed", success_count, error_count)
+        logger.info("Enqueued order #%s notifications", order_id)
 
     except Exception as e:
         logger.error("Error in send_order_notifications: %s", str(e))
 
 
 async def send_status_notification_to_all(
-        bot: Bot,
-        session: AsyncSession,
         order: DeliveryOrderModel,
         old_status: OrderStatus,
         new_status: OrderStatus,
         deliverer: UserModel,
-        delay_seconds: float = 0.06
 ) -> None:
-    """Отправка уведомления всем пользователям о смене статуса заказа"""
+    """Ставит в очередь уведомление всем пользователям о смене статуса заказа"""
+    message_text = (
+        f"📢 <b>Статус заказа #{order.id} изменен</b>\n"
+        f"📍 Ресторан: {order.restaurant.name}\n"
+        f"🔄 {old_status.value} → {new_status.value}\n"
+        f"📅 Дата: {order.created_at.strftime('%d.%m.%Y %H:%M')}\n"
+    )
+
     try:
-        # Получаем всех активных пользователей
-        users = await UserRepository(session).get_active_users_except(
-            exclude_telegram_id=deliverer.telegram_id
+        await broadcast_status_change.kiq(
+            order_id=order.id,
+            text=message_text,
+            exclude_telegram_id=deliverer.telegram_id,
         )
-        message_text = (
-            f"📢 <b>Статус заказа #{order.id} изменен</b>\n"
-            f"📍 Ресторан: {order.restaurant.name}\n"
-            f"🔄 {old_status.value} → {new_status.value}\n"
-            f"📅 Дата: {order.created_at.strftime('%d.%m.%Y %H:%M')}\n"
-        )
-
-        success_count = 0
-        error_count = 0
-
-        for user in users:
-            try:
-                await bot.send_message(
-                    chat_id=user.telegram_id,
-                    text=message_text,
-                )
-                success_count += 1
-                await asyncio.sleep(delay_seconds)
-            except TelegramForbiddenError:
-                logger.warning(f"User {user.telegram_id} blocked the bot")
-                error_count += 1
-            except TelegramRetryAfter as e:
-                logger.warning(f"Rate limit exceeded. Waiting {e.retry_after} seconds")
-                await asyncio.sleep(e.retry_after)
-            except Exception as e:
-                logger.error(f"Failed to send status notification to {user.telegram_id}: {str(e)}")
-                error_count += 1
-
-        logger.info(f"Status notifications sent: {success_count} successful, {error_count} failed")
+        logger.info("Enqueued status notifications for order #%s", order.id)
 
     except Exception as e:
-        logger.error(f"Error in send_status_notification_to_all: {str(e)}")
+        logger.error("Error in send_status_notification_to_all: %s", str(e))
@@ -3,8 +3,10 @@ from aiogram_dialog.widgets.kbd import (
     Back, Cancel, Select, ScrollingGroup, Column, SwitchTo, Row
 )
 from aiogram_dialog.widgets.text import Const, Format
-from aiogram_dialog.widgets.input import TextInput
+from aiogram_dialog.widgets.input import MessageInput, TextInput
 
+from app.bot.dialogs.utils.pagination import keyset_pager
+from app.bot.utils.menu_import import parse_price_list
 from .states import MenuSettingsSG
 from .getters import (
     get_restaurants,
@@ -22,6 +24,7 @@ from .handlers import (
     process_success_dish_name_and_price, validate_and_split_dish_name_and_price, on_dish_selected_delete,
     on_dish_selected_rename, process_success_dish_rename, validate_price, on_dish_selected_update_price,
     process_success_dish_update_price, parse_dishes_input, handle_multiple_dishes_added, handle_dishes_parse_error,
+    handle_menu_document, handle_category_prices_synced, handle_price_list_error,
 )
 
 menu_settings_dialog = Dialog(
@@ -45,6 +48,16 @@ menu_settings_dialog = Dialog(
                 id="dish_settings",
                 state=MenuSettingsSG.select_restaurant_for_dish,
             ),
+            SwitchTo(
+                Const("📥 Загрузить меню из файла"),
+                id="import_menu",
+                state=MenuSettingsSG.import_menu,
+            ),
+            SwitchTo(
+                Const("🔄 Синхронизировать меню с прайсом"),
+                id="sync_menu",
+                state=MenuSettingsSG.sync_menu,
+            ),
         ),
         Cancel(Const("⬅️ Назад")),
         state=MenuSettingsSG.main,
@@ -89,7 +102,7 @@ menu_settings_dialog = Dialog(
     # 🏢 ❌ Удаление заведения
     Window(
         Const("Выберите заведение которое хотите удалить:"),
-        ScrollingGroup(
+        Column(
             Select(
                 Format("{item[0]}"),
                 id="restaurant_select_for_delete",
@@ -97,10 +110,8 @@ menu_settings_dialog = Dialog(
                 items="restaurants",
                 on_click=on_restaurant_selected_delete,
             ),
-            id="restaurant_group_for_deleting",
-            width=1,
-            height=6,
         ),
+        keyset_pager("restaurants_scroll"),
         SwitchTo(Const("⬅️ Назад"),
                  id="back_btn",
                  state=MenuSettingsSG.restaurant_menu),
@@ -110,7 +121,7 @@ menu_settings_dialog = Dialog(
     # 🏢 💾 Восстановить заведение
     Window(
         Const("Выберите удаленное заведение которое хотите восстановить:"),
-        ScrollingGroup(
+        Column(
             Select(
                 Format("{item[0]}"),
                 id="restaurant_select_for_recover",
@@ -118,10 +129,8 @@ menu_settings_dialog = Dialog(
                 items="restaurants",
                 on_click=on_restaurant_selected_recover,
             ),
-            id="restaurant_group_for_recover",
-            width=1,
-            height=6,
         ),
+        keyset_pager("deleted_restaurants_scroll"),
         SwitchTo(Const("⬅️ Назад"),
                  id="back_btn",
                  state=MenuSettingsSG.restaurant_menu),
@@ -131,7 +140,7 @@ menu_settings_dialog = Dialog(
     # 🏢 ️✏️ Переименование заведения
     Window(
         Const("Выберите заведение которое хотите переименование:"),
-        ScrollingGroup(
+        Column(
             Select(
                 Format("{item[0]}"),
                 id="restaurant_select_for_rename",
@@ -139,10 +148,8 @@ menu_settings_dialog = Dialog(
                 items="restaurants",
                 on_click=on_restaurant_selected_rename,
             ),
-            id="restaurant_group_for_renaming",
-            width=1,
-            height=6,
         ),
+        keyset_pager("restaurants_scroll"),
         SwitchTo(Const("⬅️ Назад"),
                  id="back_btn",
                  state=MenuSettingsSG.restaurant_menu),
@@ -168,7 +175,7 @@ menu_settings_dialog = Dialog(
     Window(
         Format("🏢 <b>Выберите заведение для работы с категориями</b>\n\n"
                "Найдено заведений: {count}"),
-        ScrollingGroup(
+        Column(
             Select(
                 Format("{item[0]}"),
                 id="restaurant_select_for_category",
@@ -176,10 +183,8 @@ menu_settings_dialog = Dialog(
                 items="restaurants",
                 on_click=on_restaurant_selected_for_categories,
             ),
-            id="restaurant_group_for_category",
-            width=1,
-            height=6,
         ),
+        keyset_pager("restaurants_scroll"),
         Row(
             SwitchTo(Const("⬅️ Назад"),
                      id="back_btn",
@@ -287,7 +292,7 @@ menu_settings_dialog = Dialog(
     Window(
         Format("🏢 <b>Выберите заведение для работы с блюдами</b>\n\n"
                "Найдено заведений: {count}"),
-        ScrollingGroup(
+        Column(
             Select(
                 Format("{item[0]}"),
                 id="restaurant_select_for_dish",
@@ -295,10 +300,8 @@ menu_settings_dialog = Dialog(
                 items="restaurants",
                 on_click=on_restaurant_selected_for_dishes,
             ),
-            id="restaurant_group_for_dish",
-            width=1,
-            height=6,
         ),
+        keyset_pager("restaurants_scroll"),
         Row(
             SwitchTo(Const("⬅️ Назад"),
                      id="back_btn",
@@ -352,6 +355,9 @@ menu_settings_dialog = Dialog(
                SwitchTo(Const("📋 Добавить списком"),
                         id="add_list_dish_btn",
                         state=MenuSettingsSG.add_multiple_dishes),
+               SwitchTo(Const("🔄 Синхронизировать прайс"),
+                        id="sync_prices_dish_btn",
+                        state=MenuSettingsSG.sync_category_prices),
                ),
         Row(
             SwitchTo(Const("⬅️ Назад"),
@@ -380,7 +386,7 @@ menu_settings_dialog = Dialog(
     # 🍽️🗑️ Удаление блюда
     Window(
         Const("Выберите блюдо которое хотите удалить:"),
-        ScrollingGroup(
+        Column(
             Select(
                 Format("{item[0]}"),
                 id="dish_select_for_delete",
@@ -388,10 +394,8 @@ menu_settings_dialog = Dialog(
                 items="dishes",
                 on_click=on_dish_selected_delete,
             ),
-            id="dish_group_for_deleting",
-            width=1,
-            height=6,
         ),
+        keyset_pager("dishes_scroll"),
         SwitchTo(Const("⬅️ Назад"),
                  id="back_btn",
                  state=MenuSettingsSG.dishes_menu),
@@ -401,7 +405,7 @@ menu_settings_dialog = Dialog(
     # 🍽️ ✏️ Переименование блюда
     Window(
         Const("Выберите блюдо которое хотите переименовать:"),
-        ScrollingGroup(
+        Column(
             Select(
                 Format("{item[0]}"),
                 id="dish_select_for_rename",
@@ -409,10 +413,8 @@ menu_settings_dialog = Dialog(
                 items="dishes",
                 on_click=on_dish_selected_rename,
             ),
-            id="dish_group_for_renaming",
-            width=1,
-            height=6,
         ),
+        keyset_pager("dishes_scroll"),
         SwitchTo(Const("⬅️ Назад"),
                  id="back_btn",
                  state=MenuSettingsSG.dishes_menu),
@@ -437,7 +439,7 @@ menu_settings_dialog = Dialog(
     # 🍽️💰 Изменение цены блюда
     Window(
         Const("Выберите блюдо у которого хотите изменить цену:"),
-        ScrollingGroup(
+        Column(
             Select(
                 Format("{item[0]}"),
                 id="dish_select_for_update_price",
@@ -445,10 +447,8 @@ menu_settings_dialog = Dialog(
                 items="dishes",
                 on_click=on_dish_selected_update_price,
             ),
-            id="dish_group_for_update_price",
-            width=1,
-            height=6,
         ),
+        keyset_pager("dishes_scroll"),
         SwitchTo(Const("⬅️ Назад"),
                  id="back_btn",
                  state=MenuSettingsSG.dishes_menu),
@@ -484,4 +484,63 @@ menu_settings_dialog = Dialog(
                  state=MenuSettingsSG.dishes_menu),
         state=MenuSettingsSG.add_multiple_dishes,
     ),
+    # 🍽️🔄 Синхронизация прайса категории
+    Window(
+        Format("🔄 <b>Прайс категории {category_name}</b>\n\n"
+               "Отправьте полный список блюд категории, по одному на строку:\n\n"
+               "<code>Куриное филе: 200\nКартошка фри: 150.50</code>\n\n"
+               "Новые блюда добавятся, у существующих обновится цена, "
+               "блюда, которых нет в списке, будут удалены."),
+        TextInput(
+            id="sync_prices_input",
+            type_factory=parse_price_list,
+            on_success=handle_category_prices_synced,
+            on_error=handle_price_list_error,
+        ),
+        SwitchTo(Const("⬅️ Назад"),
+                 id="back_btn",
+                 state=MenuSettingsSG.dishes_menu),
+        getter=get_selected_category,
+        state=MenuSettingsSG.sync_category_prices,
+    ),
+    # 📥 Загрузка меню из файла
+    Window(
+        Const("📥 <b>Загрузка меню из файла</b>\n\n"
+              "Отправьте файл <b>.csv</b> или <b>.json</b> с меню одного заведения. "
+              "Блюда и категории сопоставляются по названию: новые добавляются, "
+              "у существующих обновляются цена и порядок. Если в файле есть ошибки, "
+              "ничего не меняется.\n\n"
+              "CSV (разделитель , или ;):\n"
+              "<code>restaurant;category;dish;price;category_order;dish_order\n"
+              "Сушибар;Роллы;Филадельфия;450;1;1</code>\n\n"
+              "JSON:\n"
+              "<code>{\"restaurant\": \"Сушибар\", \"categories\": [{\"name\": \"Роллы\", "
+              "\"display_order\": 1, \"dishes\": [{\"name\": \"Филадельфия\", "
+              "\"price\": 450, \"display_order\": 1}]}]}</code>\n\n"
+              "Колонки и поля порядка необязательны."),
+        MessageInput(
+            func=handle_menu_document,
+            content_types=["document"]
+        ),
+        SwitchTo(Const("⬅️ Назад"),
+                 id="back_btn",
+                 state=MenuSettingsSG.main),
+        state=MenuSettingsSG.import_menu,
+    ),
+    # 🔄 Синхронизация меню заведения с прайсом
+    Window(
+        Const("🔄 <b>Синхронизация меню с прайсом</b>\n\n"
+              "Отправьте полный прайс заведения в том же формате, что и для загрузки "
+              "меню из файла (.csv или .json). Новые категории и блюда добавятся, "
+              "цены и порядок обновятся, а категории и блюда заведения, которых "
+              "нет в прайсе, будут удалены. Если в файле есть ошибки, ничего не меняется."),
+        MessageInput(
+            func=handle_menu_document,
+            content_types=["document"]
+        ),
+        SwitchTo(Const("⬅️ Назад"),
+                 id="back_btn",
+                 state=MenuSettingsSG.main),
+        state=MenuSettingsSG.sync_menu,
+    ),
 )
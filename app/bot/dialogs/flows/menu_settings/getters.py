@@ -2,7 +2,8 @@ from typing import Any, Dict
 from aiogram_dialog import DialogManager
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.infrastructure.database.models import DishModel, CategoryModel, RestaurantModel
+from app.bot.dialogs.utils.pagination import get_keyset_page
+from app.infrastructure.database.models import CategoryModel
 from app.infrastructure.database.query.restaurant_queries import RestaurantRepository
 from app.infrastructure.database.query.category_queries import CategoryRepository
 from app.infrastructure.database.query.dish_queries import DishRepository
@@ -13,13 +14,21 @@ async def get_restaurants(
         session: AsyncSession,
         **kwargs
 ) -> Dict[str, Any]:
-    restaurants: list[RestaurantModel] = await RestaurantRepository(session).get_all_active_restaurants()
+    restaurant_repo = RestaurantRepository(session)
+    restaurants, count, pages = await get_keyset_page(
+        dialog_manager,
+        scroll_id="restaurants_scroll",
+        page_size=6,
+        fetch=lambda cursor, offset: restaurant_repo.get_restaurants_page(True, cursor=cursor, offset=offset),
+        count=lambda: restaurant_repo.count_restaurants(True),
+    )
 
     return {
         "restaurants": [
             (restaurant.name, restaurant.id) for restaurant in restaurants
         ],
-        "count": len(restaurants)
+        "count": count,
+        "pages": pages
     }
 
 
@@ -28,13 +37,21 @@ async def get_deleted_restaurants(
         session: AsyncSession,
         **kwargs
 ) -> Dict[str, Any]:
-    restaurants: list[RestaurantModel] = await RestaurantRepository(session).get_all_disabled_restaurants()
+    restaurant_repo = RestaurantRepository(session)
+    restaurants, count, pages = await get_keyset_page(
+        dialog_manager,
+        scroll_id="deleted_restaurants_scroll",
+        page_size=6,
+        fetch=lambda cursor, offset: restaurant_repo.get_restaurants_page(False, cursor=cursor, offset=offset),
+        count=lambda: restaurant_repo.count_restaurants(False),
+    )
 
     return {
         "restaurants": [
             (restaurant.name, restaurant.id) for restaurant in restaurants
         ],
-        "count": len(restaurants)
+        "count": count,
+        "pages": pages
     }
 
 
@@ -65,15 +82,24 @@ async def get_dishes_for_category(
 ) -> Dict[str, Any]:
     category_id = dialog_manager.dialog_data.get("category_id")
     if not category_id:
-        return {"dishes": [], "count": 0}
-
-    dishes: list[DishModel] = await DishRepository(session).get_dishes_by_category(category_id)
+        return {"dishes": [], "count": 0, "pages": 0}
+
+    dish_repo = DishRepository(session)
+    dishes, count, pages = await get_keyset_page(
+        dialog_manager,
+        scroll_id="dishes_scroll",
+        page_size=6,
+        fetch=lambda cursor, offset: dish_repo.get_dishes_by_category_page(category_id, cursor=cursor, offset=offset),
+        count=lambda: dish_repo.count_dishes_by_category(category_id),
+        params=category_id,
+    )
 
     return {
         "dishes": [
             (f"{dish.name} - {dish.formatted_price}", dish.id) for dish in dishes
         ],
-        "count": len(dishes),
+        "count": count,
+        "pages": pages,
         "category_name": dialog_manager.dialog_data.get("category_name", "")
     }
 
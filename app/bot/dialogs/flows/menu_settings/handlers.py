@@ -1,16 +1,20 @@
 import re
+from html import escape
 
 from aiogram.types import Message, CallbackQuery
 from aiogram_dialog import DialogManager
-from aiogram_dialog.widgets.input import ManagedTextInput
+from aiogram_dialog.widgets.input import ManagedTextInput, MessageInput
 from aiogram_dialog.widgets.kbd import Select
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.bot.utils.html_chunker import chunk_html
+from app.bot.utils.menu_import import MAX_MENU_FILE_SIZE, MenuFileError, parse_menu_file, render_import_report
 from app.infrastructure.database.models import RestaurantModel, CategoryModel
 from app.infrastructure.database.query.restaurant_queries import RestaurantRepository
 from app.infrastructure.database.query.category_queries import CategoryRepository
 from app.infrastructure.database.query.dish_queries import DishRepository
+from app.infrastructure.database.query.menu_import_queries import DishSpec, MenuImportRepository, MenuSpec
 from .states import MenuSettingsSG
 
 
@@ -494,3 +498,77 @@ async def handle_dishes_parse_error(
     error_msg += "Пример: Куриное филе:200, Картошка фри:500.50"
 
     await message.answer(error_msg)
+
+
+# 📥 Загрузка меню из файла
+async def _answer_html(message: Message, fragments) -> None:
+    for part in chunk_html(fragments):
+        await message.answer(part)
+
+
+async def _read_menu_document(message: Message) -> MenuSpec | None:
+    """Скачать и разобрать документ; об ошибках сообщает сам и возвращает None"""
+    document = message.document
+    if document.file_size and document.file_size > MAX_MENU_FILE_SIZE:
+        await message.answer("❌ Файл слишком большой, максимум 1 МБ")
+        return None
+
+    file = await message.bot.download(document)
+    try:
+        return parse_menu_file(document.file_name or "", file)
+    except MenuFileError as error:
+        errors = "\n".join(f"• {escape(line)}" for line in error.errors)
+        await _answer_html(message, [f"❌ <b>Меню не загружено, исправьте файл:</b>\n{errors}"])
+        return None
+
+
+async def handle_menu_document(
+        message: Message,
+        widget: MessageInput,
+        dialog_manager: DialogManager,
+) -> None:
+    menu = await _read_menu_document(message)
+    if menu is None:
+        return
+
+    session: AsyncSession = dialog_manager.middleware_data["session"]
+    deactivate_missing = dialog_manager.current_context().state == MenuSettingsSG.sync_menu
+    try:
+        report = await MenuImportRepository(session).import_menu(menu, deactivate_missing=deactivate_missing)
+    except Exception as error:
+        await message.answer(f"❌ Ошибка при загрузке меню, ничего не изменено: {escape(str(error))}")
+        return
+
+    await _answer_html(message, render_import_report(report))
+    await dialog_manager.switch_to(MenuSettingsSG.main)
+
+
+# 🔄 Синхронизация прайса категории
+async def handle_category_prices_synced(
+        message: Message,
+        widget: ManagedTextInput,
+        dialog_manager: DialogManager,
+        dishes: tuple[DishSpec, ...],
+) -> None:
+    session: AsyncSession = dialog_manager.middleware_data["session"]
+    category_id = dialog_manager.dialog_data.get("category_id")
+
+    try:
+        report = await MenuImportRepository(session).sync_category_prices(int(category_id), dishes)
+    except Exception as error:
+        await message.answer(f"❌ Ошибка при синхронизации, ничего не изменено: {escape(str(error))}")
+        return
+
+    await _answer_html(message, render_import_report(report))
+    await dialog_manager.switch_to(MenuSettingsSG.dishes_menu)
+
+
+async def handle_price_list_error(
+        message: Message,
+        widget: ManagedTextInput,
+        dialog_manager: DialogManager,
+        error: ValueError,
+) -> None:
+    lines = error.errors if isinstance(error, MenuFileError) else [str(error)]
+    errors = "\n".join(f"• {escape(line)}" for line in lines)
+    await _answer_html(message, [f"❌ <b>Прайс не применен, исправьте ошибки:</b>\n{errors}"])
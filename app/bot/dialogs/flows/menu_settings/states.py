@@ -32,3 +32,8 @@ class MenuSettingsSG(StatesGroup):
     change_dish_price = State()
     change_dish_price_input = State()
     add_multiple_dishes = State()
+    sync_category_prices = State()
+
+    # Загрузка меню из файла
+    import_menu = State()
+    sync_menu = State()
@@ -10,6 +10,7 @@ from app.bot.dialogs.flows.menu_view.handlers import on_restaurant_selected_for_
     on_category_selected_for_menu_view, on_add_to_cart_clicked, go_to_cart_clicked
 from app.bot.dialogs.flows.menu_view.states import MenuViewSG
 from app.bot.dialogs.widgets.MultiSelectCounter import MultiSelectCounter
+from app.bot.dialogs.widgets.PagedScrollingGroup import PagedScrollingGroup
 
 menu_view_dialog = Dialog(
     # Выбор заведения
@@ -62,7 +63,7 @@ menu_view_dialog = Dialog(
         Format("🍽 <b>Меню</b>\n"
                "Категория: 📁 {category_name} <b></b>\n\n"
                "Найдено блюд: {count}:"),
-        ScrollingGroup(
+        PagedScrollingGroup(
             MultiSelectCounter(
                 checked_text=Format("✓ {item[0]}"),
                 unchecked_text=Format("{item[0]}"),
@@ -6,11 +6,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.bot.dialogs.flows.cart.states import CartSG
 from app.bot.dialogs.flows.menu_view.states import MenuViewSG
 from app.bot.dialogs.widgets.MultiSelectCounter import MultiSelectCounter
-from app.infrastructure.database.models import UserModel, RestaurantModel, CategoryModel, CartModel
+from app.infrastructure.cache.menu_snapshot import CategoryRecord, RestaurantRecord, menu_snapshot
+from app.infrastructure.database.models import UserModel, CartModel
 from app.infrastructure.database.query.cart_queries import CartRepository, CartItemRepository
-from app.infrastructure.database.query.category_queries import CategoryRepository
-from app.infrastructure.database.query.dish_queries import DishRepository
-from app.infrastructure.database.query.restaurant_queries import RestaurantRepository
 
 
 async def on_restaurant_selected_for_menu_view(
@@ -19,9 +17,8 @@ async def on_restaurant_selected_for_menu_view(
         manager: DialogManager,
         item_id: str
 ):
-    session = manager.middleware_data["session"]
-
-    restaurant: RestaurantModel = await RestaurantRepository(session).get_restaurant_by_id(int(item_id))
+    snapshot = await menu_snapshot.get()
+    restaurant: RestaurantRecord | None = snapshot.restaurants_by_id.get(int(item_id))
 
     if restaurant:
         manager.dialog_data["restaurant_id"] = restaurant.id
@@ -35,9 +32,8 @@ async def on_category_selected_for_menu_view(
         manager: DialogManager,
         item_id: str
 ):
-    session = manager.middleware_data["session"]
-
-    category: CategoryModel = await CategoryRepository(session).get_category_by_id(int(item_id))
+    snapshot = await menu_snapshot.get()
+    category: CategoryRecord | None = snapshot.categories_by_id.get(int(item_id))
 
     if category:
         manager.dialog_data["category_id"] = category.id
@@ -78,22 +74,20 @@ async def on_add_to_cart_clicked(
         )
         cart_id = cart.id
 
-    added_items_count = 0
-    for dish_id, amount in counters_data.items():
-        if amount > 0:
-            dish_id = int(dish_id)
-            dish = await DishRepository(session).get_dish_by_id(dish_id)
-
-            if dish:
-                await CartItemRepository(session).add_or_update_cart_item(
-                    cart_id=cart_id,
-                    dish_id=dish_id,
-                    amount=int(amount),
-                    price_at_time=dish.price
-                )
-                added_items_count += amount
-
-    await cart_repo.update_cart_total_price(cart_id)
+    # Цены берем из снимка меню, все позиции записываются одним запросом и одним коммитом
+    snapshot = await menu_snapshot.get()
+    amounts = {int(dish_id): int(amount) for dish_id, amount in counters_data.items()}
+    prices = {
+        dish_id: snapshot.dishes_by_id[dish_id].price
+        for dish_id in amounts
+        if dish_id in snapshot.dishes_by_id
+    }
+
+    added_items_count = await CartItemRepository(session).bulk_upsert_items(
+        cart_id=cart_id,
+        amounts=amounts,
+        prices=prices,
+    )
     await callback.answer(f"Добавлено {added_items_count} позиций в корзину!", show_alert=True)
 
 
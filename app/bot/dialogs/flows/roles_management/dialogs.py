@@ -1,11 +1,12 @@
 from aiogram_dialog import Dialog, Window
 from aiogram_dialog.widgets.kbd import (
     Multiselect, Button, Row, Cancel, Back,
-    Radio, Group, ScrollingGroup, SwitchTo, Select
+    Radio, Group, Column, SwitchTo, Select
 )
 from aiogram_dialog.widgets.text import Const, Format
 from aiogram_dialog.widgets.input import TextInput
 
+from app.bot.dialogs.utils.pagination import keyset_pager
 from .states import AdminPanelSG
 from .getters import get_pending_users, get_user_info, get_available_roles, get_users_for_role_change
 from .handlers import (
@@ -19,7 +20,7 @@ admin_roles_dialog = Dialog(
         Format("👥 Пользователи ожидающие авторизации\n\n"
                "Найдено пользователей: {count_users}\n"
                "Выберите пользователей:"),
-        ScrollingGroup(
+        Column(
             Multiselect(
                 checked_text=Format("✓ {item.username}"),
                 unchecked_text=Format("{item.username}"),
@@ -27,10 +28,8 @@ admin_roles_dialog = Dialog(
                 item_id_getter=lambda x: str(x.telegram_id),
                 items="users",
             ),
-            id="sg_users",
-            width=1,
-            height=10,
         ),
+        keyset_pager("pending_users_scroll"),
         Row(
             Button(
                 Const("🚫 Забанить"),
@@ -105,7 +104,7 @@ admin_roles_dialog = Dialog(
     ),
     Window(
         Const("👥 Выберите пользователя:"),
-        ScrollingGroup(
+        Column(
             Select(
                 Format("{item[0]}"),
                 id="sg_users",
@@ -113,10 +112,8 @@ admin_roles_dialog = Dialog(
                 items="users",
                 on_click=on_user_selected,
             ),
-            id="sg_users_group",
-            width=1,
-            height=10,
         ),
+        keyset_pager("members_scroll"),
         SwitchTo(
             Const("⬅️ Назад"),
             id="btn_back_choose_member",
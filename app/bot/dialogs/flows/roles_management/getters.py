@@ -3,6 +3,7 @@ from typing import Any, Dict
 from aiogram_dialog import DialogManager
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.bot.dialogs.utils.pagination import get_keyset_page
 from app.infrastructure.database.enums.user_roles import UserRole
 from app.infrastructure.database.models import UserModel
 from app.infrastructure.database.query.user_queries import UserRepository
@@ -13,11 +14,21 @@ async def get_pending_users(
         session: AsyncSession,
         **kwargs
 ) -> Dict[str, Any]:
-    users = await UserRepository(session).get_users_by_role(UserRole.UNKNOWN)
+    user_repo = UserRepository(session)
+    roles = [UserRole.UNKNOWN]
+
+    users, count_users, pages = await get_keyset_page(
+        dialog_manager,
+        scroll_id="pending_users_scroll",
+        page_size=10,
+        fetch=lambda cursor, offset: user_repo.get_users_page(roles, cursor=cursor, offset=offset, limit=10),
+        count=lambda: user_repo.count_users(roles),
+    )
 
     return {
         "users": users,
-        "count_users": len(users)
+        "count_users": count_users,
+        "pages": pages
     }
 
 
@@ -42,19 +53,7 @@ async def get_available_roles(
         **kwargs
 ) -> Dict[str, Any]:
     # Определяем доступные роли в зависимости от прав админа
-    all_roles = [role for role in UserRole if role != UserRole.UNKNOWN]
-
-    if user_row.role == UserRole.ADMIN:
-        # Admin может назначать только до уровня DELIVERY
-        available_roles = [
-            role for role in all_roles
-            if role not in [UserRole.ADMIN, UserRole.SUPER_ADMIN]
-        ]
-    elif user_row.role == UserRole.SUPER_ADMIN:
-        # Super admin может назначать любые роли
-        available_roles = all_roles
-    else:
-        available_roles = []
+    available_roles = UserRepository.manageable_roles(user_row.role)
 
     return {
         "roles": available_roles,
@@ -68,28 +67,21 @@ async def get_users_for_role_change(
         user_row: UserModel,
         **kwargs
 ) -> Dict[str, Any]:
-    # Получаем всех пользователей кроме UNKNOWN (неавторизованных)
-    all_users: list[UserModel] = await UserRepository(session).get_all_users_except_unknown()
-
-    # Фильтруем пользователей в зависимости от роли админа
-    filtered_users = []
-
-    for user in all_users:
-        # Для всех ролей: исключаем самого себя
-        if user.telegram_id == user_row.telegram_id:
-            continue
-
-        # Для ADMIN: скрываем ADMIN и SUPER_ADMIN
-        if user_row.role == UserRole.ADMIN:
-            if user.role not in [UserRole.ADMIN, UserRole.SUPER_ADMIN]:
-                filtered_users.append(user)
-        # Для SUPER_ADMIN: показываем всех (уже исключили себя выше)
-        elif user_row.role == UserRole.SUPER_ADMIN:
-            filtered_users.append(user)
+    # Видимость по роли админа и исключение самого себя применяются в запросе
+    user_repo = UserRepository(session)
+    users, count_users, pages = await get_keyset_page(
+        dialog_manager,
+        scroll_id="members_scroll",
+        page_size=10,
+        fetch=lambda cursor, offset: user_repo.get_manageable_users_page(
+            user_row.role, user_row.telegram_id, cursor=cursor, offset=offset, limit=10
+        ),
+        count=lambda: user_repo.count_manageable_users(user_row.role, user_row.telegram_id),
+    )
 
     # Форматируем пользователей для отображения
     users_for_display = []
-    for user in filtered_users:
+    for user in users:
         display_name = user.full_name or user.username or f"Пользователь {user.telegram_id}"
         role_display = user.role.value
         text = f"{display_name} -👔 {role_display}"
@@ -97,5 +89,6 @@ async def get_users_for_role_change(
 
     return {
         "users": users_for_display,
-        "count_users": len(filtered_users)
+        "count_users": count_users,
+        "pages": pages
     }
@@ -0,0 +1,153 @@
+import hashlib
+import logging
+
+from aiogram import Bot
+from aiogram.types import CallbackQuery, Message
+from aiogram_dialog.api.entities import NewMessage, OldMessage, ShowMode
+from aiogram_dialog.api.protocols import MessageNotModified
+from aiogram_dialog.manager.message_manager import MessageManager
+from redis.asyncio import Redis
+
+from app.infrastructure.cache.invalidation import TTLCache
+
+logger = logging.getLogger(__name__)
+
+RENDER_NAMESPACE = "render"
+
+# Режимы, в которых aiogram_dialog редактирует уже показанное сообщение
+_EDIT_MODES = (ShowMode.AUTO, ShowMode.EDIT)
+
+
+def render_digest(new_message: NewMessage) -> str:
+    """Хеш всего, что видно в сообщении: текст, разметка, клавиатура, медиа"""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in (
+            new_message.text or "",
+            new_message.parse_mode or "",
+            str(bool(new_message.protect_content)),
+            new_message.reply_markup.model_dump_json(exclude_none=True) if new_message.reply_markup else "",
+            new_message.link_preview_options.model_dump_json(exclude_none=True)
+            if new_message.link_preview_options else "",
+            repr(new_message.media) if new_message.media else "",
+    ):
+        digest.update(part.encode())
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class RenderCacheMessageManager(MessageManager):
+    """
+    MessageManager, который не отправляет editMessage*, если окно
+    отрисовалось точно так же, как уже показанное сообщение.
+
+    Штатный MessageManager сравнивает новый HTML с текстом сообщения без
+    разметки и считает любую inline-клавиатуру изменившейся, поэтому
+    редактирует сообщение после каждого callback. Здесь после каждого показа
+    запоминается хеш текста и клавиатуры по (chat_id, message_id) в Redis,
+    чтобы его видели все реплики (до setup — в локальном кеше процесса).
+
+    На callback, которые уже ответил CounterClickCoalescer, повторно не
+    отвечает: Telegram отклонил бы второй answerCallbackQuery.
+    """
+
+    def __init__(self, ttl: int = 48 * 60 * 60, local_maxsize: int = 10_000, answered_ttl: float = 60):
+        self.redis: Redis | None = None
+        self.ttl = ttl
+        self._local: TTLCache[tuple[int, int], str] = TTLCache(maxsize=local_maxsize, ttl=ttl)
+        self._answered: TTLCache[str, bool] = TTLCache(maxsize=local_maxsize, ttl=answered_ttl)
+
+    def setup(self, redis: Redis) -> None:
+        self.redis = redis
+
+    @staticmethod
+    def _key(chat_id: int, message_id: int) -> str:
+        return f"{RENDER_NAMESPACE}:{chat_id}:{message_id}"
+
+    async def _get_digest(self, chat_id: int, message_id: int) -> str | None:
+        if self.redis is None:
+            return self._local.get((chat_id, message_id))
+
+        try:
+            raw = await self.redis.get(self._key(chat_id, message_id))
+        except Exception as e:
+            logger.error("Error reading render digest %s:%s: %s", chat_id, message_id, str(e))
+            return None
+        return raw.decode() if isinstance(raw, bytes) else raw
+
+    async def _remember(self, chat_id: int, message_id: int, digest: str) -> None:
+        if self.redis is None:
+            self._local.set((chat_id, message_id), digest)
+            return
+
+        try:
+            await self.redis.set(self._key(chat_id, message_id), digest, ex=self.ttl)
+        except Exception as e:
+            logger.error("Error writing render digest %s:%s: %s", chat_id, message_id, str(e))
+
+    async def _forget(self, old_message: OldMessage | None) -> None:
+        if old_message is None:
+            return
+        self._local.pop((old_message.chat.id, old_message.message_id))
+        if self.redis is None:
+            return
+
+        try:
+            await self.redis.delete(self._key(old_message.chat.id, old_message.message_id))
+        except Exception as e:
+            logger.error("Error deleting render digest %s:%s: %s",
+                         old_message.chat.id, old_message.message_id, str(e))
+
+    def mark_answered(self, callback_id: str) -> None:
+        self._answered.set(callback_id, True)
+
+    async def answer_callback(self, bot: Bot, callback_query: CallbackQuery) -> None:
+        if self._answered.get(callback_query.id):
+            self._answered.pop(callback_query.id)
+            return
+        await super().answer_callback(bot, callback_query)
+
+    async def remove_inline_kbd(
+            self, bot: Bot, old_message: OldMessage | None,
+    ) -> Message | None:
+        # Клавиатуру убрали — содержимое сообщения больше не совпадает с запомненным
+        await self._forget(old_message)
+        return await super().remove_inline_kbd(bot, old_message)
+
+    async def remove_message_safe(
+            self, bot: Bot, old_message: OldMessage, new_message: NewMessage | None,
+    ) -> None:
+        await self._forget(old_message)
+        await super().remove_message_safe(bot, old_message, new_message)
+
+    async def show_message(
+            self, bot: Bot, new_message: NewMessage,
+            old_message: OldMessage | None,
+    ) -> OldMessage:
+        if new_message.show_mode is ShowMode.NO_UPDATE:
+            return await super().show_message(bot, new_message, old_message)
+
+        digest = render_digest(new_message)
+        can_skip = (
+            old_message is not None
+            and new_message.show_mode in _EDIT_MODES
+            and not self.need_reply_keyboard(new_message)
+            and not self.had_reply_keyboard(old_message)
+        )
+        if can_skip:
+            key = (old_message.chat.id, old_message.message_id)
+            if await self._get_digest(*key) == digest:
+                logger.debug("Render of message %s:%s did not change, edit skipped", *key)
+                return old_message
+
+        try:
+            shown = await super().show_message(bot, new_message, old_message)
+        except MessageNotModified:
+            if old_message is not None:
+                await self._remember(old_message.chat.id, old_message.message_id, digest)
+            raise
+
+        await self._remember(shown.chat.id, shown.message_id, digest)
+        return shown
+
+
+message_manager = RenderCacheMessageManager()
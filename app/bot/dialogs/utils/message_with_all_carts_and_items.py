@@ -1,78 +1,93 @@
+from collections.abc import Iterator
+
 from aiogram import Bot
 from aiogram.types import InlineKeyboardButton, CallbackQuery
 from aiogram.utils.keyboard import InlineKeyboardBuilder
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.bot.utils.html_chunker import chunk_html
+from app.infrastructure.cache.order_summary_cache import order_summary_cache
 from app.infrastructure.database.models import DeliveryOrderModel
 from app.infrastructure.database.query.order_queries import OrderRepository
 
 
+def render_carts_summary(order: DeliveryOrderModel) -> list[str]:
+    """Сводное сообщение со всеми корзинами, нарезанное на части для отправки"""
+    return list(chunk_html(_carts_summary_fragments(order)))
+
+
+def _carts_summary_fragments(order: DeliveryOrderModel) -> Iterator[str]:
+    # Заголовок сообщения
+    yield (
+        f"📋 <b>ЗАКАЗ #{order.id}</b>\n"
+        f"📍 Ресторан: {order.restaurant.name}\n"
+        f"📅 Дата: {order.created_at.strftime('%d.%m.%Y %H:%M')}\n"
+        f"👥 Участников: {len(order.carts)}\n"
+        f"💰 <b>Общая сумма: {order.total_amount:.2f} ₽</b>\n"
+        f"────────────────────\n\n"
+    )
+
+    # Формируем информацию по каждому пользователю
+    user_carts = {}
+    for cart in order.carts:
+        if cart.user_id not in user_carts:
+            user_carts[cart.user_id] = []
+        user_carts[cart.user_id].append(cart)
+
+    # Для каждого пользователя формируем отдельный фрагмент
+    for user_id, carts in user_carts.items():
+        user = carts[0].user
+
+        # Формируем информацию о пользователе
+        username = user.mention if user else "Без пользователя"
+        user_total = sum(cart.total_price or 0 for cart in carts)
+
+        user_block = [f"👤 <b>{username}</b>\n"]
+
+        # Добавляем информацию о каждой корзине пользователя
+        for cart in carts:
+            if cart.notes:
+                user_block.append(f"⚠️ <b>{cart.notes}</b>\n")
+
+            user_block.append("🍽 Позиции:\n")
+            for item in cart.item_associations:
+                item_total = item.amount * item.price_at_time
+                user_block.append(
+                    f"{item.dish.name} - "
+                    f"{item.amount} шт. × {item.price_at_time:.2f} ₽ = "
+                    f"<b>{item_total:.2f} ₽</b>\n"
+                )
+
+        user_block.append(f"\n💰 <b>Итого: {user_total:.2f} ₽</b>\n")
+        user_block.append("────────────────────\n")
+        yield "".join(user_block)
+
+
 async def send_carts_summary_message(
         bot: Bot,
         chat_id: int,
-        order: DeliveryOrderModel,
-) -> None:
-    """Отправить сводное сообщение со всеми корзинами"""
+        order_id: int,
+        session: AsyncSession,
+        order: DeliveryOrderModel | None = None,
+) -> bool:
+    """
+    Отправить сводное сообщение со всеми корзинами.
+
+    Части сообщения берутся из кеша текущей версии заказа; заказ с корзинами
+    загружается (или берется переданный order) только при промахе.
+    Возвращает False, если заказ не найден или в нем нет корзин.
+    """
     try:
-        # Заголовок сообщения
-        header = (
-            f"📋 <b>ЗАКАЗ #{order.id}</b>\n"
-            f"📍 Ресторан: {order.restaurant.name}\n"
-            f"📅 Дата: {order.created_at.strftime('%d.%m.%Y %H:%M')}\n"
-            f"👥 Участников: {len(order.carts)}\n"
-            f"💰 <b>Общая сумма: {order.total_amount:.2f} ₽</b>\n"
-            f"────────────────────\n\n"
-        )
-
-        current_text = header
-        message_parts = []
-
-        # Формируем информацию по каждому пользователю
-        user_carts = {}
-        for cart in order.carts:
-            if cart.user_id not in user_carts:
-                user_carts[cart.user_id] = []
-            user_carts[cart.user_id].append(cart)
-
-        # Для каждого пользователя формируем блок
-        for user_id, carts in user_carts.items():
-            user = carts[0].user
-
-            # Формируем информацию о пользователе
-            username = user.mention if user else "Без пользователя"
-            user_total = sum(cart.total_price or 0 for cart in carts)
-
-            user_block = (
-                f"👤 <b>{username}</b>\n"
-            )
+        async def render(render_session: AsyncSession) -> list[str]:
+            loaded = order or await OrderRepository(render_session).get_order_with_carts(order_id)
+            if not loaded or not loaded.carts:
+                return []
+            return render_carts_summary(loaded)
 
-            # Добавляем информацию о каждой корзине пользователя
-            for cart in carts:
-                if cart.notes:
-                    user_block += f"⚠️ <b>{cart.notes}</b>\n"
-
-                user_block += f"🍽 Позиции:\n"
-                for item in cart.item_associations:
-                    item_total = item.amount * item.price_at_time
-                    user_block += (
-                        f"{item.dish.name} - "
-                        f"{item.amount} шт. × {item.price_at_time:.2f} ₽ = "
-                        f"<b>{item_total:.2f} ₽</b>\n"
-                    )
-
-            user_block += f"\n💰 <b>Итого: {user_total:.2f} ₽</b>\n"
-            user_block += "────────────────────\n"
-
-            # Проверяем длину сообщения
-            if len(current_text + user_block) > 4000:
-                message_parts.append(current_text)
-                current_text = user_block
-            else:
-                current_text += user_block
-
-        # Добавляем последнюю часть
-        if current_text:
-            message_parts.append(current_text)
+        message_parts = await order_summary_cache.get_or_render("carts", order_id, session, render)
+        if not message_parts:
+            return False
 
         # Отправляем все части сообщения
         for i, text in enumerate(message_parts):
@@ -82,7 +97,7 @@ async def send_carts_summary_message(
                 builder = InlineKeyboardBuilder()
                 builder.add(InlineKeyboardButton(
                     text="📊 Показать сводный список товаров",
-                    callback_data=f"order_summary:{order.id}"
+                    callback_data=f"order_summary:{order_id}"
                 ))
                 reply_markup = builder.as_markup()
 
@@ -92,11 +107,70 @@ async def send_carts_summary_message(
                 parse_mode="HTML",
                 reply_markup=reply_markup
             )
+        return True
 
     except Exception:
         raise
 
 
+def render_grouped_items(order: DeliveryOrderModel, rows: list[Row]) -> list[str]:
+    """Сводный список товаров по категориям, нарезанный на части для отправки"""
+    return list(chunk_html(_grouped_items_fragments(order, rows)))
+
+
+def _grouped_items_fragments(order: DeliveryOrderModel, rows: list[Row]) -> Iterator[str]:
+    # Строки уже сгруппированы по блюдам и отсортированы по категориям,
+    # итоги категории приходят в каждой строке из оконных сумм
+    sorted_categories = []
+    for row in rows:
+        if not sorted_categories or sorted_categories[-1]['id'] != row.category_id:
+            sorted_categories.append({
+                'id': row.category_id,
+                'name': row.category_name,
+                'items': [],
+                'total_amount': row.category_amount,
+                'total_price': row.category_price
+            })
+        sorted_categories[-1]['items'].append(row)
+
+    # Формируем сообщение
+    yield (
+        f"📊 <b>СВОДНЫЙ СПИСОК ТОВАРОВ</b>\n"
+        f"Заказ #{order.id} | {order.restaurant.name}\n"
+        f"────────────────────\n\n"
+    )
+
+    total_all_items = 0
+    total_all_price = 0
+
+    for category in sorted_categories:
+        category_block = [
+            f"📁 <b>{category['name']}</b>\n"
+            f"Общее количество: {category['total_amount']} шт.\n"
+            f"На сумму: <b>{category['total_price']:.2f} ₽</b>\n\n"
+        ]
+
+        for item in category['items']:
+            category_block.append(
+                f"  • {item.dish_name} - "
+                f"<b>{item.total_amount} шт.</b> "
+                f"({item.price:.2f} ₽/шт.)\n"
+            )
+
+        category_block.append("────────────────────\n\n")
+        yield "".join(category_block)
+
+        total_all_items += category['total_amount']
+        total_all_price += category['total_price']
+
+    # Добавляем итоги
+    yield (
+        f"📈 <b>ИТОГИ ПО ЗАКАЗУ</b>\n"
+        f"Общее количество товаров: <b>{total_all_items} шт.</b>\n"
+        f"Общая стоимость: <b>{total_all_price:.2f} ₽</b>\n"
+    )
+
+
 async def send_grouped_items_message(
         callback: CallbackQuery,
         order_id: int,
@@ -104,131 +178,24 @@ async def send_grouped_items_message(
 ) -> None:
     """Отправить сообщение с группировкой товаров по категориям"""
     try:
-        order_repo = OrderRepository(session)
-        order = await order_repo.get_order_with_carts(order_id)
-
-        if not order:
+        async def render(render_session: AsyncSession) -> list[str]:
+            order_repo = OrderRepository(render_session)
+            order = await order_repo.get_order_with_restaurant(order_id)
+            if not order:
+                return []
+            rows = await order_repo.get_order_item_aggregates(order_id)
+            return render_grouped_items(order, rows)
+
+        message_parts = await order_summary_cache.get_or_render("grouped", order_id, session, render)
+        if not message_parts:
             await callback.answer("Заказ не найден", show_alert=True)
             return
 
-        # Собираем все товары из всех корзин
-        all_items = []
-        for cart in order.carts:
-            for item in cart.item_associations:
-                all_items.append({
-                    'dish_id': item.dish.id,
-                    'dish_name': item.dish.name,
-                    'amount': item.amount,
-                    'price': item.price_at_time,
-                    'category_id': item.dish.category_id,
-                    'category_name': item.dish.category.name if item.dish.category else "Без категории",
-                    'category_order': item.dish.category.display_order if item.dish.category else 999
-                })
-
-        # Группируем товары по названию
-        grouped_items = {}
-        for item in all_items:
-            key = item['dish_id']
-            if key not in grouped_items:
-                grouped_items[key] = {
-                    'name': item['dish_name'],
-                    'total_amount': 0,
-                    'category_id': item['category_id'],
-                    'category_name': item['category_name'],
-                    'category_order': item['category_order'],
-                    'price': item['price'],
-                    'total_price': 0
-                }
-            grouped_items[key]['total_amount'] += item['amount']
-
-        # Рассчитываем общую стоимость для каждого товара
-        for key, item_data in grouped_items.items():
-            item_data['total_price'] = item_data['total_amount'] * item_data['price']
-
-        # Группируем товары по категориям
-        categories = {}
-        for item_data in grouped_items.values():
-            cat_id = item_data['category_id']
-            if cat_id not in categories:
-                categories[cat_id] = {
-                    'name': item_data['category_name'],
-                    'order': item_data['category_order'],
-                    'items': [],
-                    'total_amount': 0,
-                    'total_price': 0
-                }
-
-            categories[cat_id]['items'].append(item_data)
-            categories[cat_id]['total_amount'] += item_data['total_amount']
-            categories[cat_id]['total_price'] += item_data['total_price']
-
-        # Сортируем категории по display_order
-        sorted_categories = sorted(categories.values(), key=lambda x: (x['order'], x['name']))
-
-        # Формируем сообщение
-        header = (
-            f"📊 <b>СВОДНЫЙ СПИСОК ТОВАРОВ</b>\n"
-            f"Заказ #{order.id} | {order.restaurant.name}\n"
-            f"────────────────────\n\n"
-        )
-
-        message_text = header
-        total_all_items = 0
-        total_all_price = 0
-
-        for category in sorted_categories:
-            # Сортируем товары в категории по названию
-            sorted_items = sorted(category['items'], key=lambda x: x['name'])
-
-            category_text = (
-                f"📁 <b>{category['name']}</b>\n"
-                f"Общее количество: {category['total_amount']} шт.\n"
-                f"На сумму: <b>{category['total_price']:.2f} ₽</b>\n\n"
-            )
-
-            for item in sorted_items:
-                category_text += (
-                    f"  • {item['name']} - "
-                    f"<b>{item['total_amount']} шт.</b> "
-                    f"({item['price']:.2f} ₽/шт.)\n"
-                )
-
-            category_text += "────────────────────\n\n"
-
-            # Проверяем длину сообщения
-            if len(message_text + category_text) > 4000:
-                await callback.message.answer(
-                    text=message_text,
-                    parse_mode="HTML"
-                )
-                message_text = category_text
-            else:
-                message_text += category_text
-
-            total_all_items += category['total_amount']
-            total_all_price += category['total_price']
-
-        # Добавляем итоги
-        summary = (
-            f"📈 <b>ИТОГИ ПО ЗАКАЗУ</b>\n"
-            f"Общее количество товаров: <b>{total_all_items} шт.</b>\n"
-            f"Общая стоимость: <b>{total_all_price:.2f} ₽</b>\n"
-        )
-
-        if len(message_text + summary) > 4000:
+        for text in message_parts:
             await callback.message.answer(
-                text=message_text,
+                text=text,
                 parse_mode="HTML"
             )
-            message_text = summary
-        else:
-            message_text += summary
-
-        # Отправляем финальное сообщение
-        await callback.message.answer(
-            text=message_text,
-            parse_mode="HTML"
-        )
 
         await callback.answer()
 
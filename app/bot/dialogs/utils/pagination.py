@@ -0,0 +1,76 @@
+import math
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from aiogram import F
+from aiogram_dialog import DialogManager
+from aiogram_dialog.widgets.common import ManagedScroll
+from aiogram_dialog.widgets.kbd import CurrentPage, Group, NextPage, PrevPage, Row, StubScroll
+from aiogram_dialog.widgets.text import Const, Format
+
+from app.infrastructure.database.query.pagination import KeysetPage
+
+KEYSET_STATE_KEY = "_keyset"
+
+PageFetcher = Callable[[list | None, int], Awaitable[KeysetPage]]
+
+
+def keyset_pager(scroll_id: str) -> Group:
+    """StubScroll и кнопки листания для списка, страницы которого отдает геттер"""
+    return Group(
+        StubScroll(id=scroll_id, pages="pages"),
+        Row(
+            PrevPage(scroll=scroll_id, id=f"{scroll_id}_prev", text=Const("◀️")),
+            CurrentPage(scroll=scroll_id, id=f"{scroll_id}_current", text=Format("{current_page1}/{pages}")),
+            NextPage(scroll=scroll_id, id=f"{scroll_id}_next", text=Const("▶️")),
+            when=F["pages"] > 1,
+        ),
+    )
+
+
+async def get_keyset_page(
+        dialog_manager: DialogManager,
+        scroll_id: str,
+        page_size: int,
+        fetch: PageFetcher,
+        count: Callable[[], Awaitable[int]],
+        params: Any = None,
+) -> tuple[list, int, int]:
+    """
+    Загрузить текущую страницу списка и вернуть (элементы, всего, страниц).
+
+    Курсоры уже открытых страниц хранятся в dialog_data, поэтому листание
+    вперед и назад идет по индексу (WHERE (sort_key, id) > курсор), а не
+    через OFFSET. При смене params (например, другой категории) курсоры
+    сбрасываются и список открывается с первой страницы.
+    """
+    scroll: ManagedScroll = dialog_manager.find(scroll_id)
+    page = await scroll.get_page()
+
+    states = dialog_manager.dialog_data.setdefault(KEYSET_STATE_KEY, {})
+    state = states.get(scroll_id)
+    if state is None or state["params"] != params:
+        state = states[scroll_id] = {"params": params, "cursors": [None]}
+        if page:
+            page = 0
+            await scroll.set_page(0)
+
+    cursors: list = state["cursors"]
+    if page < len(cursors):
+        result = await fetch(cursors[page], 0)
+        del cursors[page + 1:]
+        if result.next_cursor is not None:
+            cursors.append(result.next_cursor)
+    else:
+        result = await fetch(None, page * page_size)
+
+    if not result.items and page:
+        # Список сократился, пока пользователь был на дальней странице
+        await scroll.set_page(0)
+        del cursors[1:]
+        return await get_keyset_page(dialog_manager, scroll_id, page_size, fetch, count, params)
+
+    total = await count()
+    # Счетчик может немного отставать, но листание вперед должно оставаться доступным
+    pages = max(math.ceil(total / page_size), page + 1 + (result.next_cursor is not None))
+    return result.items, total, pages
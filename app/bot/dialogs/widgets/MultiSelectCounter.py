@@ -1,3 +1,5 @@
+from collections.abc import Sequence
+from functools import lru_cache
 from typing import Generic, Optional, Union, Callable, Dict, List, TypeVar
 from aiogram.types import InlineKeyboardButton, CallbackQuery
 from aiogram_dialog import DialogManager
@@ -7,7 +9,8 @@ from aiogram_dialog.widgets.common import (
 )
 from aiogram_dialog.widgets.common.items import ItemsGetterVariant
 from aiogram_dialog.widgets.kbd.select import StatefulSelect, ItemIdGetter, OnItemClick, OnItemStateChanged, TypeFactory
-from aiogram_dialog.widgets.text import Text, Format, Case
+from aiogram_dialog.widgets.common.when import true_condition
+from aiogram_dialog.widgets.text import Text, Const, Format, Case
 from aiogram_dialog.dialog import DialogProtocol, ChatEvent
 from aiogram_dialog.widgets.widget_event import WidgetEventProcessor, ensure_event_processor
 
@@ -18,6 +21,71 @@ PLUS_TEXT = Format("➕")
 MINUS_TEXT = Format("➖")
 DEFAULT_COUNTER_TEXT = Format("{value:.0f}")
 
+# Ключ middleware data с нажатиями ➕/➖, склеенными CounterClickCoalescingMiddleware
+COUNTER_DELTAS_KEY = "counter_deltas"
+
+
+def _static_text(text: Optional[Text]) -> Optional[str]:
+    """Строка для текста без подстановок и условий, иначе None (текст рендерится как обычно)"""
+    if not isinstance(text, (Const, Format)) or text.condition is not true_condition:
+        return None
+    if isinstance(text, Format) and ("{" in text.text or "}" in text.text):
+        return None
+    return text.text
+
+
+@lru_cache(maxsize=1024)
+def _parse_counters(raw: str) -> tuple[tuple[str, float], ...]:
+    pairs = []
+    for pair in raw.split(","):
+        item_id, _, value = pair.rpartition(":")
+        pairs.append((item_id, float(value) if "." in value or "e" in value else int(value)))
+    return tuple(pairs)
+
+
+def _format_counter(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class CounterState:
+    """
+    Счетчики виджета и число выбранных элементов.
+
+    В данных виджета хранится строка "id:count,id:count" (id без запятых)
+    только с ненулевыми (отличными от counter_default) значениями: контекст диалога целиком
+    пишется в Redis на каждый клик, поэтому он должен оставаться маленьким.
+    Число выбранных считается один раз при разборе и дальше поддерживается
+    при каждом изменении, а не пересчитывается по всем счетчикам.
+    """
+
+    __slots__ = ("values", "selected")
+
+    def __init__(self, values: Dict[str, float], default: float = 0):
+        self.values = {item_id: value for item_id, value in values.items() if value != default}
+        self.selected = sum(1 for value in self.values.values() if value > 0)
+
+    @classmethod
+    def decode(cls, raw: Union[str, Dict[str, float], None], default: float = 0) -> "CounterState":
+        if not raw:
+            return cls({}, default)
+        if isinstance(raw, dict):
+            # Состояние в старом формате {item_id: count}
+            return cls(raw, default)
+        return cls(dict(_parse_counters(raw)), default)
+
+    def encode(self) -> str:
+        return ",".join(f"{item_id}:{_format_counter(value)}" for item_id, value in self.values.items())
+
+    def get(self, item_id: str, default: float) -> float:
+        return self.values.get(item_id, default)
+
+    def set(self, item_id: str, value: float, default: float) -> None:
+        old_value = self.values.pop(item_id, default)
+        self.selected -= old_value > 0
+        if value != default:
+            self.values[item_id] = int(value) if float(value).is_integer() else value
+            self.selected += value > 0
+
 
 class MultiSelectCounter(StatefulSelect[T], Generic[T]):
     """
@@ -84,6 +152,14 @@ class MultiSelectCounter(StatefulSelect[T], Generic[T]):
         self.counter_cycle = counter_cycle
         self.counter_default = counter_default
 
+        # Неизменные подписи ➕/➖ и префиксы callback_data считаются один раз, а не на каждый рендер
+        self._plus_label = _static_text(counter_plus)
+        self._minus_label = _static_text(counter_minus)
+        self._choice_prefix = self._item_callback_data("choice:")
+        self._minus_prefix = self._item_callback_data("minus:")
+        self._value_prefix = self._item_callback_data("value:")
+        self._plus_prefix = self._item_callback_data("plus:")
+
         # Обработчики для Counter
         self.on_counter_click = ensure_event_processor(on_counter_click)
         self.on_counter_text_click = ensure_event_processor(on_counter_text_click)
@@ -97,28 +173,32 @@ class MultiSelectCounter(StatefulSelect[T], Generic[T]):
             return ord(item_id[-1]) % 2 == 1
         return self.is_checked(item_id, manager)
 
+    def _load_state(self, manager: DialogManager) -> "CounterState":
+        return CounterState.decode(self.get_widget_data(manager, ""), self.counter_default)
+
+    def _save_state(self, manager: DialogManager, state: "CounterState") -> None:
+        self.set_widget_data(manager, state.encode())
+
     def _get_counters_data(self, manager: DialogManager) -> Dict[str, float]:
-        """Получить данные счетчиков в виде {item_id: count}"""
-        return self.get_widget_data(manager, {})
+        """Получить данные счетчиков в виде {item_id: count} (только ненулевые)"""
+        return self._load_state(manager).values
 
     def _set_counters_data(self, manager: DialogManager, data: Dict[str, float]):
         """Установить данные счетчиков"""
-        self.set_widget_data(manager, data)
+        self._save_state(manager, CounterState(data, self.counter_default))
 
     def get_counter_value(self, item_id: T, manager: DialogManager) -> float:
         """Получить значение счетчика для элемента"""
-        counters = self._get_counters_data(manager)
-        item_id_str = str(item_id)
-        return counters.get(item_id_str, self.counter_default)
+        return self._load_state(manager).get(str(item_id), self.counter_default)
 
     async def set_counter_value(
             self, event: ChatEvent, item_id: T, value: float, manager: DialogManager
     ) -> None:
         """Установить значение счетчика для элемента"""
         if value == 0 or (self.counter_min <= value <= self.counter_max):
-            counters = self._get_counters_data(manager)
-            counters[str(item_id)] = value
-            self._set_counters_data(manager, counters)
+            state = self._load_state(manager)
+            state.set(str(item_id), value, self.counter_default)
+            self._save_state(manager, state)
             await self.on_counter_value_changed.process_event(
                 event, self.managed(manager), manager
             )
@@ -136,7 +216,7 @@ class MultiSelectCounter(StatefulSelect[T], Generic[T]):
 
     async def reset_checked(self, event: ChatEvent, manager: DialogManager) -> None:
         """Сбросить все счетчики"""
-        self._set_counters_data(manager, {})
+        self._save_state(manager, CounterState({}, self.counter_default))
 
     async def set_checked(
             self,
@@ -147,9 +227,9 @@ class MultiSelectCounter(StatefulSelect[T], Generic[T]):
     ) -> None:
         """Установить/снять выбор элемента"""
         item_id_str = str(item_id)
-        counters = self._get_counters_data(manager)
+        state = self._load_state(manager)
 
-        current_value = counters.get(item_id_str, self.counter_default)
+        current_value = state.get(item_id_str, self.counter_default)
         changed = False
         new_value = current_value
 
@@ -158,19 +238,17 @@ class MultiSelectCounter(StatefulSelect[T], Generic[T]):
             new_value = max(self.counter_min, self.counter_increment, 1)
             if new_value <= self.counter_max:
                 # Проверяем ограничение max_selected
-                selected_count = sum(1 for v in counters.values() if v > 0)
-                if self.max_selected == 0 or self.max_selected > selected_count:
-                    counters[item_id_str] = new_value
+                if self.max_selected == 0 or self.max_selected > state.selected:
+                    state.set(item_id_str, new_value, self.counter_default)
                     changed = True
         elif not checked and current_value > 0:
             # Если снимаем выбор
-            selected_count = sum(1 for v in counters.values() if v > 0)
-            if selected_count > self.min_selected:
-                counters[item_id_str] = 0
+            if state.selected > self.min_selected:
+                state.set(item_id_str, 0, self.counter_default)
                 changed = True
 
         if changed:
-            self._set_counters_data(manager, counters)
+            self._save_state(manager, state)
             # Вызываем обработчики
             await self.on_counter_value_changed.process_event(
                 event, self.managed(manager), manager
@@ -186,7 +264,8 @@ class MultiSelectCounter(StatefulSelect[T], Generic[T]):
     ):
         """Изменить значение счетчика"""
         item_id_str = str(item_id)
-        current_value = self.get_counter_value(item_id, manager)
+        state = self._load_state(manager)
+        current_value = state.get(item_id_str, self.counter_default)
 
         if current_value == 0:
             # Если счетчик равен 0, просто применяем delta
@@ -217,14 +296,11 @@ class MultiSelectCounter(StatefulSelect[T], Generic[T]):
             new_selected = new_value > 0
 
             if old_selected != new_selected:
-                counters = self._get_counters_data(manager)
-                selected_count = sum(1 for v in counters.values() if v > 0)
-
                 if new_selected:  # Становится выбранным
-                    if self.max_selected > 0 and selected_count >= self.max_selected:
+                    if self.max_selected > 0 and state.selected >= self.max_selected:
                         return
                 else:  # Перестает быть выбранным
-                    if selected_count <= self.min_selected:
+                    if state.selected <= self.min_selected:
                         return
 
             await self.set_counter_value(callback, item_id, new_value, manager)
@@ -233,74 +309,120 @@ class MultiSelectCounter(StatefulSelect[T], Generic[T]):
             if old_selected != new_selected:
                 await self._process_on_state_changed(callback, item_id_str, manager)
 
+    async def _apply_counter_deltas(
+            self,
+            callback: CallbackQuery,
+            deltas: Dict[str, int],
+            manager: DialogManager,
+    ) -> None:
+        """
+        Применить накопленные нажатия {item_id: шагов ±} как последовательные
+        клики: ограничения и cycle срабатывают так же, но контекст сохраняется
+        и окно перерисовывается один раз.
+        """
+        for item_id_str, steps in deltas.items():
+            item_id = self.type_factory(item_id_str)
+            step = self.counter_increment if steps > 0 else -self.counter_increment
+            for _ in range(abs(steps)):
+                await self._change_counter_value(callback, item_id, step, manager)
+
+    def _rows_per_item(self) -> int:
+        return 2 if self.counter_minus or self.counter_text or self.counter_plus else 1
+
+    def get_rows_count(self, data: dict, manager: DialogManager) -> int:
+        """Число рядов клавиатуры без рендера (для PagedScrollingGroup)"""
+        return len(self._get_items(data)) * self._rows_per_item()
+
+    def _get_items(self, data: dict) -> Sequence:
+        items = self.items_getter(data)
+        return items if isinstance(items, Sequence) else list(items)
+
     async def _render_keyboard(
             self,
             data: dict,
             manager: DialogManager,
     ) -> RawKeyboard:
+        return await self.render_rows(data, manager, 0, self.get_rows_count(data, manager))
+
+    async def render_rows(
+            self,
+            data: dict,
+            manager: DialogManager,
+            start: int,
+            stop: int,
+    ) -> RawKeyboard:
+        """Отрисовать только ряды [start, stop) — элементы текущей страницы"""
+        rows_per_item = self._rows_per_item()
+        first = start // rows_per_item
+        last = -(-stop // rows_per_item)
+        items = self._get_items(data)
+        counters = self._get_counters_data(manager)
+
         keyboard = []
-        items = self.items_getter(data)
+        for pos in range(first, min(last, len(items))):
+            keyboard.extend(await self._render_item(pos, items[pos], data, counters, manager))
 
-        for pos, item in enumerate(items):
-            item_data = {
-                "data": data,
-                "item": item,
-                "pos": pos + 1,
-                "pos0": pos,
-            }
-            item_id = str(self.item_id_getter(item))
-
-            # Текст для кнопки выбора
-            checked = self.is_checked(item_id, manager)
-            text = self.checked_text if checked else self.unchecked_text
-            choice_text = await text.render_text(item_data, manager)
-
-            # Значение счетчика
-            counter_value = self.get_counter_value(item_id, manager)
-
-            # --- ПЕРВЫЙ РЯД: кнопка выбора (широкая) ---
-            row1 = [
-                InlineKeyboardButton(
-                    text=choice_text,
-                    callback_data=self._item_callback_data(f"choice:{item_id}"),
-                )
-            ]
-            keyboard.append(row1)
-
-            # --- ВТОРОЙ РЯД: кнопки счетчика (минус, значение, плюс) ---
-            row2 = []
-
-            # Кнопка минус (если включена)
-            if self.counter_minus:
+        offset = first * rows_per_item
+        return keyboard[start - offset:stop - offset]
+
+    async def _render_item(
+            self,
+            pos: int,
+            item: T,
+            data: dict,
+            counters: Dict[str, float],
+            manager: DialogManager,
+    ) -> RawKeyboard:
+        item_data = {
+            "data": data,
+            "item": item,
+            "pos": pos + 1,
+            "pos0": pos,
+        }
+        item_id = str(self.item_id_getter(item))
+
+        # Значение счетчика
+        counter_value = counters.get(item_id, self.counter_default)
+
+        # Текст для кнопки выбора
+        if manager.is_preview():
+            checked = ord(item_id[-1]) % 2 == 1
+        else:
+            checked = counter_value > 0
+        text = self.checked_text if checked else self.unchecked_text
+        choice_text = await text.render_text(item_data, manager)
+
+        # --- ПЕРВЫЙ РЯД: кнопка выбора (широкая) ---
+        keyboard = [[
+            InlineKeyboardButton(text=choice_text, callback_data=self._choice_prefix + item_id)
+        ]]
+
+        # --- ВТОРОЙ РЯД: кнопки счетчика (минус, значение, плюс) ---
+        row2 = []
+
+        # Кнопка минус (если включена)
+        if self.counter_minus:
+            minus_text = self._minus_label
+            if minus_text is None:
                 minus_text = await self.counter_minus.render_text(item_data, manager)
-                row2.append(InlineKeyboardButton(
-                    text=minus_text,
-                    callback_data=self._item_callback_data(f"minus:{item_id}"),
-                ))
-
-            # Кнопка со значением счетчика (если включена)
-            if self.counter_text:
-                counter_data = {**item_data, "value": counter_value}
-                value_text = await self.counter_text.render_text(counter_data, manager)
-                row2.append(InlineKeyboardButton(
-                    text=value_text,
-                    callback_data=self._item_callback_data(f"value:{item_id}"),
-                ))
-
-            # Кнопка плюс (если включена)
-            if self.counter_plus:
+            row2.append(InlineKeyboardButton(text=minus_text, callback_data=self._minus_prefix + item_id))
+
+        # Кнопка со значением счетчика (если включена)
+        if self.counter_text:
+            counter_data = {**item_data, "value": counter_value}
+            value_text = await self.counter_text.render_text(counter_data, manager)
+            row2.append(InlineKeyboardButton(text=value_text, callback_data=self._value_prefix + item_id))
+
+        # Кнопка плюс (если включена)
+        if self.counter_plus:
+            plus_text = self._plus_label
+            if plus_text is None:
                 plus_text = await self.counter_plus.render_text(item_data, manager)
-                row2.append(InlineKeyboardButton(
-                    text=plus_text,
-                    callback_data=self._item_callback_data(f"plus:{item_id}"),
-                ))
+            row2.append(InlineKeyboardButton(text=plus_text, callback_data=self._plus_prefix + item_id))
 
-            # Добавляем второй ряд только если есть кнопки счетчика
-            if row2:
-                keyboard.append(row2)
-
-            # --- Опционально: добавляем пустую строку-разделитель между элементами ---
-            # keyboard.append([])
+        # Добавляем второй ряд только если есть кнопки счетчика
+        if row2:
+            keyboard.append(row2)
 
         return keyboard
 
@@ -324,22 +446,18 @@ class MultiSelectCounter(StatefulSelect[T], Generic[T]):
         if action_type == "choice":
             # Вызываем родительский метод для обработки клика
             return await super()._process_item_callback(callback, item_id_str, dialog, manager)
-        elif action_type == "minus":
-            # Уменьшение счетчика
-            await self.on_counter_click.process_event(
-                callback, self.managed(manager), manager
-            )
-            await self._change_counter_value(
-                callback, item_id, -self.counter_increment, manager
-            )
-        elif action_type == "plus":
-            # Увеличение счетчика
+        elif action_type in ("minus", "plus"):
             await self.on_counter_click.process_event(
                 callback, self.managed(manager), manager
             )
-            await self._change_counter_value(
-                callback, item_id, self.counter_increment, manager
-            )
+            deltas = manager.middleware_data.get(COUNTER_DELTAS_KEY)
+            if deltas is None:
+                # Уменьшение или увеличение счетчика
+                step = self.counter_increment if action_type == "plus" else -self.counter_increment
+                await self._change_counter_value(callback, item_id, step, manager)
+            else:
+                # Несколько нажатий, склеенных CounterClickCoalescingMiddleware
+                await self._apply_counter_deltas(callback, deltas, manager)
         elif action_type == "value":
             # Клик по значению счетчика
             await self.on_counter_text_click.process_event(
@@ -400,4 +518,4 @@ class ManagedMultiSelectCounter(ManagedWidget[MultiSelectCounter[T]], Generic[T]
 
     def get_counters_data(self) -> Dict[str, float]:
         """Получить все данные счетчиков"""
-        return self.widget._get_counters_data(self.manager)
+        return dict(self.widget._get_counters_data(self.manager))
@@ -0,0 +1,79 @@
+from typing import Protocol, runtime_checkable
+
+from aiogram_dialog import DialogManager
+from aiogram_dialog.api.internal import RawKeyboard
+from aiogram_dialog.widgets.kbd import Keyboard, ScrollingGroup
+
+
+@runtime_checkable
+class PagedKeyboard(Protocol):
+    """Клавиатура, которая может отрисовать только часть своих рядов"""
+
+    def get_rows_count(self, data: dict, manager: DialogManager) -> int:
+        ...
+
+    async def render_rows(self, data: dict, manager: DialogManager, start: int, stop: int) -> RawKeyboard:
+        ...
+
+
+class PagedScrollingGroup(ScrollingGroup):
+    """
+    ScrollingGroup, который рендерит только текущую страницу.
+
+    Дочерние виджеты с get_rows_count/render_rows (например, MultiSelectCounter)
+    сообщают число своих рядов и рисуют лишь видимый срез, остальные
+    рендерятся целиком, как в обычном ScrollingGroup. При заданном width
+    ряды перестраиваются после рендера, поэтому группа работает как обычная.
+    """
+
+    async def _measure(
+            self,
+            data: dict,
+            manager: DialogManager,
+    ) -> list[tuple[Keyboard, int, RawKeyboard | None]]:
+        parts = []
+        for button in self.buttons:
+            if not button.is_(data, manager):
+                continue
+            if isinstance(button, PagedKeyboard):
+                parts.append((button, button.get_rows_count(data, manager), None))
+            else:
+                keyboard = await button.render_keyboard(data, manager)
+                parts.append((button, len(keyboard), keyboard))
+        return parts
+
+    def _pages_for_rows(self, rows: int) -> int:
+        return rows // self.height + bool(rows % self.height)
+
+    async def _render_keyboard(
+            self,
+            data: dict,
+            manager: DialogManager,
+    ) -> RawKeyboard:
+        if self.width is not None or not self.height:
+            return await super()._render_keyboard(data, manager)
+
+        parts = await self._measure(data, manager)
+        pages = self._pages_for_rows(sum(rows for _, rows, _ in parts))
+        page = min(max(pages - 1, 0), await self.get_page(manager))
+        start, stop = page * self.height, (page + 1) * self.height
+
+        keyboard: RawKeyboard = []
+        offset = 0
+        for button, rows, rendered in parts:
+            low, high = max(start, offset), min(stop, offset + rows)
+            if low < high:
+                if rendered is None:
+                    keyboard += await button.render_rows(data, manager, low - offset, high - offset)
+                else:
+                    keyboard += rendered[low - offset:high - offset]
+            offset += rows
+
+        return keyboard + await self._render_pager(pages, manager)
+
+    async def get_page_count(self, data: dict, manager: DialogManager) -> int:
+        if self.width is not None or not self.height:
+            return await super().get_page_count(data, manager)
+
+        parts = await self._measure(data, manager)
+        return self._pages_for_rows(sum(rows for _, rows, _ in parts))
@@ -46,7 +46,7 @@ async def command_start_handler(
             language_code=message.from_user.language_code,
         )
 
-        await notify_admins_about_new_user(bot, session, user_row)
+        await notify_admins_about_new_user(user_row)
     else:
         user_row: UserModel = await user_rep.create_or_update_user(
             telegram_id=message.from_user.id,
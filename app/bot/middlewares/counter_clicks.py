@@ -0,0 +1,147 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Any
+from collections.abc import Awaitable, Callable, Hashable
+
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery, TelegramObject
+from aiogram_dialog.utils import remove_intent_id
+
+from app.bot.dialogs.utils.message_manager import message_manager
+from app.bot.dialogs.widgets.MultiSelectCounter import COUNTER_DELTAS_KEY
+
+logger = logging.getLogger(__name__)
+
+COUNTER_ACTIONS = {"plus": 1, "minus": -1}
+
+
+class CounterClickCoalescer:
+    """
+    Склеивает быстрые нажатия ➕/➖ счетчиков MultiSelectCounter.
+
+    Первое нажатие на сообщении открывает окно длиной window секунд, нажатия
+    того же пользователя на том же сообщении внутри окна только добавляют
+    свое ±1 к пачке и дальше не идут: ни контекст диалога из Redis, ни геттер,
+    ни editMessageText для них не выполняются. По окончании окна первое
+    нажатие обрабатывается один раз с суммарными изменениями в
+    data["counter_deltas"] ({item_id: число шагов}), которые применяет виджет.
+
+    На каждый callback отвечаем сразу, чтобы кнопки не крутились, и помечаем
+    его в message_manager, чтобы aiogram_dialog не отвечал на первое нажатие
+    повторно. Окно ждется до сериализации апдейтов чата: в режиме воркеров
+    collect вызывается до ChatLocks, иначе — из middleware.
+    """
+
+    def __init__(self, widget_ids: tuple[str, ...] = ("multi_counter",), window: float = 0.3):
+        self.prefixes = tuple(f"{widget_id}:" for widget_id in widget_ids)
+        self.window = window
+        self._batches: dict[Hashable, dict[str, int]] = {}
+
+    def _parse(self, callback: CallbackQuery) -> tuple[str, int] | None:
+        """(item_id, ±1) для нажатия ➕/➖ отслеживаемого виджета"""
+        if not callback.data:
+            return None
+        _, data = remove_intent_id(callback.data)
+        for prefix in self.prefixes:
+            if data.startswith(prefix):
+                action, _, item_id = data[len(prefix):].partition(":")
+                step = COUNTER_ACTIONS.get(action)
+                return (item_id, step) if step is not None and item_id else None
+        return None
+
+    def is_counter_click(self, callback: CallbackQuery) -> bool:
+        return self._parse(callback) is not None
+
+    @staticmethod
+    def batch_key(callback: CallbackQuery) -> Hashable:
+        if callback.message is not None:
+            return callback.from_user.id, callback.message.chat.id, callback.message.message_id
+        return callback.from_user.id, callback.inline_message_id
+
+    async def collect(self, callback: CallbackQuery) -> dict[str, int] | None:
+        """
+        Ответить на нажатие и добавить его в пачку.
+
+        Для первого нажатия ждет конца окна и возвращает ненулевые суммарные
+        изменения, для нажатий, ушедших в чужую пачку, сразу возвращает None.
+        """
+        item_id, step = self._parse(callback)
+        key = self.batch_key(callback)
+
+        batch = self._batches.get(key)
+        if batch is not None:
+            # Окно открыто: нажатие уйдет вместе с первым
+            batch[item_id] = batch.get(item_id, 0) + step
+            await self._answer(callback)
+            return None
+
+        batch = self._batches[key] = {item_id: step}
+        await self._answer(callback)
+
+        try:
+            await asyncio.sleep(self.window)
+        finally:
+            if self._batches.get(key) is batch:
+                self._batches.pop(key, None)
+
+        deltas = {item: steps for item, steps in batch.items() if steps}
+        logger.debug("Counter clicks for %s: %s", key, deltas)
+        return deltas
+
+    @staticmethod
+    async def _answer(callback: CallbackQuery) -> None:
+        try:
+            await callback.answer()
+        except Exception as e:
+            logger.warning("Error answering counter callback %s: %s", callback.id, str(e))
+        message_manager.mark_answered(callback.id)
+
+
+class CounterClickCoalescingMiddleware(BaseMiddleware):
+    """
+    Склейка нажатий ➕/➖ внутри диспетчера, когда апдейты обрабатываются без
+    ChatLocks. Пачки одного сообщения обрабатываются по очереди.
+
+    Если в data уже есть counter_deltas, нажатия склеил воркер до ChatLocks
+    и апдейт проходит дальше как есть.
+
+    Регистрируется на dp.callback_query до setup_dialogs, чтобы срабатывать
+    раньше загрузки контекста диалога.
+    """
+
+    def __init__(self, coalescer: CounterClickCoalescer | None = None):
+        self.coalescer = coalescer or CounterClickCoalescer()
+        self._locks: dict[Hashable, asyncio.Lock] = {}
+        self._waiters: dict[Hashable, int] = defaultdict(int)
+
+    async def __call__(
+            self,
+            handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+            event: TelegramObject,
+            data: dict[str, Any],
+    ) -> Any:
+        if (
+                not isinstance(event, CallbackQuery)
+                or COUNTER_DELTAS_KEY in data
+                or not self.coalescer.is_counter_click(event)
+        ):
+            return await handler(event, data)
+
+        deltas = await self.coalescer.collect(event)
+        if not deltas:
+            return None
+
+        key = self.coalescer.batch_key(event)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        self._waiters[key] += 1
+        try:
+            # Следующая пачка этого сообщения ждет, пока обработается предыдущая
+            async with lock:
+                data[COUNTER_DELTAS_KEY] = deltas
+                return await handler(event, data)
+        finally:
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                del self._waiters[key]
+                del self._locks[key]
@@ -4,11 +4,65 @@ from collections.abc import Awaitable, Callable
 
 from aiogram import BaseMiddleware
 from aiogram.types import TelegramObject
-from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.bot.middlewares.update_context import get_update_context
 
 logger = logging.getLogger(__name__)
 
 
+class LazySession:
+    """
+    Прокси AsyncSession: сессия создается при первом обращении к любому ее атрибуту.
+
+    Апдейты, которым база не нужна (/help, my_chat_member, теневой бан,
+    пользователь из кеша), не создают сессию и не занимают соединение пула.
+    """
+
+    __slots__ = ("_session_pool", "_session")
+
+    def __init__(self, session_pool: async_sessionmaker):
+        self._session_pool = session_pool
+        self._session: AsyncSession | None = None
+
+    @property
+    def used(self) -> bool:
+        return self._session is not None
+
+    def __getattr__(self, name: str) -> Any:
+        if self._session is None:
+            self._session = self._session_pool()
+            logger.debug("Session created on first use")
+        return getattr(self._session, name)
+
+    async def close(self) -> None:
+        # После close() AsyncSession можно использовать снова, поэтому
+        # цепочка errors может переиспользовать сессию уже завершенной цепочки update
+        if self._session is not None:
+            await self._session.close()
+
+
+class SessionStats:
+    """Счетчики процесса: сколько апдейтов действительно использовали сессию"""
+
+    __slots__ = ("updates", "sessions_used")
+
+    def __init__(self):
+        self.updates = 0
+        self.sessions_used = 0
+
+    def record(self, used: bool) -> None:
+        self.updates += 1
+        self.sessions_used += used
+
+    @property
+    def usage_ratio(self) -> float:
+        return self.sessions_used / self.updates if self.updates else 0.0
+
+
+session_stats = SessionStats()
+
+
 class DbSessionMiddleware(BaseMiddleware):
     def __init__(self, session_pool: async_sessionmaker):
         self.session_pool = session_pool
@@ -19,7 +73,24 @@ class DbSessionMiddleware(BaseMiddleware):
             event: TelegramObject,
             data: Dict[str, Any]
     ) -> Any:
-        async with self.session_pool() as session:
-            data["session"] = session
-            logger.debug("Session created in middleware pool")
-            return await handler(event, data)
\ No newline at end of file
+        context = get_update_context(data)
+        if context.session is not None:
+            data["session"] = context.session
+            try:
+                return await handler(event, data)
+            finally:
+                await context.session.close()
+
+        session = context.session = LazySession(self.session_pool)
+        data["session"] = session
+        try:
+            return await handler(event, data)
+        finally:
+            await session.close()
+            session_stats.record(session.used)
+            logger.debug(
+                "Session %s for update (%s of %s updates used the database)",
+                "used" if session.used else "not used",
+                session_stats.sessions_used,
+                session_stats.updates,
+            )
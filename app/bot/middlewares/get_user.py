@@ -6,6 +6,8 @@ from aiogram import BaseMiddleware
 from aiogram.types import TelegramObject, User
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.bot.middlewares.update_context import get_update_context
+from app.infrastructure.cache.user_cache import UserSnapshot, user_cache
 from app.infrastructure.database.models.user import UserModel
 from app.infrastructure.database.query.user_queries import UserRepository
 
@@ -24,6 +26,18 @@ class GetUserMiddleware(BaseMiddleware):
         if user is None:
             return await handler(event, data)
 
+        context = get_update_context(data)
+        if context.user_loaded:
+            data["user_row"] = context.user_row
+            return await handler(event, data)
+
+        user_row: UserSnapshot | None = await user_cache.get(user.id)
+        if user_row is not None:
+            data["user_row"] = context.user_row = user_row
+            context.user_loaded = True
+            logger.debug("User %s loaded from cache", user.id)
+            return await handler(event, data)
+
         session: AsyncSession = data.get("session")
 
         if session is None:
@@ -32,14 +46,19 @@ class GetUserMiddleware(BaseMiddleware):
 
         try:
             user_repo = UserRepository(session)
-            user_row: UserModel | None = await user_repo.get_user_by_telegram_id(user.id)
+            user_model: UserModel | None = await user_repo.get_user_by_telegram_id(user.id)
 
-            data["user_row"] = user_row
-            if user_row is None:
+            if user_model is None:
+                user_row = None
                 logger.debug("User not found in database.")
             else:
+                user_row = UserSnapshot.from_model(user_model)
+                await user_cache.set(user_row)
                 logger.debug("User %s loaded successfully", user.id)
 
+            data["user_row"] = context.user_row = user_row
+            context.user_loaded = True
+
         except Exception as e:
             logger.exception("Error in GetUserMiddleware: %s", e)
             raise
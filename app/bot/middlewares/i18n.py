@@ -6,7 +6,8 @@ from aiogram import BaseMiddleware
 from aiogram.types import TelegramObject, User
 from fluentogram import TranslatorHub
 
-from app.infrastructure.database.models.user import UserModel
+from app.bot.middlewares.update_context import get_update_context
+from app.infrastructure.cache.user_cache import UserSnapshot
 
 logger = logging.getLogger(__name__)
 
@@ -18,7 +19,12 @@ class TranslatorRunnerMiddleware(BaseMiddleware):
             event: TelegramObject,
             data: Dict[str, Any],
     ) -> Any:
-        user_row: UserModel = data.get("user_row")
+        context = get_update_context(data)
+        if context.i18n is not None:
+            data["i18n"] = context.i18n
+            return await handler(event, data)
+
+        user_row: UserSnapshot | None = data.get("user_row")
         default_locale = data.get("default_locale")
 
         if user_row and user_row.language_code:
@@ -34,6 +40,6 @@ class TranslatorRunnerMiddleware(BaseMiddleware):
             )
 
         hub: TranslatorHub = data.get("translator_hub")
-        data["i18n"] = hub.get_translator_by_locale(locale)
+        data["i18n"] = context.i18n = hub.get_translator_by_locale(locale)
         logger.debug("Successful loaded translator for language: %s", locale)
         return await handler(event, data)
@@ -6,7 +6,7 @@ from aiogram import BaseMiddleware
 from aiogram.types import TelegramObject
 
 from app.infrastructure.database.enums.user_roles import UserRole
-from app.infrastructure.database.models.user import UserModel
+from app.infrastructure.cache.user_cache import UserSnapshot
 
 logger = logging.getLogger(__name__)
 
@@ -18,7 +18,7 @@ class ShadowBanMiddleware(BaseMiddleware):
             event: TelegramObject,
             data: dict[str, Any],
     ) -> Any:
-        user_row: UserModel | None = data.get("user_row")
+        user_row: UserSnapshot | None = data.get("user_row")
         if user_row is None:
             logger.warning(
                 "Cannot check for shadow ban. The 'user_row' "
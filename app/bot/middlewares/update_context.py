@@ -0,0 +1,34 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from fluentogram import TranslatorRunner
+
+from app.infrastructure.cache.user_cache import UserSnapshot
+
+if TYPE_CHECKING:
+    from app.bot.middlewares.database import LazySession
+
+UPDATE_CONTEXT_KEY = "update_context"
+
+
+@dataclass(slots=True)
+class UpdateContext:
+    """
+    Результаты middleware, общие для одного апдейта Telegram.
+
+    Одни и те же middleware зарегистрированы на dp.update, dp.errors и
+    на наблюдателе событий диалогов. Цепочки errors и aiogd_update получают
+    data внешней цепочки update, поэтому сессия, user_row и i18n
+    вычисляются один раз и дальше берутся отсюда.
+    """
+    session: "LazySession | None" = None
+    user_row: UserSnapshot | None = None
+    user_loaded: bool = False
+    i18n: TranslatorRunner | None = None
+
+
+def get_update_context(data: dict[str, Any]) -> UpdateContext:
+    context = data.get(UPDATE_CONTEXT_KEY)
+    if context is None:
+        context = data[UPDATE_CONTEXT_KEY] = UpdateContext()
+    return context
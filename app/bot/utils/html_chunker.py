@@ -0,0 +1,117 @@
+import html
+import re
+from collections.abc import Iterable, Iterator
+
+# Лимит Telegram на длину текста после разбора сущностей, в UTF-16 code units
+TELEGRAM_MESSAGE_LIMIT = 4096
+
+_TOKEN_RE = re.compile(r"<[^>]*>|[^<]+")
+_TAG_NAME_RE = re.compile(r"<\s*(/?)\s*([a-zA-Z0-9-]+)")
+_UNIT_RE = re.compile(r"&#?\w+;|.", re.DOTALL)
+
+
+def visible_length(text: str) -> int:
+    """Длина текста без HTML-разметки так, как ее считает Telegram"""
+    return len(html.unescape(text).encode("utf-16-le")) // 2
+
+
+class HtmlChunker:
+    """
+    Потоковая нарезка HTML-текста на сообщения не длиннее limit.
+
+    Фрагменты накапливаются в списке и склеиваются один раз при выдаче части.
+    Фрагмент по возможности не разрывается: если он не помещается в текущую
+    часть, часть выдается, и фрагмент начинает следующую. Слишком длинный
+    фрагмент режется по последнему переводу строки (или по символу),
+    но никогда внутри тега или HTML-сущности. Открытые на границе теги
+    закрываются в конце части и открываются заново в начале следующей.
+    """
+
+    def __init__(self, limit: int = TELEGRAM_MESSAGE_LIMIT):
+        self.limit = limit
+        self._parts: list[str] = []
+        self._length = 0
+        self._open_tags: list[tuple[str, str]] = []
+
+    def feed(self, fragment: str) -> list[str]:
+        """Добавить фрагмент и вернуть части, которые уже готовы к отправке"""
+        tokens = _TOKEN_RE.findall(fragment)
+        fragment_length = sum(visible_length(token) for token in tokens if not token.startswith("<"))
+
+        ready = []
+        if self._length and self._length + fragment_length > self.limit:
+            ready.append(self._cut())
+
+        if self._length + fragment_length <= self.limit:
+            for token in tokens:
+                self._append(token)
+        else:
+            for token in tokens:
+                if token.startswith("<"):
+                    self._append(token)
+                else:
+                    self._append_split(token, ready)
+        return ready
+
+    def finish(self) -> list[str]:
+        """Вернуть последнюю часть, если в ней есть текст"""
+        return [self._cut()] if self._length else []
+
+    def _append(self, token: str, length: int | None = None) -> None:
+        self._parts.append(token)
+        if not token.startswith("<"):
+            self._length += visible_length(token) if length is None else length
+            return
+
+        match = _TAG_NAME_RE.match(token)
+        if match is None:
+            return
+        closing, name = match.group(1), match.group(2).lower()
+        if not closing:
+            self._open_tags.append((name, token))
+            return
+        for index in range(len(self._open_tags) - 1, -1, -1):
+            if self._open_tags[index][0] == name:
+                del self._open_tags[index:]
+                break
+
+    def _append_split(self, text: str, ready: list[str]) -> None:
+        units: list[str] = []
+        lengths: list[int] = []
+        buffered = 0
+        last_newline = -1
+
+        for unit in _UNIT_RE.findall(text):
+            unit_length = visible_length(unit)
+            if self._length + buffered + unit_length > self.limit and (units or self._length):
+                split_at = last_newline + 1 if last_newline >= 0 else len(units)
+                if split_at:
+                    self._append("".join(units[:split_at]), sum(lengths[:split_at]))
+                ready.append(self._cut())
+                units, lengths = units[split_at:], lengths[split_at:]
+                buffered = sum(lengths)
+                last_newline = -1
+
+            units.append(unit)
+            lengths.append(unit_length)
+            buffered += unit_length
+            if unit == "\n":
+                last_newline = len(units) - 1
+
+        if units:
+            self._append("".join(units), buffered)
+
+    def _cut(self) -> str:
+        closing = "".join(f"</{name}>" for name, _ in reversed(self._open_tags))
+        text = "".join(self._parts) + closing
+        self._parts = [opening for _, opening in self._open_tags]
+        self._length = 0
+        return text
+
+
+def chunk_html(fragments: Iterable[str], limit: int = TELEGRAM_MESSAGE_LIMIT) -> Iterator[str]:
+    """Нарезать поток HTML-фрагментов на готовые к отправке сообщения"""
+    chunker = HtmlChunker(limit)
+    for fragment in fragments:
+        yield from chunker.feed(fragment)
+    yield from chunker.finish()
@@ -0,0 +1,333 @@
+import csv
+import io
+import json
+import math
+import re
+from collections.abc import Iterable, Iterator
+from html import escape
+from typing import Any, BinaryIO
+
+from app.infrastructure.database.query.menu_import_queries import (
+    CategorySpec, DishSpec, MenuImportReport, MenuSpec
+)
+
+# Файл больше мегабайта — это уже не меню одного заведения
+MAX_MENU_FILE_SIZE = 1024 * 1024
+MAX_NAME_LENGTH = 255
+MAX_PRICE = 1_000_000
+MAX_REPORTED_ERRORS = 20
+
+CSV_REQUIRED_COLUMNS = ("restaurant", "category", "dish", "price")
+CSV_OPTIONAL_COLUMNS = ("category_order", "dish_order")
+
+_PRICE_RE = re.compile(r"^\d+([.,]\d{1,2})?$")
+
+
+class MenuFileError(ValueError):
+    """Файл меню не прошел проверку; errors — сообщения с номерами строк"""
+
+    def __init__(self, errors: list[str]):
+        self.errors = errors
+        super().__init__("\n".join(errors))
+
+
+def _parse_name(value: Any, field: str) -> str:
+    name = str(value).strip() if value is not None else ""
+    if not name:
+        raise ValueError(f"не заполнено поле {field}")
+    if len(name) > MAX_NAME_LENGTH:
+        raise ValueError(f"{field} длиннее {MAX_NAME_LENGTH} символов")
+    return name
+
+
+def _parse_price(value: Any) -> float:
+    if isinstance(value, bool):
+        raise ValueError(f"неверная цена '{value}'")
+    if isinstance(value, (int, float)):
+        price = float(value)
+    else:
+        text = str(value).strip() if value is not None else ""
+        if not _PRICE_RE.match(text):
+            raise ValueError(f"неверная цена '{text}', используйте числа, например: 200 или 500.50")
+        price = float(text.replace(",", "."))
+
+    # NaN и бесконечность (1e400 в JSON) не проходят ни одно сравнение честно
+    if not math.isfinite(price):
+        raise ValueError(f"неверная цена '{value}'")
+    if price <= 0:
+        raise ValueError(f"цена должна быть больше 0: '{value}'")
+    if price > MAX_PRICE:
+        raise ValueError(f"цена не может быть больше {MAX_PRICE}: '{value}'")
+    return round(price, 2)
+
+
+def _parse_order(value: Any) -> int | None:
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    try:
+        order = int(str(value).strip())
+    except ValueError:
+        raise ValueError(f"порядок должен быть целым числом: '{value}'")
+    if order < 0:
+        raise ValueError(f"порядок не может быть отрицательным: '{value}'")
+    return order
+
+
+class _MenuBuilder:
+    """
+    Собирает меню из строк файла по мере чтения и копит ошибки всех строк,
+    чтобы администратор исправил файл за один раз.
+    """
+
+    def __init__(self):
+        self.restaurant: str | None = None
+        self.errors: list[str] = []
+        self.errors_count = 0
+        # категория -> (порядок, {блюдо: (цена, порядок)})
+        self._categories: dict[str, tuple[int | None, dict[str, tuple[float, int | None]]]] = {}
+
+    def error(self, where: str, message: str) -> None:
+        self.errors_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"{where}: {message}")
+
+    def set_restaurant(self, where: str, value: Any) -> bool:
+        try:
+            restaurant = _parse_name(value, "restaurant")
+        except ValueError as error:
+            self.error(where, str(error))
+            return False
+
+        if self.restaurant is None:
+            self.restaurant = restaurant
+        elif self.restaurant != restaurant:
+            self.error(where, f"в одном файле можно загрузить только одно заведение ({self.restaurant})")
+            return False
+        return True
+
+    def add_category(self, where: str, name: Any, order: Any) -> str | None:
+        try:
+            name = _parse_name(name, "category")
+            order = _parse_order(order)
+        except ValueError as error:
+            self.error(where, str(error))
+            return None
+
+        known_order, dishes = self._categories.get(name, (None, {}))
+        if order is not None and known_order is not None and order != known_order:
+            self.error(where, f"у категории '{name}' уже указан порядок {known_order}")
+            return None
+        self._categories[name] = (known_order if order is None else order, dishes)
+        return name
+
+    def add_dish(self, where: str, category: str, name: Any, price: Any, order: Any) -> None:
+        try:
+            name = _parse_name(name, "dish")
+            price = _parse_price(price)
+            order = _parse_order(order)
+        except ValueError as error:
+            self.error(where, str(error))
+            return
+
+        dishes = self._categories[category][1]
+        if name in dishes:
+            self.error(where, f"блюдо '{name}' в категории '{category}' указано дважды")
+            return
+        dishes[name] = (price, order)
+
+    def build(self) -> MenuSpec:
+        if self.restaurant is None and not self.errors_count:
+            self.error("Файл", "не найдено ни одной строки меню")
+        if self.errors_count:
+            errors = list(self.errors)
+            if self.errors_count > len(errors):
+                errors.append(f"…и еще {self.errors_count - len(errors)} ошибок")
+            raise MenuFileError(errors)
+
+        # Без явного порядка категории и блюда идут так же, как в файле
+        categories = []
+        for category_position, (category, (category_order, dishes)) in enumerate(self._categories.items(), start=1):
+            categories.append(CategorySpec(
+                name=category,
+                display_order=category_position if category_order is None else category_order,
+                dishes=tuple(
+                    DishSpec(name=dish, price=price, display_order=position if order is None else order)
+                    for position, (dish, (price, order)) in enumerate(dishes.items(), start=1)
+                ),
+            ))
+        return MenuSpec(restaurant=self.restaurant, categories=tuple(categories))
+
+
+def parse_menu_csv(lines: Iterable[str]) -> MenuSpec:
+    """
+    Разобрать CSV построчно, не загружая файл целиком.
+
+    Первая строка — заголовок с колонками restaurant, category, dish, price
+    и необязательными category_order, dish_order. Разделитель — запятая
+    или точка с запятой (так сохраняет Excel с русской локалью).
+    """
+    lines = iter(lines)
+    builder = _MenuBuilder()
+
+    header_line = next(lines, "")
+    delimiter = ";" if header_line.count(";") > header_line.count(",") else ","
+    header = [column.strip().lower() for column in next(csv.reader([header_line], delimiter=delimiter), [])]
+
+    missing = [column for column in CSV_REQUIRED_COLUMNS if column not in header]
+    if missing:
+        raise MenuFileError([f"Строка 1: нет колонок {', '.join(missing)}"])
+    index = {column: header.index(column) for column in CSV_REQUIRED_COLUMNS + CSV_OPTIONAL_COLUMNS if column in header}
+
+    def cell(row: list[str], column: str) -> str | None:
+        position = index.get(column)
+        return row[position] if position is not None and position < len(row) else None
+
+    reader = csv.reader(lines, delimiter=delimiter)
+    for row in reader:
+        if not any(value.strip() for value in row):
+            continue
+
+        where = f"Строка {reader.line_num + 1}"
+        if not builder.set_restaurant(where, cell(row, "restaurant")):
+            continue
+        category = builder.add_category(where, cell(row, "category"), cell(row, "category_order"))
+        if category is not None:
+            builder.add_dish(where, category, cell(row, "dish"), cell(row, "price"), cell(row, "dish_order"))
+
+    return builder.build()
+
+
+def parse_menu_json(data: Any) -> MenuSpec:
+    """
+    Разобрать меню в виде
+    {"restaurant": ..., "categories": [{"name": ..., "display_order": ...,
+    "dishes": [{"name": ..., "price": ..., "display_order": ...}]}]}
+    """
+    builder = _MenuBuilder()
+    if not isinstance(data, dict) or not isinstance(data.get("categories"), list):
+        raise MenuFileError(["Ожидается объект с полями restaurant и categories"])
+
+    builder.set_restaurant("restaurant", data.get("restaurant"))
+    for category_number, category_data in enumerate(data["categories"], start=1):
+        where = f"Категория {category_number}"
+        if not isinstance(category_data, dict):
+            builder.error(where, "ожидается объект")
+            continue
+
+        category = builder.add_category(where, category_data.get("name"), category_data.get("display_order"))
+        if category is None:
+            continue
+
+        dishes = category_data.get("dishes", [])
+        if not isinstance(dishes, list):
+            builder.error(where, "dishes должен быть списком")
+            continue
+        for dish_number, dish_data in enumerate(dishes, start=1):
+            dish_where = f"{where}, блюдо {dish_number}"
+            if not isinstance(dish_data, dict):
+                builder.error(dish_where, "ожидается объект")
+                continue
+            builder.add_dish(
+                dish_where, category, dish_data.get("name"), dish_data.get("price"), dish_data.get("display_order")
+            )
+
+    return builder.build()
+
+
+def parse_price_list(text: str) -> tuple[DishSpec, ...]:
+    """
+    Разобрать прайс категории из сообщения: по блюду на строку
+    в формате "Название: цена" (или "Название; цена").
+    """
+    builder = _MenuBuilder()
+    builder.restaurant = ""
+    category = builder.add_category("", "прайс", None)
+
+    for number, line in enumerate(text.splitlines(), start=1):
+        line = line.strip()
+        if not line:
+            continue
+
+        separator = ":" if ":" in line else ";"
+        if separator not in line:
+            builder.error(f"Строка {number}", f"неверный формат '{line}', используйте 'Название: цена'")
+            continue
+        name, price = line.rsplit(separator, 1)
+        builder.add_dish(f"Строка {number}", category, name, price, None)
+
+    menu = builder.build()
+    dishes = menu.categories[0].dishes
+    if not dishes:
+        raise MenuFileError(["Введите хотя бы одно блюдо"])
+    # Порядок существующих блюд сохраняется, новые встают в конец категории
+    return tuple(DishSpec(name=dish.name, price=dish.price) for dish in dishes)
+
+
+def _reject_json_constant(name: str) -> Any:
+    raise MenuFileError([f"Некорректный JSON: значение {name} не поддерживается"])
+
+
+def parse_menu_file(file_name: str, file: BinaryIO) -> MenuSpec:
+    """Разобрать загруженный документ по расширению имени файла"""
+    extension = file_name.rsplit(".", 1)[-1].lower() if "." in file_name else ""
+    try:
+        if extension == "json":
+            return parse_menu_json(json.load(
+                io.TextIOWrapper(file, encoding="utf-8-sig"), parse_constant=_reject_json_constant
+            ))
+        if extension == "csv":
+            return parse_menu_csv(io.TextIOWrapper(file, encoding="utf-8-sig", newline=""))
+    except UnicodeDecodeError:
+        raise MenuFileError(["Файл должен быть в кодировке UTF-8"])
+    except json.JSONDecodeError as error:
+        raise MenuFileError([f"Строка {error.lineno}: некорректный JSON ({error.msg})"])
+    except csv.Error as error:
+        raise MenuFileError([f"Некорректный CSV: {error}"])
+
+    raise MenuFileError(["Поддерживаются только файлы .csv и .json"])
+
+
+def render_import_report(report: MenuImportReport) -> Iterator[str]:
+    """Фрагменты отчета об импорте или синхронизации для chunk_html"""
+    scope = escape(report.scope)
+    if report.restaurant_created:
+        yield f"✅ <b>Создано заведение {scope}</b>\n"
+    elif report.restaurant_restored:
+        yield f"✅ <b>Восстановлено заведение {scope}</b>\n"
+    else:
+        yield f"✅ <b>Меню {scope} обновлено</b>\n"
+
+    if not report.changed:
+        yield "\nИзменений нет, меню уже совпадает с прайсом.\n"
+        return
+
+    if report.categories_added:
+        yield f"\n📁 <b>Новые категории ({len(report.categories_added)}):</b>\n"
+        for name in report.categories_added:
+            yield f"• {escape(name)}\n"
+    if report.categories_updated:
+        yield f"\n📁 <b>Обновлены категории ({len(report.categories_updated)}):</b>\n"
+        for name in report.categories_updated:
+            yield f"• {escape(name)}\n"
+    if report.categories_deactivated:
+        yield f"\n🗑️ <b>Удалены категории ({len(report.categories_deactivated)}):</b>\n"
+        for name in report.categories_deactivated:
+            yield f"• {escape(name)}\n"
+
+    if report.dishes_added:
+        yield f"\n➕ <b>Добавлены блюда ({len(report.dishes_added)}):</b>\n"
+        for category, dish, price in report.dishes_added:
+            yield f"• {escape(category)} / {escape(dish)} — {price:.2f} ₽\n"
+    if report.dishes_updated:
+        yield f"\n✏️ <b>Обновлены блюда ({len(report.dishes_updated)}):</b>\n"
+        for category, dish, old_price, new_price in report.dishes_updated:
+            price = f"{new_price:.2f} ₽" if round(old_price, 2) == round(new_price, 2) \
+                else f"{old_price:.2f} → {new_price:.2f} ₽"
+            yield f"• {escape(category)} / {escape(dish)} — {price}\n"
+    if report.dishes_deactivated:
+        yield f"\n🗑️ <b>Удалены блюда ({len(report.dishes_deactivated)}):</b>\n"
+        for category, dish in report.dishes_deactivated:
+            yield f"• {escape(category)} / {escape(dish)}\n"
+
+    if report.dishes_unchanged:
+        yield f"\nБез изменений: {report.dishes_unchanged} блюд\n"
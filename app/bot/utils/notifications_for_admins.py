@@ -1,12 +1,9 @@
-import asyncio
 import logging
-from aiogram import Bot
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.filters.callback_data import CallbackData
-from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.infrastructure.database.models import UserModel
-from app.infrastructure.database.query.user_queries import UserRepository
+from app.services.scheduler import tasks
 
 logger = logging.getLogger(__name__)
 
@@ -17,13 +14,9 @@ class AdminActionCallback(CallbackData, prefix="admin"):
 
 
 async def notify_admins_about_new_user(
-        bot: Bot,
-        session: AsyncSession,
         new_user: UserModel,
 ):
     try:
-        admins = await UserRepository(session).get_active_admins()
-
         keyboard = InlineKeyboardMarkup(inline_keyboard=[
             [
                 InlineKeyboardButton(
@@ -55,19 +48,11 @@ async def notify_admins_about_new_user(
             f"Дата регистрации: {new_user.created_at.strftime('%d.%m.%Y %H:%M')}"
         )
 
-        # Отправляем сообщение всем админам
-        for admin in admins:
-            try:
-                await bot.send_message(
-                    chat_id=admin.telegram_id,
-                    text=user_info,
-                    reply_markup=keyboard,
-                    parse_mode="HTML"
-                )
-                await asyncio.sleep(0.05)
-
-            except Exception as e:
-                logger.error("Failed to send notification to admin %s: %s", admin.telegram_id, str(e))
+        # Рассылку всем админам выполняет воркер taskiq
+        await tasks.notify_admins_about_new_user.kiq(
+            text=user_info,
+            reply_markup=keyboard.model_dump(exclude_none=True),
+        )
 
     except Exception as e:
         logger.error("Error in notify_admins_about_new_user: %s", str(e))
@@ -0,0 +1,50 @@
+import asyncio
+import logging
+from typing import Any
+
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
+
+from config.config import WebhookConfig
+
+logger = logging.getLogger(__name__)
+
+
+async def run_webhook(
+        bot: Bot,
+        dp: Dispatcher,
+        config: WebhookConfig,
+        **kwargs: Any,
+) -> None:
+    """Поднимает aiohttp-сервер и принимает обновления через вебхук"""
+    if not config.base_url:
+        raise RuntimeError("WEBHOOK_BASE_URL must be set to run the bot in webhook mode.")
+
+    app = web.Application()
+    SimpleRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        secret_token=config.secret_token,
+        **kwargs,
+    ).register(app, path=config.path)
+    setup_application(app, dp, bot=bot, **kwargs)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, host=config.host, port=config.port)
+    await site.start()
+    logger.info("Webhook server started on %s:%s%s", config.host, config.port, config.path)
+
+    await bot.set_webhook(
+        url=config.url,
+        secret_token=config.secret_token,
+        allowed_updates=dp.resolve_used_update_types(),
+    )
+    logger.info("Webhook set to %s", config.url)
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+        logger.info("Webhook server stopped")
@@ -0,0 +1,303 @@
+import asyncio
+import json
+import logging
+import multiprocessing
+import signal
+import time
+from collections import defaultdict, deque
+from multiprocessing.context import BaseContext
+from multiprocessing.process import BaseProcess
+from multiprocessing.queues import Queue
+from typing import Any
+
+from aiogram import Bot, Dispatcher
+from aiogram.dispatcher.middlewares.user_context import UserContextMiddleware
+from aiogram.types import Update
+from aiohttp import web
+
+from app.bot.bot import create_bot, setup_dispatcher
+from app.bot.dialogs.widgets.MultiSelectCounter import COUNTER_DELTAS_KEY
+from app.bot.dialogs.flows import dialogs
+from app.bot.first_admin_creation import create_admin
+from app.bot.handlers import routers
+from app.bot.middlewares.counter_clicks import CounterClickCoalescer
+from app.infrastructure.cache import get_redis_pool
+from app.infrastructure.database.db import async_session_maker, engine
+from config.config import AppConfig, get_config
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+# Сколько раз воркер может упасть за WORKER_RESTART_PERIOD секунд, прежде чем супервизор остановится
+WORKER_MAX_RESTARTS = 5
+WORKER_RESTART_PERIOD = 60
+
+
+def get_shard_key(update: Update) -> int:
+    """Ключ шардирования: чат, если он есть, иначе пользователь, иначе сам update"""
+    event_context = UserContextMiddleware.resolve_event_context(update)
+    if event_context.chat_id is not None:
+        return event_context.chat_id
+    if event_context.user_id is not None:
+        return event_context.user_id
+    return update.update_id
+
+
+class ChatLocks:
+    """Блокировки по chat_id: апдейты одного чата обрабатываются строго по очереди"""
+
+    def __init__(self):
+        self._locks: dict[int, asyncio.Lock] = {}
+        self._waiters: dict[int, int] = defaultdict(int)
+
+    async def run(self, key: int, coro) -> Any:
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        self._waiters[key] += 1
+        try:
+            async with lock:
+                return await coro
+        finally:
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                del self._waiters[key]
+                del self._locks[key]
+
+
+async def _process_update(
+        dp: Dispatcher,
+        bot: Bot,
+        update: Update,
+        chat_locks: ChatLocks,
+        counter_clicks: CounterClickCoalescer,
+        **kwargs: Any,
+) -> None:
+    """
+    Обработать апдейт под блокировкой его чата.
+
+    Нажатия ➕/➖ склеиваются до блокировки: иначе окно склейки занимало бы
+    блокировку, следующие нажатия ждали бы за ней и ни одно не склеилось бы.
+    """
+    callback = update.callback_query
+    if callback is not None and counter_clicks.is_counter_click(callback):
+        deltas = await counter_clicks.collect(callback)
+        if not deltas:
+            return
+        kwargs[COUNTER_DELTAS_KEY] = deltas
+
+    await chat_locks.run(get_shard_key(update), dp.feed_update(bot, update, **kwargs))
+
+
+async def _consume_updates(index: int, queue: Queue) -> None:
+    """Цикл воркера: свои пулы Redis и Postgres, свой Dispatcher"""
+    config = get_config()
+    redis_client = await get_redis_pool(
+        host=config.redis.host,
+        port=config.redis.port,
+        db=config.redis.database,
+        username=config.redis.username,
+        password=config.redis.password,
+    )
+    bot = create_bot(config)
+    dp, bg_factory = setup_dispatcher(config, redis_client)
+
+    if index == 0:
+        await create_admin(config=config, async_session_maker=async_session_maker)
+
+    workflow_data = {"dispatcher": dp, "bots": [bot], "bg_factory": bg_factory, **dp.workflow_data}
+    await dp.emit_startup(bot=bot, **workflow_data)
+    logger.info("Worker %s started", index)
+
+    loop = asyncio.get_running_loop()
+    chat_locks = ChatLocks()
+    counter_clicks = CounterClickCoalescer()
+    tasks: set[asyncio.Task] = set()
+
+    try:
+        while True:
+            raw_update: str | None = await loop.run_in_executor(None, queue.get)
+            if raw_update is None:
+                break
+
+            update = Update.model_validate(json.loads(raw_update), context={"bot": bot})
+            task = asyncio.create_task(
+                _process_update(dp, bot, update, chat_locks, counter_clicks, bg_factory=bg_factory)
+            )
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+    finally:
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        await dp.emit_shutdown(bot=bot, **workflow_data)
+        await bot.session.close()
+        await redis_client.close()
+        await engine.dispose()
+        logger.info("Worker %s stopped", index)
+
+
+def _worker_process(index: int, queue: Queue) -> None:
+    config = get_config()
+    logging.basicConfig(
+        level=logging.getLevelName(config.logs.level_name), format=config.logs.format
+    )
+    # Останавливает супервизор: воркер дочитывает очередь до sentinel
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    asyncio.run(_consume_updates(index, queue))
+
+
+def _resolve_allowed_updates() -> list[str]:
+    dp = Dispatcher()
+    dp.include_routers(*routers, *dialogs)
+    return dp.resolve_used_update_types()
+
+
+class UpdateRouter:
+    """Раскладывает апдейты по очередям воркеров по хэшу chat_id"""
+
+    def __init__(self, queues: list[Queue]):
+        self.queues = queues
+
+    def route(self, update: Update) -> None:
+        queue = self.queues[get_shard_key(update) % len(self.queues)]
+        queue.put(update.model_dump_json(exclude_unset=True, by_alias=True))
+
+
+async def _poll_updates(bot: Bot, update_router: UpdateRouter, allowed_updates: list[str]) -> None:
+    await bot.delete_webhook()
+    offset: int | None = None
+    logger.info("Supervisor started polling")
+
+    while True:
+        try:
+            updates = await bot.get_updates(offset=offset, timeout=30, allowed_updates=allowed_updates)
+        except Exception as e:
+            logger.error("Error getting updates: %s", str(e))
+            await asyncio.sleep(1)
+            continue
+
+        for update in updates:
+            update_router.route(update)
+            offset = update.update_id + 1
+
+
+async def _serve_webhook(
+        bot: Bot,
+        config: AppConfig,
+        update_router: UpdateRouter,
+        allowed_updates: list[str],
+) -> None:
+    if not config.webhook.base_url:
+        raise RuntimeError("WEBHOOK_BASE_URL must be set to run the bot in webhook mode.")
+
+    async def handle(request: web.Request) -> web.Response:
+        if config.webhook.secret_token and request.headers.get(SECRET_HEADER) != config.webhook.secret_token:
+            return web.Response(status=401, text="Unauthorized")
+        update = Update.model_validate(await request.json(), context={"bot": bot})
+        update_router.route(update)
+        return web.Response()
+
+    app = web.Application()
+    app.router.add_post(config.webhook.path, handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host=config.webhook.host, port=config.webhook.port).start()
+    await bot.set_webhook(
+        url=config.webhook.url,
+        secret_token=config.webhook.secret_token,
+        allowed_updates=allowed_updates,
+    )
+    logger.info("Supervisor webhook server started on %s:%s", config.webhook.host, config.webhook.port)
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+async def _receive_updates(config: AppConfig, update_router: UpdateRouter) -> None:
+    bot = create_bot(config)
+    allowed_updates = _resolve_allowed_updates()
+    try:
+        if config.bot.run_mode == "webhook":
+            await _serve_webhook(bot, config, update_router, allowed_updates)
+        else:
+            await _poll_updates(bot, update_router, allowed_updates)
+    finally:
+        await bot.session.close()
+
+
+def _start_worker(context: BaseContext, index: int, queue: Queue) -> BaseProcess:
+    process = context.Process(target=_worker_process, args=(index, queue), name=f"bot-worker-{index}")
+    process.start()
+    return process
+
+
+async def _watch_workers(
+        context: BaseContext,
+        processes: list[BaseProcess],
+        queues: list[Queue],
+        interval: float = 1.0,
+) -> None:
+    """
+    Перезапускает упавший воркер на той же очереди, чтобы чаты его шарда
+    не остались без ответа. Если воркер падает чаще WORKER_MAX_RESTARTS раз
+    за WORKER_RESTART_PERIOD секунд, останавливает супервизор.
+    """
+    restarts: list[deque[float]] = [deque() for _ in processes]
+    while True:
+        await asyncio.sleep(interval)
+        for index, process in enumerate(processes):
+            if process.is_alive():
+                continue
+
+            process.join()
+            now = time.monotonic()
+            history = restarts[index]
+            while history and now - history[0] > WORKER_RESTART_PERIOD:
+                history.popleft()
+            if len(history) >= WORKER_MAX_RESTARTS:
+                raise RuntimeError(
+                    f"Worker {index} exited {len(history) + 1} times in {WORKER_RESTART_PERIOD} seconds"
+                )
+
+            history.append(now)
+            logger.error("Worker %s exited with code %s, restarting", index, process.exitcode)
+            processes[index] = _start_worker(context, index, queues[index])
+
+
+async def _supervise(
+        config: AppConfig,
+        context: BaseContext,
+        processes: list[BaseProcess],
+        queues: list[Queue],
+) -> None:
+    async with asyncio.TaskGroup() as group:
+        group.create_task(_receive_updates(config, UpdateRouter(queues)))
+        group.create_task(_watch_workers(context, processes, queues))
+
+
+def run_supervisor(config: AppConfig) -> None:
+    """
+    Запускает config.bot.workers процессов-воркеров и раздает им апдейты.
+
+    Апдейты одного чата всегда попадают в один и тот же процесс, поэтому
+    стек диалогов aiogram_dialog в RedisStorage меняется последовательно,
+    а разные пользователи обрабатываются параллельно на всех ядрах.
+    Процессы запускаются через spawn, так что движок SQLAlchemy и пул Redis
+    у каждого воркера свои. Упавший воркер перезапускается на своей очереди.
+    """
+    context = multiprocessing.get_context("spawn")
+    queues: list[Queue] = [context.Queue() for _ in range(config.bot.workers)]
+    processes = [_start_worker(context, index, queue) for index, queue in enumerate(queues)]
+    logger.info("Started %s worker processes", len(processes))
+
+    try:
+        asyncio.run(_supervise(config, context, processes, queues))
+    except KeyboardInterrupt:
+        logger.info("Supervisor interrupted")
+    finally:
+        for queue in queues:
+            queue.put(None)
+        for process in processes:
+            process.join()
+        logger.info("All worker processes stopped")
@@ -15,8 +15,7 @@ async def get_redis_pool(
     redis_pool: Redis = Redis(
         connection_pool=ConnectionPool(
             host=host, port=port, db=db, username=username, password=password
-        ),
-        decode_responses=True
+        )
     )
 
     version = await redis_pool.info("server")
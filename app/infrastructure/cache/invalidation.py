@@ -0,0 +1,129 @@
+import asyncio
+import inspect
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, Generic, TypeVar
+
+from redis.asyncio import Redis
+
+logger = logging.getLogger(__name__)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+InvalidationHandler = Callable[[str], Awaitable[None] | None]
+
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+
+class TTLCache(Generic[K, V]):
+    """Локальный LRU-кеш процесса с ограничением по времени жизни записей"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def get(self, key: K) -> V | None:
+        item = self._data.get(key)
+        if item is None:
+            return None
+
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: K) -> None:
+        self._data.pop(key, None)
+
+    def pop_prefix(self, prefix: str) -> None:
+        """Удалить записи, строковые ключи которых начинаются с prefix"""
+        for key in [key for key in self._data if isinstance(key, str) and key.startswith(prefix)]:
+            del self._data[key]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+class InvalidationBus:
+    """
+    Рассылка инвалидаций локальных кешей между процессами и репликами через Redis pub/sub.
+
+    Сообщение имеет вид "<namespace>:<key>", обработчики подписываются на namespace.
+    Пока шина не запущена, публикация только вызывает локальные обработчики.
+    """
+
+    def __init__(self, channel: str = INVALIDATION_CHANNEL):
+        self.channel = channel
+        self.redis: Redis | None = None
+        self._handlers: dict[str, list[InvalidationHandler]] = {}
+        self._listener: asyncio.Task | None = None
+
+    def subscribe(self, namespace: str, handler: InvalidationHandler) -> None:
+        self._handlers.setdefault(namespace, []).append(handler)
+
+    async def start(self, redis: Redis) -> None:
+        if self._listener is not None:
+            return
+        self.redis = redis
+        pubsub = redis.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(self.channel)
+        self._listener = asyncio.create_task(self._listen(pubsub))
+        logger.info("Cache invalidation bus subscribed to %s", self.channel)
+
+    async def stop(self) -> None:
+        if self._listener is None:
+            return
+        self._listener.cancel()
+        try:
+            await self._listener
+        except asyncio.CancelledError:
+            pass
+        self._listener = None
+        self.redis = None
+        logger.info("Cache invalidation bus stopped")
+
+    async def publish(self, namespace: str, key: Any) -> None:
+        message = f"{namespace}:{key}"
+        if self.redis is None:
+            await self._dispatch(message)
+            return
+
+        try:
+            await self.redis.publish(self.channel, message)
+        except Exception as e:
+            logger.error("Error publishing invalidation %s: %s", message, str(e))
+            await self._dispatch(message)
+
+    async def _listen(self, pubsub) -> None:
+        try:
+            async for message in pubsub.listen():
+                data = message["data"]
+                await self._dispatch(data.decode() if isinstance(data, bytes) else data)
+        finally:
+            await pubsub.aclose()
+
+    async def _dispatch(self, message: str) -> None:
+        namespace, _, key = message.partition(":")
+        for handler in self._handlers.get(namespace, ()):
+            try:
+                result = handler(key)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error("Error handling invalidation %s: %s", message, str(e))
+
+
+invalidation_bus = InvalidationBus()
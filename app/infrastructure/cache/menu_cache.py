@@ -0,0 +1,101 @@
+import json
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from redis.asyncio import Redis
+
+from app.infrastructure.cache.invalidation import invalidation_bus
+
+logger = logging.getLogger(__name__)
+
+MENU_NAMESPACE = "menu"
+MENU_VERSION_KEY = "menu:version"
+
+
+class MenuCatalogCache:
+    """
+    Кеш каталога меню в Redis, ключи которого содержат номер версии меню.
+
+    Любое изменение ресторанов, категорий или блюд увеличивает версию, после
+    чего все процессы читают каталог по новым ключам, а старые истекают по TTL.
+    Локальная копия номера версии обновляется через invalidation_bus и
+    на всякий случай перечитывается из Redis раз в version_ttl секунд. Если
+    Redis недоступен, остается последняя известная версия.
+    """
+
+    def __init__(self, ttl: int = 24 * 60 * 60, version_ttl: float = 30):
+        self.redis: Redis | None = None
+        self.ttl = ttl
+        self.version_ttl = version_ttl
+        self._version: int | None = None
+        self._version_checked_at = 0.0
+        invalidation_bus.subscribe(MENU_NAMESPACE, self._on_version_changed)
+
+    def setup(self, redis: Redis) -> None:
+        self.redis = redis
+        self._version = None
+
+    async def version(self) -> int:
+        if self._version is not None and time.monotonic() - self._version_checked_at < self.version_ttl:
+            return self._version
+
+        try:
+            raw = await self.redis.get(MENU_VERSION_KEY)
+        except Exception as e:
+            logger.error("Error reading menu version: %s", str(e))
+            # Остаемся на последней известной версии и не ходим в Redis до следующей проверки
+            self._version_checked_at = time.monotonic()
+            return self._version if self._version is not None else 0
+
+        self._set_version(int(raw) if raw is not None else 0)
+        return self._version
+
+    async def bump(self) -> None:
+        """Вызывается репозиториями после коммита изменений меню"""
+        if self.redis is None:
+            return
+
+        try:
+            version = await self.redis.incr(MENU_VERSION_KEY)
+            self._set_version(version)
+            logger.info("Menu version bumped to %s", version)
+            await invalidation_bus.publish(MENU_NAMESPACE, version)
+        except Exception as e:
+            logger.error("Error bumping menu version: %s", str(e))
+
+    async def get_or_load(self, name: str, loader: Callable[[], Awaitable[list[Any]]]) -> list[Any]:
+        """Список кортежей из кеша текущей версии меню или из loader при промахе"""
+        if self.redis is None:
+            return await loader()
+
+        try:
+            key = f"{MENU_NAMESPACE}:{await self.version()}:{name}"
+            raw = await self.redis.get(key)
+        except Exception as e:
+            logger.error("Error reading menu cache %s: %s", name, str(e))
+            return await loader()
+
+        if raw is not None:
+            return [tuple(row) for row in json.loads(raw)]
+
+        logger.debug("Menu cache miss: %s", name)
+
+        rows = await loader()
+        try:
+            await self.redis.set(key, json.dumps(rows, ensure_ascii=False), ex=self.ttl)
+        except Exception as e:
+            logger.error("Error writing menu cache %s: %s", name, str(e))
+        return rows
+
+    def _set_version(self, version: int) -> None:
+        if self._version is None or version >= self._version:
+            self._version = version
+        self._version_checked_at = time.monotonic()
+
+    def _on_version_changed(self, key: str) -> None:
+        self._set_version(int(key))
+
+
+menu_cache = MenuCatalogCache()
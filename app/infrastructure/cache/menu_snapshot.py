@@ -0,0 +1,167 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping
+
+from app.infrastructure.cache.invalidation import invalidation_bus
+from app.infrastructure.cache.menu_cache import MENU_NAMESPACE, menu_cache
+from app.infrastructure.database.db import async_session_maker
+from app.infrastructure.database.query.restaurant_queries import RestaurantRepository
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True, frozen=True)
+class RestaurantRecord:
+    id: int
+    name: str
+    category_ids: tuple[int, ...]
+
+
+@dataclass(slots=True, frozen=True)
+class CategoryRecord:
+    id: int
+    restaurant_id: int
+    name: str
+    dish_ids: tuple[int, ...]
+
+
+@dataclass(slots=True, frozen=True)
+class DishRecord:
+    id: int
+    category_id: int
+    name: str
+    price: float
+
+    @property
+    def formatted_price(self) -> str:
+        """Отформатированная цена"""
+        return f"{self.price:.2f} ₽"
+
+
+@dataclass(slots=True, frozen=True)
+class MenuSnapshot:
+    """Неизменяемый снимок активного меню с индексами по id"""
+    version: int
+    restaurants: tuple[RestaurantRecord, ...]
+    restaurants_by_id: Mapping[int, RestaurantRecord]
+    categories_by_id: Mapping[int, CategoryRecord]
+    dishes_by_id: Mapping[int, DishRecord]
+
+    @classmethod
+    def from_rows(cls, version: int, rows: list[tuple]) -> "MenuSnapshot":
+        restaurants: dict[int, tuple[str, list[int]]] = {}
+        categories: dict[int, tuple[int, str, list[int]]] = {}
+        dishes: dict[int, DishRecord] = {}
+
+        for restaurant_id, restaurant_name, category_id, category_name, dish_id, dish_name, price in rows:
+            if restaurant_id not in restaurants:
+                restaurants[restaurant_id] = (restaurant_name, [])
+            if category_id is None:
+                continue
+
+            if category_id not in categories:
+                categories[category_id] = (restaurant_id, category_name, [])
+                restaurants[restaurant_id][1].append(category_id)
+            if dish_id is None:
+                continue
+
+            dishes[dish_id] = DishRecord(id=dish_id, category_id=category_id, name=dish_name, price=price)
+            categories[category_id][2].append(dish_id)
+
+        restaurant_records = tuple(
+            RestaurantRecord(id=restaurant_id, name=name, category_ids=tuple(category_ids))
+            for restaurant_id, (name, category_ids) in restaurants.items()
+        )
+        category_records = {
+            category_id: CategoryRecord(
+                id=category_id, restaurant_id=restaurant_id, name=name, dish_ids=tuple(dish_ids)
+            )
+            for category_id, (restaurant_id, name, dish_ids) in categories.items()
+        }
+
+        return cls(
+            version=version,
+            restaurants=restaurant_records,
+            restaurants_by_id=MappingProxyType({record.id: record for record in restaurant_records}),
+            categories_by_id=MappingProxyType(category_records),
+            dishes_by_id=MappingProxyType(dishes),
+        )
+
+    def categories_of(self, restaurant_id: int) -> tuple[CategoryRecord, ...]:
+        restaurant = self.restaurants_by_id.get(restaurant_id)
+        if restaurant is None:
+            return ()
+        return tuple(self.categories_by_id[category_id] for category_id in restaurant.category_ids)
+
+    def dishes_of(self, category_id: int) -> tuple[DishRecord, ...]:
+        category = self.categories_by_id.get(category_id)
+        if category is None:
+            return ()
+        return tuple(self.dishes_by_id[dish_id] for dish_id in category.dish_ids)
+
+
+class MenuSnapshotHolder:
+    """
+    Снимок меню процесса: навигация по меню не ходит ни в Postgres, ни в Redis.
+
+    Снимок подменяется целиком одной операцией присваивания, поэтому читатели
+    всегда видят согласованное меню. Новый снимок строится в фоне после
+    сообщения об изменении версии меню (его публикуют репозитории, через
+    которые работают обработчики настроек меню) или если локальная версия
+    меню разошлась с версией снимка.
+    """
+
+    def __init__(self):
+        self._snapshot: MenuSnapshot | None = None
+        self._lock = asyncio.Lock()
+        self._refresh_task: asyncio.Task | None = None
+        invalidation_bus.subscribe(MENU_NAMESPACE, self._on_version_changed)
+
+    async def get(self) -> MenuSnapshot:
+        snapshot = self._snapshot
+        if snapshot is None:
+            return await self.reload()
+
+        if menu_cache.redis is not None and await menu_cache.version() != snapshot.version:
+            self._schedule_refresh()
+        return snapshot
+
+    async def reload(self) -> MenuSnapshot:
+        async with self._lock:
+            version = await menu_cache.version() if menu_cache.redis is not None else 0
+            if self._snapshot is not None and self._snapshot.version >= version:
+                return self._snapshot
+
+            async def load() -> list[tuple]:
+                async with async_session_maker() as session:
+                    return await RestaurantRepository(session).get_active_menu_rows()
+
+            rows = await menu_cache.get_or_load("catalog", load)
+            self._snapshot = MenuSnapshot.from_rows(version, rows)
+            logger.info(
+                "Menu snapshot v%s loaded: %s restaurants, %s categories, %s dishes",
+                version,
+                len(self._snapshot.restaurants),
+                len(self._snapshot.categories_by_id),
+                len(self._snapshot.dishes_by_id),
+            )
+            return self._snapshot
+
+    def _schedule_refresh(self) -> None:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh())
+
+    async def _refresh(self) -> None:
+        try:
+            await self.reload()
+        except Exception as e:
+            logger.error("Error refreshing menu snapshot: %s", str(e))
+
+    def _on_version_changed(self, key: str) -> None:
+        if self._snapshot is not None and self._snapshot.version < int(key):
+            self._schedule_refresh()
+
+
+menu_snapshot = MenuSnapshotHolder()
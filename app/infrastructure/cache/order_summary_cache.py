@@ -0,0 +1,161 @@
+import asyncio
+import json
+import logging
+import time
+from collections.abc import Awaitable, Callable
+
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.infrastructure.cache.menu_cache import MENU_VERSION_KEY
+
+logger = logging.getLogger(__name__)
+
+ORDER_SUMMARY_NAMESPACE = "order_summary"
+
+
+class OrderSummaryCache:
+    """
+    Кеш отрисованных сводок заказа в Redis, ключи которого содержат версию
+    заказа и версию меню.
+
+    Версию заказа увеличивают репозитории после коммита любого изменения,
+    которое видно в сводке: привязка корзины, правка ее позиций или
+    комментария, смена статуса корзины или заказа. Названия ресторана,
+    категорий и блюд берутся из меню, поэтому в ключ входит и версия меню
+    из menu_cache: переименование или импорт меню делает устаревшими все
+    сводки сразу. Старые ключи истекают по TTL.
+
+    Сводку строит только первый запрос: внутри процесса остальные ждут ту же
+    задачу, между процессами — ключ блокировки в Redis, пока лидер не
+    положит готовые части в кеш. Общая задача рендерит в собственной сессии
+    кеша, а не в сессии апдейта, который ее запустил: апдейт может
+    завершиться или быть отменен раньше, чем ее дождутся остальные.
+    """
+
+    def __init__(
+            self,
+            ttl: int = 60 * 60,
+            lock_ttl: int = 15,
+            wait_timeout: float = 5.0,
+            poll_interval: float = 0.05,
+    ):
+        self.redis: Redis | None = None
+        self.session_pool: async_sessionmaker | None = None
+        self.ttl = ttl
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    def setup(self, redis: Redis, session_pool: async_sessionmaker) -> None:
+        self.redis = redis
+        self.session_pool = session_pool
+
+    @staticmethod
+    def _version_key(order_id: int) -> str:
+        return f"{ORDER_SUMMARY_NAMESPACE}:version:{order_id}"
+
+    async def bump(self, *order_ids: int | None) -> None:
+        """Вызывается репозиториями после коммита изменений заказа или его корзин"""
+        order_ids = {order_id for order_id in order_ids if order_id is not None}
+        if self.redis is None or not order_ids:
+            return
+
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for order_id in order_ids:
+                    pipe.incr(self._version_key(order_id))
+                await pipe.execute()
+            logger.debug("Order summary versions bumped: %s", sorted(order_ids))
+        except Exception as e:
+            logger.error("Error bumping order summary versions %s: %s", sorted(order_ids), str(e))
+
+    async def get_or_render(
+            self,
+            kind: str,
+            order_id: int,
+            session: AsyncSession,
+            render: Callable[[AsyncSession], Awaitable[list[str]]],
+    ) -> list[str]:
+        """
+        Части сводки текущих версий заказа и меню из кеша или из render при промахе.
+
+        Без Redis render получает сессию вызывающего апдейта, при промахе
+        кеша — собственную сессию кеша.
+        """
+        if self.redis is None:
+            return await render(session)
+
+        try:
+            raw_version, raw_menu_version = await self.redis.mget(self._version_key(order_id), MENU_VERSION_KEY)
+        except Exception as e:
+            logger.error("Error reading order %s summary version: %s", order_id, str(e))
+            return await render(session)
+
+        version = int(raw_version) if raw_version is not None else 0
+        menu_version = int(raw_menu_version) if raw_menu_version is not None else 0
+        key = f"{ORDER_SUMMARY_NAMESPACE}:{kind}:{order_id}:{version}:{menu_version}"
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, render))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _load(self, key: str, render: Callable[[AsyncSession], Awaitable[list[str]]]) -> list[str]:
+        lock_key = f"{key}:lock"
+        locked = False
+        try:
+            parts = await self._read(key)
+            if parts is not None:
+                return parts
+
+            locked = bool(await self.redis.set(lock_key, 1, nx=True, ex=self.lock_ttl))
+            if not locked:
+                parts = await self._wait(key, lock_key)
+                if parts is not None:
+                    return parts
+        except Exception as e:
+            logger.error("Error reading order summary cache %s: %s", key, str(e))
+
+        logger.debug("Order summary cache miss: %s", key)
+        try:
+            async with self.session_pool() as session:
+                parts = await render(session)
+            if parts:
+                await self._write(key, parts)
+            return parts
+        finally:
+            if locked:
+                try:
+                    await self.redis.delete(lock_key)
+                except Exception as e:
+                    logger.error("Error releasing order summary lock %s: %s", lock_key, str(e))
+
+    async def _read(self, key: str) -> list[str] | None:
+        raw = await self.redis.get(key)
+        return json.loads(raw) if raw is not None else None
+
+    async def _write(self, key: str, parts: list[str]) -> None:
+        try:
+            await self.redis.set(key, json.dumps(parts, ensure_ascii=False), ex=self.ttl)
+        except Exception as e:
+            logger.error("Error writing order summary cache %s: %s", key, str(e))
+
+    async def _wait(self, key: str, lock_key: str) -> list[str] | None:
+        """Дождаться сводки от другого процесса; None, если лидер пропал или не успел"""
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            parts = await self._read(key)
+            if parts is not None:
+                return parts
+            if not await self.redis.exists(lock_key):
+                return await self._read(key)
+        logger.warning("Timed out waiting for order summary %s", key)
+        return None
+
+
+order_summary_cache = OrderSummaryCache()
@@ -0,0 +1,167 @@
+import logging
+import zlib
+from collections.abc import Mapping
+from contextvars import ContextVar
+from dataclasses import replace
+from typing import Any, cast
+
+import orjson
+from aiogram.exceptions import DataNotDictLikeError
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, DefaultKeyBuilder, KeyBuilder, StateType, StorageKey
+from aiogram.fsm.storage.redis import RedisEventIsolation
+from redis.asyncio import Redis
+
+logger = logging.getLogger(__name__)
+
+# JSON не может начинаться с нулевого байта, поэтому сжатые значения отличимы от обычных
+COMPRESSED_PREFIX = b"\x00z"
+
+# Так aiogram_dialog называет ключи стека и контекстов в destiny
+STACK_DESTINY = "aiogd:stack:"
+CONTEXT_DESTINY = "aiogd:context:"
+_INTENT_MARK = "\x00"
+
+# Стек и контекст его верхнего диалога за один запрос. Ключ контекста
+# собирается из префикса и суффикса, потому что intent_id известен только из стека.
+# Только для одиночного Redis (в том числе за Sentinel): ключ контекста не объявлен
+# в KEYS, поэтому в Redis Cluster и для скриптов с флагами доступа к ключам
+# (без allow-cross-slot-keys/undeclared keys) скрипт работать не будет
+_LOAD_STACK_SCRIPT = """
+local stack = redis.call('GET', KEYS[1])
+if not stack then
+    return {false, false}
+end
+local ok, decoded = pcall(cjson.decode, stack)
+if not ok or type(decoded) ~= 'table' or type(decoded['intents']) ~= 'table' then
+    return {stack, false}
+end
+local intent_id = decoded['intents'][#decoded['intents']]
+if type(intent_id) ~= 'string' then
+    return {stack, false}
+end
+return {stack, redis.call('GET', ARGV[1] .. intent_id .. ARGV[2])}
+"""
+
+# Контекст, прочитанный вместе со стеком: (ключ, сырое значение).
+# Отдается только следующему обращению к хранилищу, любое другое его сбрасывает
+_prefetched: ContextVar[tuple[str, bytes | str | None] | None] = ContextVar("fsm_prefetched", default=None)
+
+
+def _take_prefetched() -> tuple[str, bytes | str | None] | None:
+    prefetched = _prefetched.get()
+    if prefetched is not None:
+        _prefetched.set(None)
+    return prefetched
+
+
+class FastRedisStorage(BaseStorage):
+    """
+    Хранилище FSM и контекстов aiogram_dialog в Redis, совместимое
+    по ключам с RedisStorage.
+
+    - стек диалогов читается одним Lua-скриптом вместе с контекстом верхнего
+      диалога, который aiogram_dialog запрашивает следующим же вызовом
+      (чтение идет под блокировкой стека, поэтому контекст не устаревает);
+    - значения сериализуются orjson, крупные (от compress_threshold байт)
+      сжимаются zlib, если это уменьшает размер;
+    - у состояния и данных свои TTL, чтобы брошенные диалоги не копились.
+
+    Рассчитано на одиночный Redis, не на Redis Cluster (см. _LOAD_STACK_SCRIPT).
+    Значения, записанные штатным RedisStorage (обычный JSON), читаются как есть.
+    Клиент Redis должен возвращать bytes, как клиент из get_redis_pool.
+    """
+
+    def __init__(
+            self,
+            redis: Redis,
+            key_builder: KeyBuilder | None = None,
+            state_ttl: int | None = None,
+            data_ttl: int | None = None,
+            compress_threshold: int = 1024,
+            compress_level: int = 6,
+    ) -> None:
+        self.redis = redis
+        self.key_builder = key_builder or DefaultKeyBuilder()
+        self.state_ttl = state_ttl
+        self.data_ttl = data_ttl
+        self.compress_level = compress_level
+        self.compress_threshold = compress_threshold
+        self._load_stack = redis.register_script(_LOAD_STACK_SCRIPT)
+
+    def create_isolation(self, **kwargs: Any) -> RedisEventIsolation:
+        return RedisEventIsolation(redis=self.redis, key_builder=self.key_builder, **kwargs)
+
+    async def close(self) -> None:
+        await self.redis.aclose(close_connection_pool=True)
+
+    def _dumps(self, data: Mapping[str, Any]) -> bytes:
+        raw = orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+        if self.compress_threshold and len(raw) >= self.compress_threshold:
+            packed = COMPRESSED_PREFIX + zlib.compress(raw, self.compress_level)
+            if len(packed) < len(raw):
+                return packed
+        return raw
+
+    @staticmethod
+    def _loads(value: bytes | str | None) -> dict[str, Any]:
+        if value is None:
+            return {}
+        if isinstance(value, bytes) and value.startswith(COMPRESSED_PREFIX):
+            value = zlib.decompress(value[len(COMPRESSED_PREFIX):])
+        return cast(dict[str, Any], orjson.loads(value))
+
+    def _context_key_parts(self, stack_key: StorageKey) -> tuple[str, str]:
+        """Префикс и суффикс ключа контекста того же чата, между ними встает intent_id"""
+        template = self.key_builder.build(replace(stack_key, destiny=CONTEXT_DESTINY + _INTENT_MARK), "data")
+        prefix, _, suffix = template.partition(_INTENT_MARK)
+        return prefix, suffix
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        _take_prefetched()
+        redis_key = self.key_builder.build(key, "state")
+        if state is None:
+            await self.redis.delete(redis_key)
+        else:
+            await self.redis.set(
+                redis_key,
+                cast(str, state.state if isinstance(state, State) else state),
+                ex=self.state_ttl,
+            )
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        _take_prefetched()
+        value = await self.redis.get(self.key_builder.build(key, "state"))
+        if isinstance(value, bytes):
+            return value.decode("utf-8")
+        return cast(str | None, value)
+
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        redis_key = self.key_builder.build(key, "data")
+        prefetched = _take_prefetched()
+        if prefetched is not None and prefetched[0] == redis_key:
+            return self._loads(prefetched[1])
+
+        if not key.destiny.startswith(STACK_DESTINY):
+            return self._loads(await self.redis.get(redis_key))
+
+        prefix, suffix = self._context_key_parts(key)
+        stack, context = await self._load_stack(keys=[redis_key], args=[prefix, suffix])
+        data = self._loads(stack)
+        intents = data.get("intents")
+        # Сжатый стек скрипт разобрать не может и контекст не читал
+        if intents and not (isinstance(stack, bytes) and stack.startswith(COMPRESSED_PREFIX)):
+            _prefetched.set((f"{prefix}{intents[-1]}{suffix}", context))
+        return data
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        _take_prefetched()
+        if not isinstance(data, dict):
+            msg = f"Data must be a dict or dict-like object, got {type(data).__name__}"
+            raise DataNotDictLikeError(msg)
+
+        redis_key = self.key_builder.build(key, "data")
+        if not data:
+            await self.redis.delete(redis_key)
+            return
+        await self.redis.set(redis_key, self._dumps(data), ex=self.data_ttl)
@@ -0,0 +1,141 @@
+import json
+import logging
+from dataclasses import asdict, dataclass
+from datetime import datetime
+
+from redis.asyncio import Redis
+
+from app.infrastructure.cache.invalidation import TTLCache, invalidation_bus
+from app.infrastructure.database.enums.payment_methods import PaymentMethod
+from app.infrastructure.database.enums.user_roles import UserRole
+
+logger = logging.getLogger(__name__)
+
+USER_NAMESPACE = "user"
+
+
+@dataclass(slots=True, frozen=True)
+class UserSnapshot:
+    """Отсоединенный от сессии снимок строки users, который кладется в кеш"""
+    id: int
+    telegram_id: int
+    username: str | None
+    first_name: str | None
+    last_name: str | None
+    language_code: str | None
+    role: UserRole
+    is_active: bool
+    phone_number: str | None
+    preferred_bank: PaymentMethod | None
+    created_at: datetime
+
+    @classmethod
+    def from_model(cls, user) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            telegram_id=user.telegram_id,
+            username=user.username,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            language_code=user.language_code,
+            role=user.role,
+            is_active=user.is_active,
+            phone_number=user.phone_number,
+            preferred_bank=user.preferred_bank,
+            created_at=user.created_at,
+        )
+
+    @classmethod
+    def from_json(cls, raw: str | bytes) -> "UserSnapshot":
+        data = json.loads(raw)
+        data["role"] = UserRole[data["role"]]
+        data["preferred_bank"] = PaymentMethod[data["preferred_bank"]] if data["preferred_bank"] else None
+        data["created_at"] = datetime.fromisoformat(data["created_at"])
+        return cls(**data)
+
+    def to_json(self) -> str:
+        data = asdict(self)
+        data["role"] = self.role.name
+        data["preferred_bank"] = self.preferred_bank.name if self.preferred_bank else None
+        data["created_at"] = self.created_at.isoformat()
+        return json.dumps(data, ensure_ascii=False)
+
+    @property
+    def full_name(self) -> str:
+        if self.last_name:
+            return f"{self.first_name} {self.last_name}"
+        return self.first_name
+
+    @property
+    def mention(self) -> str:
+        if self.username:
+            return f"@{self.username}"
+        return f'<a href="tg://user?id={self.telegram_id}">{self.full_name}</a>'
+
+
+class UserCache:
+    """
+    Двухуровневый кеш пользователей: LRU процесса перед Redis.
+
+    Запись инвалидируется в Redis и во всех процессах через invalidation_bus.
+    """
+
+    def __init__(self, local_maxsize: int = 10_000, local_ttl: float = 60, redis_ttl: int = 300):
+        self.redis: Redis | None = None
+        self.redis_ttl = redis_ttl
+        self._local: TTLCache[int, UserSnapshot] = TTLCache(maxsize=local_maxsize, ttl=local_ttl)
+        invalidation_bus.subscribe(USER_NAMESPACE, self._on_invalidate)
+
+    def setup(self, redis: Redis) -> None:
+        self.redis = redis
+
+    @staticmethod
+    def _key(telegram_id: int) -> str:
+        return f"{USER_NAMESPACE}:{telegram_id}"
+
+    async def get(self, telegram_id: int) -> UserSnapshot | None:
+        snapshot = self._local.get(telegram_id)
+        if snapshot is not None or self.redis is None:
+            return snapshot
+
+        try:
+            raw = await self.redis.get(self._key(telegram_id))
+        except Exception as e:
+            logger.error("Error reading user %s from Redis: %s", telegram_id, str(e))
+            return None
+
+        if raw is None:
+            return None
+
+        snapshot = UserSnapshot.from_json(raw)
+        self._local.set(telegram_id, snapshot)
+        return snapshot
+
+    async def set(self, snapshot: UserSnapshot) -> None:
+        self._local.set(snapshot.telegram_id, snapshot)
+        if self.redis is None:
+            return
+
+        try:
+            await self.redis.set(self._key(snapshot.telegram_id), snapshot.to_json(), ex=self.redis_ttl)
+        except Exception as e:
+            logger.error("Error writing user %s to Redis: %s", snapshot.telegram_id, str(e))
+
+    async def invalidate(self, *telegram_ids: int) -> None:
+        for telegram_id in telegram_ids:
+            self._local.pop(telegram_id)
+
+        if self.redis is not None and telegram_ids:
+            try:
+                await self.redis.delete(*(self._key(telegram_id) for telegram_id in telegram_ids))
+            except Exception as e:
+                logger.error("Error deleting users %s from Redis: %s", telegram_ids, str(e))
+
+        for telegram_id in telegram_ids:
+            await invalidation_bus.publish(USER_NAMESPACE, telegram_id)
+
+    def _on_invalidate(self, key: str) -> None:
+        self._local.pop(int(key))
+
+
+user_cache = UserCache()
@@ -1,5 +1,5 @@
 from typing import TYPE_CHECKING
-from sqlalchemy import ForeignKey, String
+from sqlalchemy import ForeignKey, Index, String, UniqueConstraint, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import ENUM as PgEnum
 
@@ -43,6 +43,18 @@ class CartModel(Base):
         viewonly=True
     )
 
+    __table_args__ = (
+        # get_current_cart: user_id = ? AND is_current AND status = ?
+        Index("ix_carts_user_current", "user_id", "status", postgresql_where=text("is_current")),
+        # get_carts_by_order и триггер суммы заказа: delivery_order_id = ? AND status = ?
+        Index(
+            "ix_carts_order_status", "delivery_order_id", "status",
+            postgresql_where=text("delivery_order_id IS NOT NULL"),
+        ),
+        # История корзин пользователя, новые сначала
+        Index("ix_carts_user_created", "user_id", "created_at"),
+    )
+
     @property
     def items_count(self) -> int:
         """Общее количество позиций в корзине"""
@@ -60,3 +72,7 @@ class CartItemModel(Base):
     # Relationships
     cart: Mapped["CartModel"] = relationship(back_populates="item_associations")
     dish: Mapped["DishModel"] = relationship(back_populates="cart_associations")
+
+    __table_args__ = (
+        UniqueConstraint("cart_id", "dish_id", name="uq_cart_items_cart_dish"),
+    )
@@ -49,6 +49,8 @@ class DeliveryOrderModel(Base):
     __table_args__ = (
         Index("ix_orders_status_date", "status", "created_at"),
         Index("ix_orders_restaurant_date", "restaurant_id", "created_at"),
+        Index("ix_orders_creator_date", "creator_id", "created_at"),
+        Index("ix_orders_created_at", "created_at", "id"),
     )
 
     def __repr__(self) -> str:
@@ -1,6 +1,6 @@
 from typing import TYPE_CHECKING
 
-from sqlalchemy import String, ForeignKey, Index
+from sqlalchemy import String, ForeignKey, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.infrastructure.database.models import Base
@@ -36,6 +36,10 @@ class DishModel(Base):
 
     __table_args__ = (
         Index("ix_dishes_category_order", "category_id", "display_order"),
+        Index(
+            "ix_dishes_active_category_order", "category_id", "display_order",
+            postgresql_where=text("is_active"),
+        ),
     )
 
     @property
@@ -1,7 +1,7 @@
 import re
 from typing import TYPE_CHECKING
 
-from sqlalchemy import BigInteger, String
+from sqlalchemy import BigInteger, Index, String, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.infrastructure.database.enums.payment_methods import PaymentMethod
@@ -54,6 +54,13 @@ class UserModel(Base):
         order_by="DeliveryOrderModel.created_at.desc()"
     )
 
+    __table_args__ = (
+        Index(
+            "ix_users_active_role_created", "role", "created_at",
+            postgresql_where=text("is_active"),
+        ),
+    )
+
     @property
     def full_name(self) -> str:
         if self.last_name:
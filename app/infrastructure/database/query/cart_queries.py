@@ -1,15 +1,51 @@
 import logging
 
-from sqlalchemy import select, update, delete, func, and_
+from sqlalchemy import select, update, delete, func, and_, Update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.infrastructure.cache.order_summary_cache import order_summary_cache
 from app.infrastructure.database.models.cart import CartModel, CartItemModel, CartStatus
-from app.infrastructure.database.query.order_queries import OrderRepository
+from app.infrastructure.database.models.dish import DishModel
+from app.infrastructure.database.query.pagination import KeysetPage, fetch_keyset_page
 
 logger = logging.getLogger(__name__)
 
 
+# Суммы корзин и заказов поддерживают триггеры в базе (миграция b42f9d6e1a73),
+# полный пересчет нужен только для исправления расхождений
+def cart_items_total_subquery(cart_id):
+    return (
+        select(
+            func.coalesce(func.sum(CartItemModel.amount * CartItemModel.price_at_time), 0)
+        )
+        .filter(CartItemModel.cart_id == cart_id)
+        .scalar_subquery()
+    )
+
+
+def cart_order_id_subquery(cart_id: int):
+    """
+    Заказ корзины для RETURNING записей в cart_items: id заказа, сводку
+    которого сбросить после коммита, приходит тем же запросом
+    """
+    return (
+        select(CartModel.delivery_order_id)
+        .where(CartModel.id == cart_id)
+        .scalar_subquery()
+    )
+
+
+def cart_total_price_stmt(cart_id: int) -> Update:
+    """UPDATE, пересчитывающий общую сумму корзины по ее позициям"""
+    return (
+        update(CartModel)
+        .where(CartModel.id == cart_id)
+        .values(total_price=cart_items_total_subquery(cart_id))
+    )
+
+
 class CartRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -138,25 +174,13 @@ class CartRepository:
             raise
 
     async def update_cart_total_price(self, cart_id: int) -> None:
-        """Обновить общую сумму корзины"""
+        """Полностью пересчитать общую сумму корзины по ее позициям"""
         try:
-            # Вычисляем общую сумму корзины
-            subquery = (
-                select(
-                    func.sum(CartItemModel.amount * CartItemModel.price_at_time)
-                )
-                .filter(CartItemModel.cart_id == cart_id)
-                .scalar_subquery()
-            )
-
-            stmt = (
-                update(CartModel)
-                .where(CartModel.id == cart_id)
-                .values(total_price=subquery)
+            order_id = await self.session.scalar(
+                cart_total_price_stmt(cart_id).returning(CartModel.delivery_order_id)
             )
-            await self.session.execute(stmt)
-            await self.session.flush()
             await self.session.commit()
+            await order_summary_cache.bump(order_id)
             logger.info("Updated total_price for cart: cart=%s", cart_id)
 
         except Exception as e:
@@ -170,9 +194,11 @@ class CartRepository:
                 update(CartModel)
                 .where(CartModel.id == cart_id)
                 .values(notes=notes)
+                .returning(CartModel.delivery_order_id)
             )
-            await self.session.execute(stmt)
+            order_id = await self.session.scalar(stmt)
             await self.session.commit()
+            await order_summary_cache.bump(order_id)
             logger.info("Updated notes for cart: %s", cart_id)
         except Exception as e:
             await self.session.rollback()
@@ -195,9 +221,10 @@ class CartRepository:
                         delivery_order_id=order_id)
             )
 
+            # Сумму заказа обновляет триггер на carts
             await self.session.execute(stmt)
-            await OrderRepository(self.session).update_order_total_amount(order_id)
             await self.session.commit()
+            await order_summary_cache.bump(order_id)
             logger.info(
                 "Attached cart %s to order %s, status changed to ATTACHED",
                 cart_id, order_id
@@ -222,9 +249,11 @@ class CartRepository:
                 update(CartModel)
                 .where(CartModel.id == cart_id)
                 .values(status=status)
+                .returning(CartModel.delivery_order_id)
             )
-            await self.session.execute(stmt)
+            order_id = await self.session.scalar(stmt)
             await self.session.commit()
+            await order_summary_cache.bump(order_id)
             logger.info("Updated cart %s status to %s", cart_id, status.value)
         except Exception as e:
             await self.session.rollback()
@@ -234,6 +263,32 @@ class CartRepository:
             )
             raise
 
+    async def repair_total_drift(self, tolerance: float = 0.005) -> list[int]:
+        """Найти корзины, сумма которых разошлась с позициями, исправить и вернуть их id"""
+        try:
+            expected = cart_items_total_subquery(CartModel.id)
+            stmt = (
+                update(CartModel)
+                .where(func.abs(func.coalesce(CartModel.total_price, 0) - expected) > tolerance)
+                .values(total_price=expected)
+                .returning(CartModel.id, CartModel.delivery_order_id)
+            )
+            result = await self.session.execute(stmt)
+            repaired = result.all()
+            await self.session.commit()
+
+            cart_ids = [cart_id for cart_id, _ in repaired]
+            await order_summary_cache.bump(*(order_id for _, order_id in repaired))
+
+            if cart_ids:
+                logger.warning("Repaired total_price drift for carts: %s", cart_ids)
+            return cart_ids
+
+        except Exception as e:
+            await self.session.rollback()
+            logger.error("Error repairing cart totals: %s", str(e))
+            raise
+
     async def get_carts_by_order(
             self,
             order_id: int
@@ -306,6 +361,52 @@ class CartRepository:
             )
             raise
 
+    async def get_user_cart_history_page(
+            self,
+            user_id: int,
+            cursor: list | None = None,
+            offset: int = 0,
+            limit: int = 8,
+    ) -> KeysetPage[CartModel]:
+        """Страница истории корзин пользователя, новые сначала"""
+        try:
+            stmt = (
+                select(CartModel)
+                .filter(CartModel.user_id == user_id,
+                        CartModel.is_current != True)
+                .options(selectinload(CartModel.restaurant))
+            )
+            return await fetch_keyset_page(
+                self.session,
+                stmt,
+                sort_columns=(CartModel.created_at, CartModel.id),
+                cursor=cursor,
+                offset=offset,
+                limit=limit,
+                descending=True,
+            )
+
+        except Exception as e:
+            logger.error("Error getting cart history page for user %s: %s", user_id, str(e))
+            raise
+
+    async def get_user_cart_history_stats(self, user_id: int) -> tuple[int, float]:
+        """Количество корзин в истории пользователя и их общая сумма"""
+        try:
+            # Не кешируется: после заказа пользователь сразу должен видеть новые итоги,
+            # а запрос по одному пользователю покрывает ix_carts_user_created
+            stmt = (
+                select(func.count(), func.coalesce(func.sum(CartModel.total_price), 0))
+                .filter(CartModel.user_id == user_id,
+                        CartModel.is_current != True)
+            )
+            count, total = (await self.session.execute(stmt)).one()
+            return count, float(total)
+
+        except Exception as e:
+            logger.error("Error getting cart history stats for user %s: %s", user_id, str(e))
+            raise
+
 
 class CartItemRepository:
     def __init__(self, session: AsyncSession):
@@ -341,17 +442,19 @@ class CartItemRepository:
             amount: int = 1
     ) -> CartItemModel:
         try:
-            # Получаем существующую запись в корзине
+            # Получаем существующую запись в корзине вместе с заказом корзины
             stmt = (
-                select(CartItemModel)
+                select(CartItemModel, CartModel.delivery_order_id)
+                .join(CartItemModel.cart)
                 .where(CartItemModel.cart_id == cart_id)
                 .where(CartItemModel.dish_id == dish_id)
             )
             result = await self.session.execute(stmt)
-            cart_item = result.scalar_one_or_none()
+            cart_item, order_id = result.one()
             cart_item.amount = amount
             await self.session.commit()
             await self.session.refresh(cart_item)
+            await order_summary_cache.bump(order_id)
             return cart_item
 
         except Exception as e:
@@ -367,15 +470,21 @@ class CartItemRepository:
             price_at_time: float
     ) -> CartItemModel:
         """Добавить или обновить позицию в корзине (с указанием цены)"""
-        stmt = select(CartItemModel).where(
-            and_(
-                CartItemModel.cart_id == cart_id,
-                CartItemModel.dish_id == dish_id
+        # Корзина с позицией, если она уже есть: заказ корзины нужен для сброса сводки
+        stmt = (
+            select(CartModel.delivery_order_id, CartItemModel)
+            .outerjoin(
+                CartItemModel,
+                and_(
+                    CartItemModel.cart_id == CartModel.id,
+                    CartItemModel.dish_id == dish_id
+                )
             )
+            .where(CartModel.id == cart_id)
         )
 
         result = await self.session.execute(stmt)
-        cart_item = result.scalar_one_or_none()
+        order_id, cart_item = result.one()
 
         if cart_item:
             cart_item.amount = amount
@@ -391,8 +500,73 @@ class CartItemRepository:
 
         await self.session.commit()
         await self.session.refresh(cart_item)
+        await order_summary_cache.bump(order_id)
         return cart_item
 
+    async def bulk_upsert_items(
+            self,
+            cart_id: int,
+            amounts: dict[int, int],
+            prices: dict[int, float] | None = None,
+    ) -> int:
+        """
+        Добавить или обновить несколько позиций корзины одним INSERT ... ON CONFLICT
+        и закоммитить один раз. Сумму корзины обновляет триггер на cart_items.
+
+        Если цены не переданы, они загружаются одним запросом. Блюда без цены
+        (неактивные или удаленные) пропускаются. Возвращает количество добавленных единиц.
+        """
+        amounts = {dish_id: amount for dish_id, amount in amounts.items() if amount > 0}
+        if not amounts:
+            return 0
+
+        try:
+            if prices is None:
+                result = await self.session.execute(
+                    select(DishModel.id, DishModel.price).where(
+                        DishModel.id.in_(amounts.keys()),
+                        DishModel.is_active == True,
+                    )
+                )
+                prices = dict(result.tuples().all())
+
+            rows = [
+                {
+                    "cart_id": cart_id,
+                    "dish_id": dish_id,
+                    "amount": amount,
+                    "price_at_time": prices[dish_id],
+                }
+                for dish_id, amount in amounts.items()
+                if dish_id in prices
+            ]
+            if not rows:
+                return 0
+
+            insert_stmt = pg_insert(CartItemModel).values(rows)
+            result = await self.session.execute(
+                insert_stmt.on_conflict_do_update(
+                    index_elements=[CartItemModel.cart_id, CartItemModel.dish_id],
+                    set_={
+                        "amount": insert_stmt.excluded.amount,
+                        "price_at_time": insert_stmt.excluded.price_at_time,
+                        "updated_at": func.now(),
+                    },
+                ).returning(cart_order_id_subquery(cart_id))
+            )
+            order_id = result.scalars().first()
+            await self.session.commit()
+            await order_summary_cache.bump(order_id)
+
+            added_count = sum(row["amount"] for row in rows)
+            logger.info("Upserted %s items (%s units) into cart %s", len(rows), added_count, cart_id)
+            return added_count
+
+        except Exception as e:
+            await self.session.rollback()
+            logger.error("Error bulk upserting items into cart %s: %s", cart_id, str(e))
+            raise
+
     async def remove_cart_item(self, cart_id: int, dish_id: int) -> None:
         """Удалить позицию из корзины"""
         stmt = delete(CartItemModel).where(
@@ -400,6 +574,7 @@ class CartItemRepository:
                 CartItemModel.cart_id == cart_id,
                 CartItemModel.dish_id == dish_id
             )
-        )
-        await self.session.execute(stmt)
+        ).returning(cart_order_id_subquery(cart_id))
+        order_id = await self.session.scalar(stmt)
         await self.session.commit()
+        await order_summary_cache.bump(order_id)
@@ -3,6 +3,7 @@ import logging
 from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.infrastructure.cache.menu_cache import menu_cache
 from app.infrastructure.database.models.category import CategoryModel
 
 logger = logging.getLogger(__name__)
@@ -62,6 +63,7 @@ class CategoryRepository:
             )
             self.session.add(category)
             await self.session.commit()
+            await menu_cache.bump()
             logger.info("Created category: %s for restaurant: %s", name, restaurant_id)
             return category
 
@@ -79,6 +81,7 @@ class CategoryRepository:
             )
             await self.session.execute(stmt)
             await self.session.commit()
+            await menu_cache.bump()
             logger.info("Updated category status: id=%s, status=%s", category_id, is_active)
 
         except Exception as e:
@@ -95,6 +98,7 @@ class CategoryRepository:
             )
             await self.session.execute(stmt)
             await self.session.commit()
+            await menu_cache.bump()
             logger.info("Updated category name: id=%s, name=%s", category_id, name)
 
         except Exception as e:
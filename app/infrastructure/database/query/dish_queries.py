@@ -3,7 +3,9 @@ import logging
 from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.infrastructure.cache.menu_cache import menu_cache
 from app.infrastructure.database.models.dish import DishModel
+from app.infrastructure.database.query.pagination import KeysetPage, cached_count, fetch_keyset_page, invalidate_counts
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +46,40 @@ class DishRepository:
             logger.error("Error getting dishes for category %s: %s", category_id, str(e))
             raise
 
+    async def get_dishes_by_category_page(
+            self,
+            category_id: int,
+            cursor: list | None = None,
+            offset: int = 0,
+            limit: int = 6,
+    ) -> KeysetPage[DishModel]:
+        """Страница активных блюд категории в порядке отображения"""
+        try:
+            stmt = select(DishModel).filter(DishModel.category_id == category_id,
+                                            DishModel.is_active == True)
+            return await fetch_keyset_page(
+                self.session,
+                stmt,
+                sort_columns=(DishModel.display_order, DishModel.id),
+                cursor=cursor,
+                offset=offset,
+                limit=limit,
+            )
+
+        except Exception as e:
+            logger.error("Error getting dishes page for category %s: %s", category_id, str(e))
+            raise
+
+    async def count_dishes_by_category(self, category_id: int) -> int:
+        try:
+            stmt = select(DishModel).filter(DishModel.category_id == category_id,
+                                            DishModel.is_active == True)
+            return await cached_count(self.session, f"dishes:{category_id}", stmt)
+
+        except Exception as e:
+            logger.error("Error counting dishes for category %s: %s", category_id, str(e))
+            raise
+
     async def create_dish(
             self,
             name: str,
@@ -60,6 +96,8 @@ class DishRepository:
             )
             self.session.add(dish)
             await self.session.commit()
+            await menu_cache.bump()
+            await invalidate_counts(f"dishes:{category_id}")
             logger.info("Created dish: %s for category: %s", name, category_id)
             return dish
 
@@ -77,6 +115,7 @@ class DishRepository:
             )
             await self.session.execute(stmt)
             await self.session.commit()
+            await menu_cache.bump()
             logger.info("Updated dish price: id=%s, price=%s", dish_id, price)
 
         except Exception as e:
@@ -94,9 +133,12 @@ class DishRepository:
                 update(DishModel)
                 .where(DishModel.id == dish_id)
                 .values(is_active=status)
+                .returning(DishModel.category_id)
             )
-            await self.session.execute(stmt)
+            category_id = await self.session.scalar(stmt)
             await self.session.commit()
+            await menu_cache.bump()
+            await invalidate_counts(f"dishes:{category_id}")
             logger.info("Updated dish status: id=%s, order=%s", dish_id, status)
 
         except Exception as e:
@@ -117,6 +159,7 @@ class DishRepository:
             )
             await self.session.execute(stmt)
             await self.session.commit()
+            await menu_cache.bump()
             logger.info("Updated dish name: id=%s, order=%s", dish_id, name)
 
         except Exception as e:
@@ -0,0 +1,336 @@
+import logging
+from dataclasses import dataclass, field
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.infrastructure.cache.menu_cache import menu_cache
+from app.infrastructure.database.models.category import CategoryModel
+from app.infrastructure.database.models.dish import DishModel
+from app.infrastructure.database.models.restaurant import RestaurantModel
+from app.infrastructure.database.query.pagination import invalidate_counts
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True, frozen=True)
+class DishSpec:
+    name: str
+    price: float
+    # None — оставить порядок существующего блюда, новое поставить в конец категории
+    display_order: int | None = None
+
+
+@dataclass(slots=True, frozen=True)
+class CategorySpec:
+    name: str
+    display_order: int
+    dishes: tuple[DishSpec, ...]
+
+
+@dataclass(slots=True, frozen=True)
+class MenuSpec:
+    """Меню заведения из загруженного файла, уже прошедшее проверку"""
+    restaurant: str
+    categories: tuple[CategorySpec, ...]
+
+    @property
+    def dishes_count(self) -> int:
+        return sum(len(category.dishes) for category in self.categories)
+
+
+@dataclass(slots=True)
+class MenuImportReport:
+    """Что изменил импорт или синхронизация: одна сводка вместо сообщения на каждое блюдо"""
+    # Заведение или "заведение / категория"
+    scope: str
+    restaurant_created: bool = False
+    restaurant_restored: bool = False
+    categories_added: list[str] = field(default_factory=list)
+    categories_updated: list[str] = field(default_factory=list)
+    categories_deactivated: list[str] = field(default_factory=list)
+    # (категория, блюдо, цена)
+    dishes_added: list[tuple[str, str, float]] = field(default_factory=list)
+    # (категория, блюдо, старая цена, новая цена)
+    dishes_updated: list[tuple[str, str, float, float]] = field(default_factory=list)
+    # (категория, блюдо)
+    dishes_deactivated: list[tuple[str, str]] = field(default_factory=list)
+    dishes_unchanged: int = 0
+    # Категории, списки блюд которых изменились
+    affected_category_ids: set[int] = field(default_factory=set)
+
+    @property
+    def changed(self) -> bool:
+        return bool(
+            self.restaurant_created
+            or self.restaurant_restored
+            or self.categories_added
+            or self.categories_updated
+            or self.categories_deactivated
+            or self.dishes_added
+            or self.dishes_updated
+            or self.dishes_deactivated
+        )
+
+
+def _same_price(left: float, right: float) -> bool:
+    return round(left, 2) == round(right, 2)
+
+
+class MenuImportRepository:
+    """
+    Загрузка и синхронизация меню заведения в одной транзакции.
+
+    Существующие категории и блюда сопоставляются по названию, причем
+    активная строка важнее удаленной с тем же названием: удаленные блюда
+    остаются в таблице, и после "удалить и добавить заново" их две. Новые
+    добавляются пакетными INSERT ... RETURNING, измененные (цена, порядок,
+    удаленные ранее) обновляются одним executemany по первичному ключу,
+    а при синхронизации отсутствующие в прайсе снимаются одним UPDATE.
+    Строки без изменений не трогаются. Кеши сбрасываются после коммита
+    и только если что-то действительно изменилось.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def import_menu(self, menu: MenuSpec, deactivate_missing: bool = False) -> MenuImportReport:
+        """
+        Загрузить меню заведения. С deactivate_missing файл считается полным
+        прайсом: категории и блюда заведения, которых в нем нет, удаляются.
+        """
+        try:
+            report = MenuImportReport(scope=menu.restaurant)
+
+            restaurant_id = await self._ensure_restaurant(menu.restaurant, report)
+            category_ids = await self._sync_categories(restaurant_id, menu.categories, report, deactivate_missing)
+            await self._sync_dishes(category_ids, menu.categories, report, deactivate_missing)
+
+            await self.session.commit()
+            logger.info(
+                "Imported menu for restaurant %s: %s categories added, %s dishes added, "
+                "%s dishes updated, %s dishes deactivated",
+                menu.restaurant,
+                len(report.categories_added),
+                len(report.dishes_added),
+                len(report.dishes_updated),
+                len(report.dishes_deactivated),
+            )
+
+        except Exception as e:
+            await self.session.rollback()
+            logger.error("Error importing menu for restaurant %s: %s", menu.restaurant, str(e))
+            raise
+
+        await self._invalidate(report)
+        return report
+
+    async def sync_category_prices(self, category_id: int, dishes: tuple[DishSpec, ...]) -> MenuImportReport:
+        """Привести активные блюда категории к прайсу: добавить, обновить цены, удалить лишние"""
+        try:
+            row = (await self.session.execute(
+                select(CategoryModel.name, RestaurantModel.name.label("restaurant_name"))
+                .join(RestaurantModel, CategoryModel.restaurant_id == RestaurantModel.id)
+                .where(CategoryModel.id == category_id)
+            )).first()
+            if row is None:
+                raise ValueError(f"Category {category_id} not found")
+
+            report = MenuImportReport(scope=f"{row.restaurant_name} / {row.name}")
+            category = CategorySpec(name=row.name, display_order=0, dishes=dishes)
+            await self._sync_dishes({row.name: category_id}, (category,), report, deactivate_missing=True)
+
+            await self.session.commit()
+            logger.info(
+                "Synced prices for category %s: %s dishes added, %s dishes updated, %s dishes deactivated",
+                category_id,
+                len(report.dishes_added),
+                len(report.dishes_updated),
+                len(report.dishes_deactivated),
+            )
+
+        except Exception as e:
+            await self.session.rollback()
+            logger.error("Error syncing prices for category %s: %s", category_id, str(e))
+            raise
+
+        await self._invalidate(report)
+        return report
+
+    @staticmethod
+    async def _invalidate(report: MenuImportReport) -> None:
+        if not report.changed:
+            return
+
+        # Счетчики страниц — только у затронутых категорий и, если менялся, у списка заведений
+        keys = [f"dishes:{category_id}" for category_id in sorted(report.affected_category_ids)]
+        if report.restaurant_created or report.restaurant_restored:
+            keys.append("restaurants:")
+        await invalidate_counts(*keys)
+
+        await menu_cache.bump()
+
+    async def _ensure_restaurant(self, name: str, report: MenuImportReport) -> int:
+        row = (await self.session.execute(
+            select(RestaurantModel.id, RestaurantModel.is_active).where(RestaurantModel.name == name)
+        )).first()
+
+        if row is None:
+            report.restaurant_created = True
+            return await self.session.scalar(
+                insert(RestaurantModel).values(name=name, is_active=True).returning(RestaurantModel.id)
+            )
+
+        if not row.is_active:
+            report.restaurant_restored = True
+            await self.session.execute(
+                update(RestaurantModel).where(RestaurantModel.id == row.id).values(is_active=True)
+            )
+        return row.id
+
+    async def _sync_categories(
+            self,
+            restaurant_id: int,
+            categories: tuple[CategorySpec, ...],
+            report: MenuImportReport,
+            deactivate_missing: bool,
+    ) -> dict[str, int]:
+        """Добавить недостающие категории и вернуть id всех категорий файла по названию"""
+        result = await self.session.execute(
+            select(CategoryModel.id, CategoryModel.name, CategoryModel.display_order, CategoryModel.is_active)
+            .where(CategoryModel.restaurant_id == restaurant_id)
+            .order_by(CategoryModel.is_active.desc(), CategoryModel.id)
+        )
+        rows = result.all()
+        # Активные строки идут первыми, поэтому из одноименных берется живая
+        existing = {}
+        for row in rows:
+            existing.setdefault(row.name, row)
+
+        category_ids: dict[str, int] = {}
+        to_insert = []
+        to_update = []
+        for category in categories:
+            row = existing.get(category.name)
+            if row is None:
+                to_insert.append({
+                    "name": category.name,
+                    "restaurant_id": restaurant_id,
+                    "display_order": category.display_order,
+                    "is_active": True,
+                })
+                continue
+
+            category_ids[category.name] = row.id
+            if row.display_order != category.display_order or not row.is_active:
+                to_update.append({"id": row.id, "display_order": category.display_order, "is_active": True})
+                report.categories_updated.append(category.name)
+
+        if to_insert:
+            inserted = await self.session.execute(
+                insert(CategoryModel).returning(CategoryModel.id, CategoryModel.name),
+                to_insert,
+            )
+            for category_id, name in inserted:
+                category_ids[name] = category_id
+                report.categories_added.append(name)
+
+        if to_update:
+            await self.session.execute(update(CategoryModel), to_update)
+
+        if deactivate_missing:
+            # Отсутствующими считаются только категории, названия которых нет в файле
+            missing = [row for row in rows if row.is_active and row.name not in category_ids]
+            if missing:
+                await self.session.execute(
+                    update(CategoryModel)
+                    .where(CategoryModel.id.in_([row.id for row in missing]))
+                    .values(is_active=False)
+                )
+                report.categories_deactivated.extend(row.name for row in missing)
+
+        return category_ids
+
+    async def _sync_dishes(
+            self,
+            category_ids: dict[str, int],
+            categories: tuple[CategorySpec, ...],
+            report: MenuImportReport,
+            deactivate_missing: bool,
+    ) -> None:
+        result = await self.session.execute(
+            select(
+                DishModel.id,
+                DishModel.category_id,
+                DishModel.name,
+                DishModel.price,
+                DishModel.display_order,
+                DishModel.is_active,
+            )
+            .where(DishModel.category_id.in_(list(category_ids.values())))
+            .order_by(DishModel.is_active.desc(), DishModel.id)
+        )
+        rows = result.all()
+        # Активные строки идут первыми, поэтому из одноименных берется живая
+        existing = {}
+        next_order: dict[int, int] = {}
+        for row in rows:
+            existing.setdefault((row.category_id, row.name), row)
+            next_order[row.category_id] = max(next_order.get(row.category_id, 0), row.display_order + 1)
+
+        to_insert = []
+        to_update = []
+        for category in categories:
+            category_id = category_ids[category.name]
+            for dish in category.dishes:
+                row = existing.get((category_id, dish.name))
+                if row is None:
+                    display_order = dish.display_order
+                    if display_order is None:
+                        display_order = next_order.get(category_id, 0)
+                        next_order[category_id] = display_order + 1
+                    to_insert.append({
+                        "name": dish.name,
+                        "price": dish.price,
+                        "display_order": display_order,
+                        "is_active": True,
+                        "category_id": category_id,
+                    })
+                    report.dishes_added.append((category.name, dish.name, dish.price))
+                    report.affected_category_ids.add(category_id)
+                    continue
+
+                display_order = row.display_order if dish.display_order is None else dish.display_order
+                if _same_price(row.price, dish.price) and row.display_order == display_order and row.is_active:
+                    report.dishes_unchanged += 1
+                    continue
+
+                to_update.append({
+                    "id": row.id,
+                    "price": dish.price,
+                    "display_order": display_order,
+                    "is_active": True,
+                })
+                report.dishes_updated.append((category.name, dish.name, row.price, dish.price))
+                report.affected_category_ids.add(category_id)
+
+        to_deactivate = []
+        if deactivate_missing:
+            # Отсутствующими считаются только блюда, названий которых нет в прайсе:
+            # одноименный дубль живого блюда может лежать в корзинах
+            listed = {(category_ids[category.name], dish.name) for category in categories for dish in category.dishes}
+            category_names = {category_id: name for name, category_id in category_ids.items()}
+            for row in rows:
+                if row.is_active and (row.category_id, row.name) not in listed:
+                    to_deactivate.append(row.id)
+                    report.dishes_deactivated.append((category_names[row.category_id], row.name))
+                    report.affected_category_ids.add(row.category_id)
+
+        if to_insert:
+            await self.session.execute(insert(DishModel), to_insert)
+        if to_update:
+            await self.session.execute(update(DishModel), to_update)
+        if to_deactivate:
+            await self.session.execute(
+                update(DishModel).where(DishModel.id.in_(to_deactivate)).values(is_active=False)
+            )
@@ -1,15 +1,18 @@
 import logging
 from datetime import datetime, date, timedelta
 
-from sqlalchemy import select, update, func, delete
+from sqlalchemy import Row, Select, select, update, func, delete
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.infrastructure.cache.order_summary_cache import order_summary_cache
 from app.infrastructure.database.enums import CartStatus
-from app.infrastructure.database.models import CartModel, CartItemModel, DishModel
+from app.infrastructure.database.models import CartModel, CartItemModel, CategoryModel, DishModel
 from app.infrastructure.database.models.delivery_order import DeliveryOrderModel
 from app.infrastructure.database.enums.order_statuses import OrderStatus
 from app.infrastructure.database.enums.payment_methods import PaymentMethod
+from app.infrastructure.database.enums.user_roles import UserRole
+from app.infrastructure.database.query.pagination import KeysetPage, cached_count, fetch_keyset_page, invalidate_counts
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +42,7 @@ class OrderRepository:
             )
             self.session.add(order)
             await self.session.commit()
+            await invalidate_counts("orders:")
             logger.info("Created order: id=%s, restaurant=%s, creator=%s",
                         order.id, restaurant_id, creator_id)
             return order
@@ -53,6 +57,7 @@ class OrderRepository:
             stmt = delete(DeliveryOrderModel).where(DeliveryOrderModel.id == order_id)
             await self.session.execute(stmt)
             await self.session.commit()
+            await invalidate_counts("orders:")
             logger.info("Deleted order: id=%s", order_id)
 
         except Exception as e:
@@ -93,6 +98,67 @@ class OrderRepository:
             logger.error("Error getting order by date for  date %s: %s", order_date, str(e))
             raise
 
+    @staticmethod
+    def _orders_by_date_stmt(order_date: date, viewer_role: UserRole, viewer_id: int) -> Select:
+        """
+        Заказы за день, которые видит пользователь: доставщик — только созданные им,
+        остальные роли — все. Фильтр по создателю покрывает ix_orders_creator_date.
+        """
+        start_datetime = datetime.combine(order_date, datetime.min.time())
+        end_datetime = datetime.combine(order_date + timedelta(days=1), datetime.min.time())
+
+        stmt = select(DeliveryOrderModel).where(
+            DeliveryOrderModel.created_at >= start_datetime,
+            DeliveryOrderModel.created_at < end_datetime
+        )
+        if viewer_role == UserRole.DELIVERY:
+            stmt = stmt.where(DeliveryOrderModel.creator_id == viewer_id)
+        return stmt
+
+    async def get_visible_orders_by_date_page(
+            self,
+            order_date: date,
+            viewer_role: UserRole,
+            viewer_id: int,
+            cursor: list | None = None,
+            offset: int = 0,
+            limit: int = 6,
+    ) -> KeysetPage[DeliveryOrderModel]:
+        """Страница видимых пользователю заказов за день, новые сначала"""
+        try:
+            return await fetch_keyset_page(
+                self.session,
+                self._orders_by_date_stmt(order_date, viewer_role, viewer_id)
+                .options(selectinload(DeliveryOrderModel.restaurant)),
+                sort_columns=(DeliveryOrderModel.created_at, DeliveryOrderModel.id),
+                cursor=cursor,
+                offset=offset,
+                limit=limit,
+                descending=True,
+            )
+
+        except Exception as e:
+            logger.error("Error getting orders page for date %s: %s", order_date, str(e))
+            raise
+
+    async def count_visible_orders_by_date(
+            self,
+            order_date: date,
+            viewer_role: UserRole,
+            viewer_id: int,
+    ) -> int:
+        try:
+            # Для ролей без ограничений счетчик общий
+            scope = viewer_id if viewer_role == UserRole.DELIVERY else "all"
+            key = f"orders:{order_date.isoformat()}:{scope}"
+            return await cached_count(
+                self.session, key, self._orders_by_date_stmt(order_date, viewer_role, viewer_id)
+            )
+
+        except Exception as e:
+            logger.error("Error counting orders for date %s: %s", order_date, str(e))
+            raise
+
     async def update_order_status(
             self,
             order_id: int,
@@ -106,6 +172,7 @@ class OrderRepository:
             )
             await self.session.execute(stmt)
             await self.session.commit()
+            await order_summary_cache.bump(order_id)
             logger.info("Successfully updated order status for order %s", order_id)
 
         except Exception as e:
@@ -114,7 +181,12 @@ class OrderRepository:
             raise
 
     async def get_order_with_carts(self, order_id: int) -> DeliveryOrderModel | None:
-        """Получить заказ вместе с корзинами и их содержимым"""
+        """
+        Получить заказ вместе с корзинами и их содержимым.
+
+        Только чтение: сумму заказа поддерживает триггер, для явного
+        пересчета есть recalculate_order_total.
+        """
         try:
             stmt = (
                 select(DeliveryOrderModel)
@@ -131,9 +203,6 @@ class OrderRepository:
             order = await self.session.scalar(stmt)
 
             if order:
-                await self.update_order_total_amount(order_id)
-                # Перезагружаем заказ с обновленной суммой
-                await self.session.refresh(order)
                 logger.info("Fetched order with carts by id: %s", order_id)
             else:
                 logger.info("Order not found by id: %s", order_id)
@@ -143,8 +212,92 @@ class OrderRepository:
             logger.error("Error getting order with carts by id %s: %s", order_id, str(e))
             raise
 
-    async def update_order_total_amount(self, order_id: int) -> float:
-        """Пересчитать и обновить общую сумму заказа на основе корзин"""
+    async def get_order_with_restaurant(self, order_id: int) -> DeliveryOrderModel | None:
+        """Получить заказ только с рестораном, без корзин"""
+        try:
+            stmt = (
+                select(DeliveryOrderModel)
+                .filter(DeliveryOrderModel.id == order_id)
+                .options(selectinload(DeliveryOrderModel.restaurant))
+            )
+            return await self.session.scalar(stmt)
+
+        except Exception as e:
+            logger.error("Error getting order with restaurant by id %s: %s", order_id, str(e))
+            raise
+
+    async def get_order_item_aggregates(self, order_id: int) -> list[Row]:
+        """
+        Сводка позиций заказа одним GROUP BY запросом.
+
+        Одна строка на блюдо: category_id, category_name, dish_id, dish_name,
+        price, total_amount, total_price, а также итоги категории
+        category_amount и category_price, посчитанные оконными суммами.
+        Строки отсортированы по display_order категории и названиям.
+        """
+        try:
+            total_amount = func.sum(CartItemModel.amount)
+            total_price = func.sum(CartItemModel.amount * CartItemModel.price_at_time)
+            stmt = (
+                select(
+                    CategoryModel.id.label("category_id"),
+                    CategoryModel.name.label("category_name"),
+                    DishModel.id.label("dish_id"),
+                    DishModel.name.label("dish_name"),
+                    func.max(CartItemModel.price_at_time).label("price"),
+                    total_amount.label("total_amount"),
+                    total_price.label("total_price"),
+                    func.sum(total_amount).over(partition_by=CategoryModel.id).label("category_amount"),
+                    func.sum(total_price).over(partition_by=CategoryModel.id).label("category_price"),
+                )
+                .select_from(CartItemModel)
+                .join(CartModel, CartModel.id == CartItemModel.cart_id)
+                .join(DishModel, DishModel.id == CartItemModel.dish_id)
+                .join(CategoryModel, CategoryModel.id == DishModel.category_id)
+                .filter(CartModel.delivery_order_id == order_id)
+                .group_by(CategoryModel.id, DishModel.id)
+                .order_by(CategoryModel.display_order, CategoryModel.name, DishModel.name)
+            )
+            result = await self.session.execute(stmt)
+            rows = list(result.all())
+            logger.info("Fetched %s item aggregates for order %s", len(rows), order_id)
+            return rows
+
+        except Exception as e:
+            logger.error("Error getting item aggregates for order %s: %s", order_id, str(e))
+            raise
+
+    async def repair_total_drift(self, tolerance: float = 0.005) -> list[int]:
+        """Найти заказы, сумма которых разошлась с корзинами ORDERED, исправить и вернуть их id"""
+        try:
+            expected = (
+                select(func.coalesce(func.sum(CartModel.total_price), 0))
+                .filter(CartModel.delivery_order_id == DeliveryOrderModel.id)
+                .filter(CartModel.status.in_([CartStatus.ORDERED]))
+                .scalar_subquery()
+            )
+            stmt = (
+                update(DeliveryOrderModel)
+                .where(func.abs(DeliveryOrderModel.total_amount - expected) > tolerance)
+                .values(total_amount=expected)
+                .returning(DeliveryOrderModel.id)
+            )
+            result = await self.session.execute(stmt)
+            order_ids = list(result.scalars().all())
+            await self.session.commit()
+            await order_summary_cache.bump(*order_ids)
+
+            if order_ids:
+                logger.warning("Repaired total_amount drift for orders: %s", order_ids)
+            return order_ids
+
+        except Exception as e:
+            await self.session.rollback()
+            logger.error("Error repairing order totals: %s", str(e))
+            raise
+
+    async def recalculate_order_total(self, order_id: int) -> float:
+        """Команда: пересчитать и сохранить общую сумму заказа на основе корзин"""
         try:
             # Получаем все корзины заказа с их суммами
             stmt = (
@@ -162,6 +315,7 @@ class OrderRepository:
             )
             await self.session.execute(update_stmt)
             await self.session.commit()
+            await order_summary_cache.bump(order_id)
 
             logger.info("Updated total amount for order %s: %.2f", order_id, total_sum)
             return total_sum
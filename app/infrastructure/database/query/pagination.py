@@ -0,0 +1,116 @@
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Generic, TypeVar
+
+from sqlalchemy import DateTime, Select, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.infrastructure.cache.invalidation import TTLCache, invalidation_bus
+
+T = TypeVar("T")
+
+COUNT_NAMESPACE = "counts"
+
+# Счетчики для индикаторов страниц. Репозитории сбрасывают их после коммита
+# изменений через invalidation_bus во всех процессах, TTL — страховка
+count_cache = TTLCache(maxsize=1024, ttl=30)
+
+
+def _on_counts_invalidated(key: str) -> None:
+    # Ключ, заканчивающийся на ":", сбрасывает все счетчики с этим префиксом
+    if key.endswith(":"):
+        count_cache.pop_prefix(key)
+    else:
+        count_cache.pop(key)
+
+
+invalidation_bus.subscribe(COUNT_NAMESPACE, _on_counts_invalidated)
+
+
+async def invalidate_counts(*keys: str) -> None:
+    """Сбросить счетчики во всех процессах: точные ключи или префиксы с ":" на конце"""
+    for key in keys:
+        await invalidation_bus.publish(COUNT_NAMESPACE, key)
+
+
+@dataclass(slots=True, frozen=True)
+class KeysetPage(Generic[T]):
+    """
+    Страница keyset-пагинации.
+
+    next_cursor — значения ключей сортировки последней строки страницы
+    (JSON-совместимые, их можно хранить в dialog_data), None на последней странице.
+    """
+    items: list[T]
+    next_cursor: list | None
+
+
+def _encode(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _decode(value: Any, column: InstrumentedAttribute) -> Any:
+    if isinstance(column.type, DateTime) and isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return value
+
+
+async def fetch_keyset_page(
+        session: AsyncSession,
+        stmt: Select,
+        sort_columns: Sequence[InstrumentedAttribute],
+        cursor: list | None,
+        limit: int,
+        offset: int = 0,
+        descending: bool = False,
+) -> KeysetPage:
+    """
+    Выполнить stmt как страницу WHERE (sort_key, id) > (...) LIMIT limit + 1.
+
+    Последняя колонка sort_columns должна быть уникальной (обычно id).
+    Без курсора используется offset — для первой страницы и для перехода
+    на страницу, курсор которой еще неизвестен.
+    """
+    if cursor is not None:
+        key = tuple_(*sort_columns)
+        values = tuple_(*(_decode(value, column) for value, column in zip(cursor, sort_columns)))
+        stmt = stmt.where(key < values if descending else key > values)
+    elif offset:
+        stmt = stmt.offset(offset)
+
+    stmt = stmt.order_by(
+        *(column.desc() if descending else column.asc() for column in sort_columns)
+    ).limit(limit + 1)
+
+    result = await session.scalars(stmt)
+    items = list(result.all())
+    if len(items) <= limit:
+        return KeysetPage(items=items, next_cursor=None)
+
+    items = items[:limit]
+    last = items[-1]
+    return KeysetPage(
+        items=items,
+        next_cursor=[_encode(getattr(last, column.key)) for column in sort_columns],
+    )
+
+
+async def cached_aggregate(key: str, loader: Callable[[], Awaitable[T]]) -> T:
+    """Агрегат для заголовка списка (счетчик, сумма) с кешированием на count_cache.ttl секунд"""
+    value = count_cache.get(key)
+    if value is None:
+        value = await loader()
+        count_cache.set(key, value)
+    return value
+
+
+async def cached_count(session: AsyncSession, key: str, stmt: Select) -> int:
+    """COUNT(*) по stmt для индикатора страниц"""
+    async def load() -> int:
+        return await session.scalar(
+            select(func.count()).select_from(stmt.order_by(None).subquery())
+        )
+
+    return await cached_aggregate(key, load)
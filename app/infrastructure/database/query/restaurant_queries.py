@@ -1,9 +1,13 @@
 import logging
 
-from sqlalchemy import select, update
+from sqlalchemy import and_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.infrastructure.cache.menu_cache import menu_cache
+from app.infrastructure.database.models.category import CategoryModel
+from app.infrastructure.database.models.dish import DishModel
 from app.infrastructure.database.models.restaurant import RestaurantModel
+from app.infrastructure.database.query.pagination import KeysetPage, cached_count, fetch_keyset_page, invalidate_counts
 
 logger = logging.getLogger(__name__)
 
@@ -43,6 +47,51 @@ class RestaurantRepository:
             logger.error("Error getting all active restaurants: %s", str(e))
             raise
 
+    async def get_active_menu_rows(self) -> list[tuple]:
+        """
+        Все активное меню одним запросом.
+
+        Строка: (restaurant_id, restaurant_name, category_id, category_name, dish_id, dish_name, dish_price),
+        поля категории и блюда равны None у ресторанов и категорий без активных потомков.
+        """
+        try:
+            stmt = (
+                select(
+                    RestaurantModel.id,
+                    RestaurantModel.name,
+                    CategoryModel.id,
+                    CategoryModel.name,
+                    DishModel.id,
+                    DishModel.name,
+                    DishModel.price,
+                )
+                .select_from(RestaurantModel)
+                .outerjoin(
+                    CategoryModel,
+                    and_(CategoryModel.restaurant_id == RestaurantModel.id, CategoryModel.is_active == True),
+                )
+                .outerjoin(
+                    DishModel,
+                    and_(DishModel.category_id == CategoryModel.id, DishModel.is_active == True),
+                )
+                .filter(RestaurantModel.is_active == True)
+                .order_by(
+                    RestaurantModel.name,
+                    CategoryModel.display_order,
+                    CategoryModel.id,
+                    DishModel.display_order,
+                    DishModel.id,
+                )
+            )
+            result = await self.session.execute(stmt)
+            rows = [tuple(row) for row in result.all()]
+            logger.info("Fetched active menu, rows: %s", len(rows))
+            return rows
+
+        except Exception as e:
+            logger.error("Error getting active menu: %s", str(e))
+            raise
+
     async def get_all_disabled_restaurants(self) -> list[RestaurantModel]:
         try:
             stmt = (
@@ -59,11 +108,44 @@ class RestaurantRepository:
             logger.error("Error getting all active restaurants: %s", str(e))
             raise
 
+    async def get_restaurants_page(
+            self,
+            is_active: bool,
+            cursor: list | None = None,
+            offset: int = 0,
+            limit: int = 6,
+    ) -> KeysetPage[RestaurantModel]:
+        """Страница активных или отключенных ресторанов по названию"""
+        try:
+            return await fetch_keyset_page(
+                self.session,
+                select(RestaurantModel).filter(RestaurantModel.is_active == is_active),
+                sort_columns=(RestaurantModel.name, RestaurantModel.id),
+                cursor=cursor,
+                offset=offset,
+                limit=limit,
+            )
+
+        except Exception as e:
+            logger.error("Error getting restaurants page (is_active=%s): %s", is_active, str(e))
+            raise
+
+    async def count_restaurants(self, is_active: bool) -> int:
+        try:
+            stmt = select(RestaurantModel).filter(RestaurantModel.is_active == is_active)
+            return await cached_count(self.session, f"restaurants:{is_active}", stmt)
+
+        except Exception as e:
+            logger.error("Error counting restaurants (is_active=%s): %s", is_active, str(e))
+            raise
+
     async def create_restaurant(self, name: str, is_active: bool = True) -> RestaurantModel:
         try:
             restaurant = RestaurantModel(name=name, is_active=is_active)
             self.session.add(restaurant)
             await self.session.commit()
+            await menu_cache.bump()
+            await invalidate_counts("restaurants:")
             logger.info("Created restaurant: %s", name)
             return restaurant
 
@@ -81,6 +163,8 @@ class RestaurantRepository:
             )
             await self.session.execute(stmt)
             await self.session.commit()
+            await menu_cache.bump()
+            await invalidate_counts("restaurants:")
             logger.info("Updated restaurant status: id=%s, status=%s", restaurant_id, is_active)
 
         except Exception as e:
@@ -97,6 +181,7 @@ class RestaurantRepository:
             )
             await self.session.execute(stmt)
             await self.session.commit()
+            await menu_cache.bump()
             logger.info("Updated restaurant name: id=%s, name=%s", restaurant_id, name)
 
         except Exception as e:
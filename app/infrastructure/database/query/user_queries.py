@@ -1,11 +1,13 @@
 import logging
 
-from sqlalchemy import select, update
+from sqlalchemy import Select, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 
+from app.infrastructure.cache.user_cache import user_cache
 from app.infrastructure.database.enums.payment_methods import PaymentMethod
 from app.infrastructure.database.models.user import UserModel, UserRole
+from app.infrastructure.database.query.pagination import KeysetPage, cached_count, fetch_keyset_page, invalidate_counts
 
 logger = logging.getLogger(__name__)
 
@@ -68,6 +70,8 @@ class UserRepository:
             user = result.scalar_one_or_none()
             logger.info("Created/Updated user with telegram id: %s", telegram_id)
             await self.session.commit()
+            await user_cache.invalidate(telegram_id)
+            await invalidate_counts("users:")
             return user
 
         except Exception as e:
@@ -88,6 +92,7 @@ class UserRepository:
             )
             await self.session.execute(stmt)
             await self.session.commit()
+            await user_cache.invalidate(telegram_id)
             logger.info("Updated coordinates for telegram id: %s", telegram_id)
         except Exception as e:
             await self.session.rollback()
@@ -107,6 +112,8 @@ class UserRepository:
             )
             await self.session.execute(stmt)
             await self.session.commit()
+            await user_cache.invalidate(telegram_id)
+            await invalidate_counts("users:")
             logger.info("Updated is_active status for telegram id: %s", telegram_id)
         except Exception as e:
             await self.session.rollback()
@@ -130,6 +137,7 @@ class UserRepository:
             )
             await self.session.execute(stmt)
             await self.session.commit()
+            await user_cache.invalidate(telegram_id)
             logger.info("Updated is_active status for telegram id: %s", telegram_id)
 
         except Exception as e:
@@ -194,6 +202,8 @@ class UserRepository:
             )
             await self.session.execute(stmt)
             await self.session.commit()
+            await user_cache.invalidate(telegram_id)
+            await invalidate_counts("users:")
             logger.info("Updated user role  for telegram id: %s", telegram_id)
 
         except Exception as e:
@@ -213,6 +223,8 @@ class UserRepository:
             )
             await self.session.execute(stmt)
             await self.session.commit()
+            await user_cache.invalidate(*telegram_ids)
+            await invalidate_counts("users:")
             logger.info("Updated user roles for telegram ids: %s", telegram_ids)
 
         except Exception as e:
@@ -253,3 +265,92 @@ class UserRepository:
         except Exception as e:
             logger.error("Error getting users: %s", str(e))
             raise
+
+    @staticmethod
+    def manageable_roles(viewer_role: UserRole) -> list[UserRole]:
+        """
+        Роли пользователей, которых видит и которым может назначать роль viewer_role:
+        SUPER_ADMIN — все, кроме UNKNOWN, ADMIN — до уровня DELIVERY, остальные — никого.
+        """
+        roles = [role for role in UserRole if role != UserRole.UNKNOWN]
+        if viewer_role == UserRole.SUPER_ADMIN:
+            return roles
+        if viewer_role == UserRole.ADMIN:
+            return [role for role in roles if role not in [UserRole.ADMIN, UserRole.SUPER_ADMIN]]
+        return []
+
+    @staticmethod
+    def _users_stmt(
+            roles: list[UserRole],
+            exclude_telegram_id: int | None = None,
+    ) -> Select:
+        # Покрывается частичным индексом ix_users_active_role_created
+        stmt = select(UserModel).where(
+            UserModel.role.in_(roles),
+            UserModel.is_active == True
+        )
+        if exclude_telegram_id is not None:
+            stmt = stmt.where(UserModel.telegram_id != exclude_telegram_id)
+        return stmt
+
+    async def get_users_page(
+            self,
+            roles: list[UserRole],
+            exclude_telegram_id: int | None = None,
+            cursor: list | None = None,
+            offset: int = 0,
+            limit: int = 10,
+    ) -> KeysetPage[UserModel]:
+        """Страница активных пользователей с указанными ролями в порядке регистрации"""
+        if not roles:
+            return KeysetPage(items=[], next_cursor=None)
+
+        try:
+            return await fetch_keyset_page(
+                self.session,
+                self._users_stmt(roles, exclude_telegram_id),
+                sort_columns=(UserModel.created_at, UserModel.id),
+                cursor=cursor,
+                offset=offset,
+                limit=limit,
+            )
+
+        except Exception as e:
+            logger.error("Error getting users page for roles %s: %s", roles, str(e))
+            raise
+
+    async def count_users(
+            self,
+            roles: list[UserRole],
+            exclude_telegram_id: int | None = None,
+    ) -> int:
+        if not roles:
+            return 0
+
+        try:
+            key = f"users:{','.join(sorted(role.name for role in roles))}:{exclude_telegram_id}"
+            return await cached_count(self.session, key, self._users_stmt(roles, exclude_telegram_id))
+
+        except Exception as e:
+            logger.error("Error counting users for roles %s: %s", roles, str(e))
+            raise
+
+    async def get_manageable_users_page(
+            self,
+            viewer_role: UserRole,
+            viewer_telegram_id: int,
+            cursor: list | None = None,
+            offset: int = 0,
+            limit: int = 10,
+    ) -> KeysetPage[UserModel]:
+        """Страница пользователей, роль которых может изменить viewer (без него самого)"""
+        return await self.get_users_page(
+            self.manageable_roles(viewer_role),
+            exclude_telegram_id=viewer_telegram_id,
+            cursor=cursor,
+            offset=offset,
+            limit=limit,
+        )
+
+    async def count_manageable_users(self, viewer_role: UserRole, viewer_telegram_id: int) -> int:
+        return await self.count_users(self.manageable_roles(viewer_role), exclude_telegram_id=viewer_telegram_id)
@@ -0,0 +1,3 @@
+from .broadcaster import Broadcaster, DeliveryResult, TokenBucket
+
+__all__ = ["Broadcaster", "DeliveryResult", "TokenBucket"]
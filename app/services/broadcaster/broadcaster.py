@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import time
+from collections.abc import Coroutine, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter, TelegramBadRequest
+
+logger = logging.getLogger(__name__)
+
+# Лимит Telegram на рассылку от одного бота
+TELEGRAM_MESSAGES_PER_SECOND = 30
+
+
+class TokenBucket:
+    """
+    Общий на процесс token bucket.
+
+    Каждая отправка забирает один токен. TelegramRetryAfter ставит на паузу
+    весь bucket, а не одну корутину, чтобы остальные отправки не получили
+    тот же flood control.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float) -> None:
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+@dataclass(slots=True, frozen=True)
+class DeliveryResult:
+    chat_id: int
+    ok: bool
+    error: str | None = None
+
+
+class Broadcaster:
+    """Рассылка сообщений с ограниченной конкурентностью под общим лимитом скорости"""
+
+    def __init__(
+            self,
+            rate: float = TELEGRAM_MESSAGES_PER_SECOND,
+            concurrency: int = 10,
+            max_retries: int = 3,
+    ):
+        self.bucket = TokenBucket(rate)
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self._background_tasks: set[asyncio.Task] = set()
+
+    async def send_message(self, bot: Bot, chat_id: int, text: str, **kwargs: Any) -> DeliveryResult:
+        for _ in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            try:
+                await bot.send_message(chat_id=chat_id, text=text, **kwargs)
+                return DeliveryResult(chat_id=chat_id, ok=True)
+
+            except TelegramRetryAfter as e:
+                logger.warning("Rate limit exceeded. Pausing broadcaster for %s seconds", e.retry_after)
+                self.bucket.pause(e.retry_after)
+
+            except TelegramForbiddenError:
+                logger.warning("User %s blocked the bot", chat_id)
+                return DeliveryResult(chat_id=chat_id, ok=False, error="forbidden")
+
+            except TelegramBadRequest as e:
+                logger.warning("Bad request for %s: %s", chat_id, e.message)
+                return DeliveryResult(chat_id=chat_id, ok=False, error=e.message)
+
+            except Exception as e:
+                logger.error("Failed to send message to %s: %s", chat_id, str(e))
+                return DeliveryResult(chat_id=chat_id, ok=False, error=str(e))
+
+        return DeliveryResult(chat_id=chat_id, ok=False, error="retry_after")
+
+    async def broadcast(
+            self,
+            bot: Bot,
+            chat_ids: Iterable[int],
+            text: str,
+            **kwargs: Any,
+    ) -> list[DeliveryResult]:
+        """Отправляет сообщение всем получателям и возвращает результат по каждому"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def send(chat_id: int) -> DeliveryResult:
+            async with semaphore:
+                return await self.send_message(bot, chat_id, text, **kwargs)
+
+        results = await asyncio.gather(*(send(chat_id) for chat_id in chat_ids))
+
+        success_count = sum(result.ok for result in results)
+        logger.info("Broadcast finished: %s successful, %s failed", success_count, len(results) - success_count)
+        return list(results)
+
+    def schedule(self, coro: Coroutine[Any, Any, Any]) -> asyncio.Task:
+        """Запускает рассылку в фоне, не блокируя обработчик апдейта"""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._on_task_done)
+        return task
+
+    def _on_task_done(self, task: asyncio.Task) -> None:
+        self._background_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Background broadcast failed: %s", str(task.exception()))
+
+    async def wait_closed(self) -> None:
+        """Дожидается фоновых рассылок перед остановкой"""
+        if self._background_tasks:
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
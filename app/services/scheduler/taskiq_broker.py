@@ -0,0 +1,52 @@
+import logging
+
+from aiogram import Bot
+from aiogram.client.default import DefaultBotProperties
+from taskiq import TaskiqEvents, TaskiqScheduler, TaskiqState
+from taskiq.schedule_sources import LabelScheduleSource
+from taskiq_nats import PullBasedJetStreamBroker
+from taskiq_redis import RedisAsyncResultBackend
+
+from app.services.broadcaster import Broadcaster
+from config.config import get_config
+
+logger = logging.getLogger(__name__)
+
+config = get_config()
+
+# Результаты задач (счетчики доставки) храним сутки
+RESULT_TTL_SECONDS = 24 * 60 * 60
+
+broker = PullBasedJetStreamBroker(
+    servers=config.nats.servers,
+    subject=config.nats.subject,
+    stream_name=config.nats.stream_name,
+    durable="order_bot_workers",
+).with_result_backend(
+    RedisAsyncResultBackend(
+        redis_url=config.redis.redis_url,
+        result_ex_time=RESULT_TTL_SECONDS,
+    )
+)
+
+scheduler = TaskiqScheduler(
+    broker=broker,
+    sources=[LabelScheduleSource(broker)],
+)
+
+
+@broker.on_event(TaskiqEvents.WORKER_STARTUP)
+async def on_worker_startup(state: TaskiqState) -> None:
+    logging.basicConfig(
+        level=logging.getLevelName(config.logs.level_name), format=config.logs.format
+    )
+    state.bot = Bot(token=config.bot.token, default=DefaultBotProperties(parse_mode=config.bot.parse_mode))
+    state.broadcaster = Broadcaster()
+    logger.info("Taskiq worker started")
+
+
+@broker.on_event(TaskiqEvents.WORKER_SHUTDOWN)
+async def on_worker_shutdown(state: TaskiqState) -> None:
+    await state.broadcaster.wait_closed()
+    await state.bot.session.close()
+    logger.info("Taskiq worker stopped")
@@ -0,0 +1,103 @@
+import logging
+from typing import Annotated, Any
+
+from aiogram.types import InlineKeyboardMarkup
+from taskiq import Context, TaskiqDepends
+
+from app.infrastructure.database.db import async_session_maker
+from app.infrastructure.database.query.cart_queries import CartRepository
+from app.infrastructure.database.query.order_queries import OrderRepository
+from app.infrastructure.database.query.user_queries import UserRepository
+from app.services.broadcaster import Broadcaster, DeliveryResult
+from app.services.scheduler.taskiq_broker import broker
+
+logger = logging.getLogger(__name__)
+
+
+def _delivery_counts(results: list[DeliveryResult]) -> dict[str, int]:
+    sent = sum(result.ok for result in results)
+    return {"sent": sent, "failed": len(results) - sent}
+
+
+async def _broadcast_to_active_users(
+        context: Context,
+        text: str,
+        exclude_telegram_id: int | None,
+        **kwargs: Any,
+) -> dict[str, int]:
+    async with async_session_maker() as session:
+        users = await UserRepository(session).get_active_users_except(
+            exclude_telegram_id=exclude_telegram_id
+        )
+
+    broadcaster: Broadcaster = context.state.broadcaster
+    results = await broadcaster.broadcast(
+        context.state.bot,
+        [user.telegram_id for user in users],
+        text,
+        **kwargs,
+    )
+    return _delivery_counts(results)
+
+
+@broker.task(task_name="broadcast_new_order")
+async def broadcast_new_order(
+        order_id: int,
+        text: str,
+        exclude_telegram_id: int | None = None,
+        context: Annotated[Context, TaskiqDepends()] = None,
+) -> dict[str, int]:
+    """Рассылка о новой заявке всем активным пользователям"""
+    counts = await _broadcast_to_active_users(context, text, exclude_telegram_id)
+    logger.info("Order #%s notifications: %s sent, %s failed", order_id, counts["sent"], counts["failed"])
+    return counts
+
+
+@broker.task(task_name="broadcast_status_change")
+async def broadcast_status_change(
+        order_id: int,
+        text: str,
+        exclude_telegram_id: int | None = None,
+        context: Annotated[Context, TaskiqDepends()] = None,
+) -> dict[str, int]:
+    """Рассылка о смене статуса заявки всем активным пользователям"""
+    counts = await _broadcast_to_active_users(context, text, exclude_telegram_id)
+    logger.info("Order #%s status notifications: %s sent, %s failed", order_id, counts["sent"], counts["failed"])
+    return counts
+
+
+@broker.task(task_name="notify_admins_about_new_user")
+async def notify_admins_about_new_user(
+        text: str,
+        reply_markup: dict[str, Any],
+        context: Annotated[Context, TaskiqDepends()] = None,
+) -> dict[str, int]:
+    """Уведомление администраторов о новом пользователе с кнопками авторизации"""
+    async with async_session_maker() as session:
+        admins = await UserRepository(session).get_active_admins()
+
+    broadcaster: Broadcaster = context.state.broadcaster
+    results = await broadcaster.broadcast(
+        context.state.bot,
+        [admin.telegram_id for admin in admins],
+        text,
+        reply_markup=InlineKeyboardMarkup.model_validate(reply_markup),
+    )
+    counts = _delivery_counts(results)
+    logger.info("New user notifications: %s sent, %s failed", counts["sent"], counts["failed"])
+    return counts
+
+
+@broker.task(task_name="verify_totals", schedule=[{"cron": "*/30 * * * *"}])
+async def verify_totals() -> dict[str, list[int]]:
+    """Сверка сумм корзин и заказов, которые поддерживают триггеры, с полным пересчетом"""
+    async with async_session_maker() as session:
+        # Сначала корзины: их исправление через триггер само поправит суммы заказов
+        cart_ids = await CartRepository(session).repair_total_drift()
+        order_ids = await OrderRepository(session).repair_total_drift()
+
+    if cart_ids or order_ids:
+        logger.warning("Totals drift repaired: carts %s, orders %s", cart_ids, order_ids)
+    else:
+        logger.info("No totals drift detected")
+    return {"carts": cart_ids, "orders": order_ids}
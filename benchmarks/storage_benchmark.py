@@ -0,0 +1,111 @@
+"""
+Сравнение FastRedisStorage со штатным RedisStorage aiogram.
+
+Для каждого хранилища прогоняется цикл, который aiogram и aiogram_dialog
+выполняют на одно сообщение внутри диалога: get_state, чтение стека
+и контекста, запись контекста и стека. Нужен запущенный Redis:
+
+    python -m benchmarks.storage_benchmark --redis-url redis://localhost:6379/15
+
+Ключи пишутся с префиксом bench_fsm и удаляются после прогона.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Any
+
+from aiogram.fsm.storage.base import BaseStorage, DefaultKeyBuilder, StorageKey
+from aiogram.fsm.storage.redis import RedisStorage
+from redis.asyncio import Redis
+
+from app.infrastructure.cache.redis_storage import FastRedisStorage
+
+BOT_ID = 1
+PREFIX = "bench_fsm"
+
+
+def dialog_context(dishes: int) -> dict[str, Any]:
+    """Контекст окна заказа с заполненным MultiSelectCounter"""
+    return {
+        "intent_id": "aBcDeFgH",
+        "stack_id": "",
+        "state": "OrderSG:select_dishes",
+        "start_data": {"restaurant_id": 7, "category_id": 12},
+        "dialog_data": {
+            "restaurant_name": "Столовая №1",
+            "dish_names": {str(i): f"Блюдо дня номер {i}" for i in range(dishes)},
+            "dish_prices": {str(i): 150.0 + i for i in range(dishes)},
+        },
+        "widget_data": {
+            "multi_counter": ",".join(f"{i}:{i % 3}" for i in range(dishes)),
+            "dishes_scroll": 2,
+        },
+    }
+
+
+def dialog_stack() -> dict[str, Any]:
+    return {"_id": "", "intents": ["aBcDeFgH"], "last_message_id": 1234, "last_reply_keyboard": False,
+            "last_media_id": None, "last_media_unique_id": None, "last_income_media_group_id": None}
+
+
+async def one_update(storage: BaseStorage, user_id: int, context: dict[str, Any], stack: dict[str, Any]) -> None:
+    key = StorageKey(bot_id=BOT_ID, chat_id=user_id, user_id=user_id)
+    stack_key = StorageKey(bot_id=BOT_ID, chat_id=user_id, user_id=user_id, destiny="aiogd:stack:")
+    context_key = StorageKey(bot_id=BOT_ID, chat_id=user_id, user_id=user_id, destiny="aiogd:context:aBcDeFgH")
+
+    await storage.get_state(key)
+    await storage.get_data(stack_key)
+    await storage.get_data(context_key)
+    await storage.set_data(context_key, context)
+    await storage.set_data(stack_key, stack)
+
+
+async def run(name: str, storage: BaseStorage, updates: int, users: int, dishes: int) -> None:
+    context, stack = dialog_context(dishes), dialog_stack()
+    for user_id in range(users):
+        await one_update(storage, user_id, context, stack)
+
+    timings = []
+    for number in range(updates):
+        started = time.perf_counter()
+        # Апдейты выполняются в отдельных задачах, как в диспетчере
+        await asyncio.create_task(one_update(storage, number % users, context, stack))
+        timings.append((time.perf_counter() - started) * 1000)
+
+    key = DefaultKeyBuilder(prefix=PREFIX, with_destiny=True).build(
+        StorageKey(bot_id=BOT_ID, chat_id=0, user_id=0, destiny="aiogd:context:aBcDeFgH"), "data"
+    )
+    size = await storage.redis.strlen(key)
+    print(
+        f"{name:<18} avg {statistics.mean(timings):6.3f} ms  "
+        f"p95 {statistics.quantiles(timings, n=20)[-1]:6.3f} ms  "
+        f"context {size} B"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--redis-url", default="redis://localhost:6379/15")
+    parser.add_argument("--updates", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--dishes", type=int, default=60, help="Число блюд в dialog_data")
+    args = parser.parse_args()
+
+    redis = Redis.from_url(args.redis_url)
+    key_builder = DefaultKeyBuilder(prefix=PREFIX, with_destiny=True)
+    storages = {
+        "RedisStorage": RedisStorage(redis=redis, key_builder=key_builder),
+        "FastRedisStorage": FastRedisStorage(redis=redis, key_builder=key_builder, data_ttl=600, state_ttl=600),
+    }
+    try:
+        for name, storage in storages.items():
+            await run(name, storage, args.updates, args.users, args.dishes)
+            async for key in redis.scan_iter(f"{PREFIX}:*"):
+                await redis.delete(key)
+    finally:
+        await redis.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from aiogram.enums import ParseMode
 from dynaconf import Dynaconf
 from pydantic import BaseModel, Field
@@ -23,6 +25,24 @@ class BotConfig(BaseModel):
     parse_mode: ParseMode = Field(
         ..., description="Default parse mode for sending messages (e.g. HTML, Markdown)."
     )
+    run_mode: Literal["polling", "webhook"] = Field(
+        default="polling", description="How updates are received: long polling or webhook."
+    )
+    workers: int = Field(
+        default=1, ge=1, description="Number of worker processes; more than one enables supervisor mode."
+    )
+
+
+class WebhookConfig(BaseModel):
+    base_url: str | None = Field(None, description="Public HTTPS URL of the bot (without path).")
+    path: str = Field(default="/webhook", description="Path the webhook handler is mounted on.")
+    secret_token: str | None = Field(None, description="Secret checked in X-Telegram-Bot-Api-Secret-Token.")
+    host: str = Field(default="0.0.0.0", description="Interface the webhook server listens on.")
+    port: int = Field(default=8080, description="Port the webhook server listens on.")
+
+    @property
+    def url(self) -> str:
+        return f"{self.base_url.rstrip('/')}{self.path}"
 
 
 class PostgresConfig(BaseModel):
@@ -43,6 +63,22 @@ class RedisConfig(BaseModel):
     redis_url: str | None = Field(None, description="Redis server URL.")
 
 
+class StorageConfig(BaseModel):
+    state_ttl: int | None = Field(None, description="TTL of FSM states in seconds (None keeps them forever).")
+    data_ttl: int | None = Field(
+        None, description="TTL of FSM data and dialog contexts in seconds (None keeps them forever)."
+    )
+    compress_threshold: int = Field(
+        default=1024, ge=0, description="Compress FSM data larger than this many bytes (0 disables compression)."
+    )
+
+
+class NatsConfig(BaseModel):
+    servers: list[str] = Field(default=["nats://localhost:4222"], description="NATS server URLs.")
+    stream_name: str = Field(default="order_bot_tasks", description="JetStream stream used by taskiq.")
+    subject: str = Field(default="order_bot.tasks", description="Subject taskiq publishes tasks to.")
+
+
 class AdminConfig(BaseModel):
     admin_id: int = Field(..., description="Admin telegram id.")
     admin_chat_id: int = Field(..., description="Admin telegram chatID.")
@@ -52,8 +88,11 @@ class AppConfig(BaseModel):
     logs: LogsConfig
     i18n: I18nConfig
     bot: BotConfig
+    webhook: WebhookConfig
     postgres: PostgresConfig
     redis: RedisConfig
+    storage: StorageConfig
+    nats: NatsConfig
     admin: AdminConfig
 
 
@@ -67,6 +106,13 @@ _settings = Dynaconf(
 )
 
 
+def _optional_ttl(value: int | str | None) -> int | None:
+    """REDIS_TTL_* из окружения: число секунд или None/пусто — хранить бессрочно"""
+    if value is None or str(value).strip().lower() in ("", "none"):
+        return None
+    return int(value)
+
+
 def get_config() -> AppConfig:
     """
         Returns a typed application configuration.
@@ -85,6 +131,15 @@ def get_config() -> AppConfig:
     bot = BotConfig(
         token=_settings.bot_token,
         parse_mode=_settings.bot.parse_mode,
+        run_mode=_settings.bot.get("run_mode", "polling"),
+        workers=_settings.bot.get("workers", 1),
+    )
+    webhook = WebhookConfig(
+        base_url=_settings.get("webhook_base_url"),
+        secret_token=_settings.get("webhook_secret"),
+        path=_settings.get("webhook", {}).get("path", "/webhook"),
+        host=_settings.get("webhook", {}).get("host", "0.0.0.0"),
+        port=_settings.get("webhook", {}).get("port", 8080),
     )
     postgres = PostgresConfig(
         name=_settings.postgres_name,
@@ -103,6 +158,16 @@ def get_config() -> AppConfig:
         password=_settings.redis_password,
         redis_url=f"redis://{_settings.redis_username}:{_settings.redis_password}@{_settings.redis_host}:{_settings.redis_port}/{_settings.redis_database}"
     )
+    storage = StorageConfig(
+        state_ttl=_optional_ttl(_settings.get("redis_ttl_state")),
+        data_ttl=_optional_ttl(_settings.get("redis_ttl_data")),
+        compress_threshold=_settings.get("storage", {}).get("compress_threshold", 1024),
+    )
+    nats = NatsConfig(
+        servers=_settings.get("nats_servers", "nats://localhost:4222").split(","),
+        stream_name=_settings.get("nats", {}).get("stream_name", "order_bot_tasks"),
+        subject=_settings.get("nats", {}).get("subject", "order_bot.tasks"),
+    )
     admin = AdminConfig(
         admin_id=_settings.admin_id,
         admin_chat_id=_settings.admin_chat,
@@ -112,7 +177,10 @@ def get_config() -> AppConfig:
         logs=logs,
         i18n=i18n,
         bot=bot,
+        webhook=webhook,
         postgres=postgres,
         redis=redis,
+        storage=storage,
+        nats=nats,
         admin=admin,
     )
@@ -4,6 +4,7 @@ import os
 import sys
 
 from app.bot import main
+from app.bot.workers import run_supervisor
 from config.config import get_config
 
 config = get_config()
@@ -15,4 +16,9 @@ logging.basicConfig(
 if sys.platform.startswith("win") or os.name == "nt":
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
-asyncio.run(main())
+if __name__ == "__main__":
+    if config.bot.workers > 1:
+        run_supervisor(config)
+    else:
+        asyncio.run(main())
+
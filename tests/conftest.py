@@ -0,0 +1,23 @@
+import os
+
+# Модули бота читают конфиг при импорте (app.infrastructure.database.db),
+# поэтому для тестов задаются заглушечные настройки. Подключений при импорте нет.
+_TEST_SETTINGS = {
+    "ENV_FOR_DYNACONF": "development",
+    "BOT_TOKEN": "42:TEST",
+    "ADMIN_ID": "1",
+    "ADMIN_CHAT": "1",
+    "POSTGRES_NAME": "postgres",
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_PORT": "5432",
+    "POSTGRES_USER": "postgres",
+    "POSTGRES_PASSWORD": "postgres",
+    "REDIS_DATABASE": "0",
+    "REDIS_HOST": "localhost",
+    "REDIS_PORT": "6379",
+    "REDIS_USERNAME": "default",
+    "REDIS_PASSWORD": "default",
+}
+
+for _name, _value in _TEST_SETTINGS.items():
+    os.environ.setdefault(_name, _value)
@@ -0,0 +1,109 @@
+"""
+Записи в корзину сбрасывают сводку своего заказа без запроса после коммита.
+
+id заказа корзины приходит в RETURNING или в уже выполняемом SELECT, после
+коммита в базу за ним не ходят. Нужна база после `alembic upgrade head`
+в TEST_POSTGRES_DSN, без нее тесты пропускаются. Все выполняется
+в транзакции, которая откатывается.
+"""
+import asyncio
+import os
+from collections.abc import Awaitable, Callable
+
+import pytest
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.infrastructure.cache.order_summary_cache import order_summary_cache
+from app.infrastructure.database.models.cart import CartItemModel, CartModel
+from app.infrastructure.database.models.category import CategoryModel
+from app.infrastructure.database.models.delivery_order import DeliveryOrderModel
+from app.infrastructure.database.models.dish import DishModel
+from app.infrastructure.database.models.restaurant import RestaurantModel
+from app.infrastructure.database.models.user import UserModel
+from app.infrastructure.database.query.cart_queries import CartItemRepository, CartRepository
+
+POSTGRES_DSN = os.environ.get("TEST_POSTGRES_DSN")
+
+pytestmark = pytest.mark.skipif(not POSTGRES_DSN, reason="TEST_POSTGRES_DSN is not set")
+
+CART_WRITES: dict[str, Callable[[AsyncSession, dict[str, int]], Awaitable]] = {
+    "update_cart_total_price": lambda session, ids: CartRepository(session).update_cart_total_price(ids["cart"]),
+    "update_item_amount": lambda session, ids: CartItemRepository(session).update_item_amount(
+        ids["cart"], ids["dish"], 3
+    ),
+    "add_or_update_cart_item": lambda session, ids: CartItemRepository(session).add_or_update_cart_item(
+        ids["cart"], ids["new_dish"], 2, 150
+    ),
+    "bulk_upsert_items": lambda session, ids: CartItemRepository(session).bulk_upsert_items(
+        ids["cart"], {ids["dish"]: 4, ids["new_dish"]: 1}
+    ),
+    "remove_cart_item": lambda session, ids: CartItemRepository(session).remove_cart_item(ids["cart"], ids["dish"]),
+}
+
+
+async def insert_row(session: AsyncSession, model, **values) -> int:
+    return await session.scalar(insert(model).values(**values).returning(model.id))
+
+
+async def run_cart_write(write: Callable[[AsyncSession, dict[str, int]], Awaitable]) -> tuple[list, list[str], int]:
+    """Выполнить запись в корзину заказа; вернуть сброшенные заказы, SQL после коммита и id заказа"""
+    engine = create_async_engine(POSTGRES_DSN)
+    bumped = []
+    after_commit: list[str] = []
+    committed = False
+
+    def capture(conn, cursor, statement, parameters, context, executemany) -> None:
+        nonlocal committed
+        if statement.startswith("RELEASE SAVEPOINT"):
+            committed = True
+        elif committed:
+            after_commit.append(statement)
+
+    async def record_bump(*order_ids) -> None:
+        bumped.extend(order_ids)
+
+    try:
+        async with engine.connect() as conn:
+            transaction = await conn.begin()
+            session = AsyncSession(bind=conn, join_transaction_mode="create_savepoint")
+
+            user_id = await insert_row(session, UserModel, telegram_id=987654321)
+            restaurant_id = await insert_row(session, RestaurantModel, name="Test restaurant for cart writes")
+            category_id = await insert_row(session, CategoryModel, name="Супы", restaurant_id=restaurant_id)
+            ids = {
+                "dish": await insert_row(session, DishModel, name="Борщ", price=250, category_id=category_id),
+                "new_dish": await insert_row(session, DishModel, name="Щи", price=150, category_id=category_id),
+                "order": await insert_row(
+                    session, DeliveryOrderModel,
+                    restaurant_id=restaurant_id, creator_id=user_id, delivery_person_id=user_id,
+                ),
+            }
+            ids["cart"] = await insert_row(
+                session, CartModel, user_id=user_id, restaurant_id=restaurant_id, delivery_order_id=ids["order"],
+            )
+            await session.execute(
+                insert(CartItemModel).values(cart_id=ids["cart"], dish_id=ids["dish"], amount=1, price_at_time=250)
+            )
+
+            original_bump = order_summary_cache.bump
+            order_summary_cache.bump = record_bump
+            event.listen(engine.sync_engine, "before_cursor_execute", capture)
+            try:
+                await write(session, ids)
+            finally:
+                event.remove(engine.sync_engine, "before_cursor_execute", capture)
+                order_summary_cache.bump = original_bump
+
+            await transaction.rollback()
+            return bumped, after_commit, ids["order"]
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.parametrize("name", CART_WRITES)
+def test_cart_write_bumps_its_order_without_select_after_commit(name):
+    bumped, after_commit, order_id = asyncio.run(run_cart_write(CART_WRITES[name]))
+
+    assert bumped == [order_id]
+    assert not [statement for statement in after_commit if "delivery_order_id" in statement], after_commit
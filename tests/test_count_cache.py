@@ -0,0 +1,37 @@
+"""
+Сброс счетчиков страниц через invalidation_bus.
+
+Шина не запущена, поэтому публикация сразу вызывает локальный обработчик,
+как это делает обработчик сообщения из Redis в каждом процессе.
+"""
+import asyncio
+
+import pytest
+
+from app.infrastructure.database.query.pagination import count_cache, invalidate_counts
+
+
+@pytest.fixture(autouse=True)
+def counts():
+    count_cache.clear()
+    for key in ("dishes:1", "dishes:10", "orders:2026-10-17:all", "orders:2026-10-17:5", "users:ADMIN:None"):
+        count_cache.set(key, 1)
+    yield
+    count_cache.clear()
+
+
+def cached_keys() -> set[str]:
+    return {key for key in ("dishes:1", "dishes:10", "orders:2026-10-17:all", "orders:2026-10-17:5",
+                            "users:ADMIN:None") if count_cache.get(key) is not None}
+
+
+def test_exact_key_drops_only_that_count():
+    asyncio.run(invalidate_counts("dishes:1"))
+
+    assert cached_keys() == {"dishes:10", "orders:2026-10-17:all", "orders:2026-10-17:5", "users:ADMIN:None"}
+
+
+def test_prefix_drops_every_matching_count():
+    asyncio.run(invalidate_counts("orders:", "users:"))
+
+    assert cached_keys() == {"dishes:1", "dishes:10"}
@@ -0,0 +1,100 @@
+"""
+Склейка нажатий ➕/➖ в режиме воркеров.
+
+Нажатия одного чата приходят, пока его блокировку держит другой апдейт:
+они должны склеиться в один feed_update и получить ответ сразу, а диалог
+не должен отвечать на первое нажатие второй раз.
+"""
+import asyncio
+from datetime import datetime
+
+from aiogram import Bot
+from aiogram.methods import AnswerCallbackQuery
+from aiogram.types import CallbackQuery, Chat, Message, Update, User
+
+from app.bot.dialogs.utils.message_manager import message_manager
+from app.bot.dialogs.widgets.MultiSelectCounter import COUNTER_DELTAS_KEY
+from app.bot.middlewares.counter_clicks import CounterClickCoalescer
+from app.bot.workers import ChatLocks, _process_update, get_shard_key
+
+CHAT_ID = 100
+
+
+class RecordingBot(Bot):
+    def __init__(self):
+        super().__init__("42:TEST")
+        self.calls: list = []
+
+    async def __call__(self, method, request_timeout=None):
+        self.calls.append(method)
+        return True
+
+
+class RecordingDispatcher:
+    def __init__(self):
+        self.fed: list[tuple[Update, dict]] = []
+
+    async def feed_update(self, bot: Bot, update: Update, **kwargs) -> None:
+        self.fed.append((update, kwargs))
+
+
+def counter_click(bot: Bot, update_id: int, action: str, item_id: str) -> Update:
+    user = User(id=CHAT_ID, is_bot=False, first_name="User")
+    chat = Chat(id=CHAT_ID, type="private")
+    update = Update(
+        update_id=update_id,
+        callback_query=CallbackQuery(
+            id=str(update_id),
+            from_user=user,
+            chat_instance="chat",
+            data=f"multi_counter:{action}:{item_id}",
+            message=Message(message_id=1, date=datetime(2026, 1, 1), chat=chat, from_user=user, text="menu"),
+        ),
+    )
+    # Как в воркере: апдейт из очереди привязывается к боту при валидации
+    return Update.model_validate(update.model_dump(exclude_unset=True), context={"bot": bot})
+
+
+def test_counter_clicks_coalesce_before_chat_lock():
+    bot = RecordingBot()
+    dp = RecordingDispatcher()
+    chat_locks = ChatLocks()
+    counter_clicks = CounterClickCoalescer(window=0.05)
+    clicks = [
+        counter_click(bot, 1, "plus", "5"),
+        counter_click(bot, 2, "plus", "5"),
+        counter_click(bot, 3, "minus", "6"),
+        counter_click(bot, 4, "plus", "5"),
+    ]
+
+    async def scenario() -> int:
+        busy = asyncio.Event()
+
+        async def hold_chat_lock() -> None:
+            busy.set()
+            await asyncio.sleep(0.2)
+
+        # Чат занят другим апдейтом дольше окна склейки
+        holder = asyncio.create_task(chat_locks.run(get_shard_key(clicks[0]), hold_chat_lock()))
+        await busy.wait()
+        tasks = [
+            asyncio.create_task(_process_update(dp, bot, update, chat_locks, counter_clicks))
+            for update in clicks
+        ]
+        await asyncio.sleep(0.01)
+        answered_during_lock = len(bot.calls)
+        await asyncio.gather(holder, *tasks)
+        return answered_during_lock
+
+    answered_during_lock = asyncio.run(scenario())
+
+    assert answered_during_lock == len(clicks)
+    assert all(isinstance(call, AnswerCallbackQuery) for call in bot.calls)
+    assert len(dp.fed) == 1
+    update, kwargs = dp.fed[0]
+    assert update.update_id == 1
+    assert kwargs[COUNTER_DELTAS_KEY] == {"5": 3, "6": -1}
+
+    # Диалог после обработки отвечает на первое нажатие, но оно уже отвечено
+    asyncio.run(message_manager.answer_callback(bot, update.callback_query))
+    assert len(bot.calls) == len(clicks)
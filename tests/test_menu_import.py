@@ -0,0 +1,28 @@
+import io
+
+import pytest
+
+from app.bot.utils.menu_import import MAX_PRICE, MenuFileError, parse_menu_file
+
+
+def menu_json(price: str) -> io.BytesIO:
+    raw = '{"restaurant": "R", "categories": [{"name": "C", "dishes": [{"name": "D", "price": %s}]}]}' % price
+    return io.BytesIO(raw.encode())
+
+
+@pytest.mark.parametrize("price", ["NaN", "Infinity", "-Infinity", "1e400", "0", "-5", str(MAX_PRICE * 10)])
+def test_json_menu_rejects_invalid_prices(price):
+    with pytest.raises(MenuFileError):
+        parse_menu_file("menu.json", menu_json(price))
+
+
+@pytest.mark.parametrize("price", ["1" + "9" * 400, "0", str(MAX_PRICE + 1)])
+def test_csv_menu_rejects_invalid_prices(price):
+    raw = f"restaurant,category,dish,price\nR,C,D,{price}\n".encode()
+    with pytest.raises(MenuFileError):
+        parse_menu_file("menu.csv", io.BytesIO(raw))
+
+
+def test_json_menu_accepts_regular_price():
+    menu = parse_menu_file("menu.json", menu_json("150.5"))
+    assert menu.categories[0].dishes[0].price == 150.5
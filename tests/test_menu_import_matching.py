@@ -0,0 +1,135 @@
+"""
+Сопоставление одноименных категорий и блюд при импорте меню.
+
+Удаленные блюда и категории остаются в таблице с is_active = false, поэтому
+после "удалить и добавить заново" строк с одним названием две. Импорт должен
+сопоставлять живую строку, а не удаленную с меньшим id.
+
+Нужна база после `alembic upgrade head` в TEST_POSTGRES_DSN, без нее тесты
+пропускаются. Все выполняется в транзакции, которая откатывается.
+"""
+import asyncio
+import os
+from collections.abc import Awaitable, Callable
+
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.infrastructure.database.models.category import CategoryModel
+from app.infrastructure.database.models.dish import DishModel
+from app.infrastructure.database.models.restaurant import RestaurantModel
+from app.infrastructure.database.query.menu_import_queries import (
+    CategorySpec,
+    DishSpec,
+    MenuImportRepository,
+    MenuSpec,
+)
+
+POSTGRES_DSN = os.environ.get("TEST_POSTGRES_DSN")
+
+pytestmark = pytest.mark.skipif(not POSTGRES_DSN, reason="TEST_POSTGRES_DSN is not set")
+
+RESTAURANT = "Test restaurant for menu import"
+CATEGORY = "Супы"
+DISH = "Борщ"
+
+
+async def insert_row(session: AsyncSession, model, **values) -> int:
+    return await session.scalar(insert(model).values(**values).returning(model.id))
+
+
+async def in_rolled_back_session(scenario: Callable[[AsyncSession, dict[str, int]], Awaitable[None]]) -> None:
+    """
+    Меню с удаленными и живыми одноименными категорией и блюдом.
+
+    Коммиты репозитория закрывают только savepoint, внешняя транзакция откатывается.
+    """
+    engine = create_async_engine(POSTGRES_DSN)
+    try:
+        async with engine.connect() as conn:
+            transaction = await conn.begin()
+            session = AsyncSession(bind=conn, join_transaction_mode="create_savepoint")
+
+            restaurant_id = await insert_row(session, RestaurantModel, name=RESTAURANT, is_active=True)
+            ids = {
+                "old_category": await insert_row(
+                    session, CategoryModel, name=CATEGORY, restaurant_id=restaurant_id,
+                    display_order=0, is_active=False,
+                ),
+                "live_category": await insert_row(
+                    session, CategoryModel, name=CATEGORY, restaurant_id=restaurant_id,
+                    display_order=0, is_active=True,
+                ),
+            }
+            ids["old_dish"] = await insert_row(
+                session, DishModel, name=DISH, price=250, display_order=0,
+                is_active=False, category_id=ids["live_category"],
+            )
+            ids["live_dish"] = await insert_row(
+                session, DishModel, name=DISH, price=250, display_order=1,
+                is_active=True, category_id=ids["live_category"],
+            )
+
+            await scenario(session, ids)
+            await transaction.rollback()
+    finally:
+        await engine.dispose()
+
+
+async def active_ids(session: AsyncSession, model, name: str) -> list[int]:
+    return list(await session.scalars(
+        select(model.id).where(model.name == name, model.is_active).order_by(model.id)
+    ))
+
+
+def test_import_matches_live_rows_over_deleted_ones():
+    async def scenario(session: AsyncSession, ids: dict[str, int]) -> None:
+        menu = MenuSpec(
+            restaurant=RESTAURANT,
+            categories=(CategorySpec(name=CATEGORY, display_order=0, dishes=(DishSpec(name=DISH, price=300),)),),
+        )
+
+        report = await MenuImportRepository(session).import_menu(menu)
+
+        assert await active_ids(session, CategoryModel, CATEGORY) == [ids["live_category"]]
+        assert await active_ids(session, DishModel, DISH) == [ids["live_dish"]]
+        assert report.dishes_updated == [(CATEGORY, DISH, 250, 300)]
+        assert not report.dishes_added
+
+    asyncio.run(in_rolled_back_session(scenario))
+
+
+def test_category_price_sync_keeps_live_dish_active():
+    async def scenario(session: AsyncSession, ids: dict[str, int]) -> None:
+        report = await MenuImportRepository(session).sync_category_prices(
+            ids["live_category"], (DishSpec(name=DISH, price=300),)
+        )
+
+        assert await active_ids(session, DishModel, DISH) == [ids["live_dish"]]
+        assert report.dishes_updated == [(CATEGORY, DISH, 250, 300)]
+        assert not report.dishes_deactivated
+
+    asyncio.run(in_rolled_back_session(scenario))
+
+
+def test_restaurant_sync_keeps_live_rows_and_their_duplicates():
+    async def scenario(session: AsyncSession, ids: dict[str, int]) -> None:
+        # Второе живое блюдо с тем же названием тоже есть в прайсе и не снимается
+        duplicate_id = await insert_row(
+            session, DishModel, name=DISH, price=300, display_order=2,
+            is_active=True, category_id=ids["live_category"],
+        )
+        menu = MenuSpec(
+            restaurant=RESTAURANT,
+            categories=(CategorySpec(name=CATEGORY, display_order=0, dishes=(DishSpec(name=DISH, price=300),)),),
+        )
+
+        report = await MenuImportRepository(session).import_menu(menu, deactivate_missing=True)
+
+        assert await active_ids(session, CategoryModel, CATEGORY) == [ids["live_category"]]
+        assert await active_ids(session, DishModel, DISH) == [ids["live_dish"], duplicate_id]
+        assert not report.categories_deactivated
+        assert not report.dishes_deactivated
+
+    asyncio.run(in_rolled_back_session(scenario))
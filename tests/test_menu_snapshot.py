@@ -0,0 +1,44 @@
+"""
+Снимок меню при недоступном Redis: уже загруженный снимок отдается дальше.
+"""
+import asyncio
+
+import pytest
+
+from app.infrastructure.cache.menu_cache import menu_cache
+from app.infrastructure.cache.menu_snapshot import MenuSnapshot, MenuSnapshotHolder
+
+ROWS = [(1, "Ресторан", 10, "Супы", 100, "Борщ", 250.0)]
+
+
+class FailingRedis:
+    def __init__(self):
+        self.calls = 0
+
+    async def get(self, key: str):
+        self.calls += 1
+        raise TimeoutError("Timeout reading from redis")
+
+
+@pytest.fixture
+def failing_redis(monkeypatch) -> FailingRedis:
+    redis = FailingRedis()
+    monkeypatch.setattr(menu_cache, "redis", redis)
+    monkeypatch.setattr(menu_cache, "_version", 3)
+    monkeypatch.setattr(menu_cache, "_version_checked_at", 0.0)
+    return redis
+
+
+def test_held_snapshot_is_served_when_redis_fails(failing_redis):
+    holder = MenuSnapshotHolder()
+    holder._snapshot = MenuSnapshot.from_rows(3, ROWS)
+
+    async def scenario() -> list[MenuSnapshot]:
+        return [await holder.get(), await holder.get()]
+
+    snapshots = asyncio.run(scenario())
+
+    assert all(snapshot is holder._snapshot for snapshot in snapshots)
+    assert snapshots[0].dishes_of(10)[0].name == "Борщ"
+    # После ошибки версия не перечитывается до следующей проверки
+    assert failing_redis.calls == 1
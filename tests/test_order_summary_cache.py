@@ -0,0 +1,115 @@
+"""
+Версии ключей сводок заказа и владение сессией общей задачи рендера.
+
+Redis заменен словарем в памяти, пул сессий — счетчиком.
+"""
+import asyncio
+
+from app.infrastructure.cache.menu_cache import MENU_VERSION_KEY
+from app.infrastructure.cache.order_summary_cache import OrderSummaryCache
+
+ORDER_ID = 7
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values: dict[str, object] = {}
+
+    async def get(self, key: str):
+        return self.values.get(key)
+
+    async def mget(self, *keys: str) -> list:
+        return [self.values.get(key) for key in keys]
+
+    async def set(self, key: str, value, nx: bool = False, ex: int | None = None) -> bool:
+        if nx and key in self.values:
+            return False
+        self.values[key] = value
+        return True
+
+    async def delete(self, key: str) -> None:
+        self.values.pop(key, None)
+
+    async def exists(self, key: str) -> bool:
+        return key in self.values
+
+    async def incr(self, key: str) -> int:
+        self.values[key] = int(self.values.get(key, 0)) + 1
+        return self.values[key]
+
+
+class FakeSession:
+    def __init__(self, name: str):
+        self.name = name
+        self.closed = False
+
+    async def __aenter__(self) -> "FakeSession":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.closed = True
+
+
+class CountingSessionPool:
+    def __init__(self):
+        self.sessions: list[FakeSession] = []
+
+    def __call__(self) -> FakeSession:
+        session = FakeSession(f"cache-{len(self.sessions)}")
+        self.sessions.append(session)
+        return session
+
+
+def make_cache() -> tuple[OrderSummaryCache, FakeRedis, CountingSessionPool]:
+    cache = OrderSummaryCache(poll_interval=0.01)
+    redis, session_pool = FakeRedis(), CountingSessionPool()
+    cache.setup(redis, session_pool)
+    return cache, redis, session_pool
+
+
+def test_menu_version_bump_renders_summary_again():
+    cache, redis, _ = make_cache()
+    dish_names = iter(["Борщ", "Суп"])
+
+    async def render(session) -> list[str]:
+        return [next(dish_names)]
+
+    async def scenario() -> list[list[str]]:
+        first = await cache.get_or_render("carts", ORDER_ID, FakeSession("update"), render)
+        cached = await cache.get_or_render("carts", ORDER_ID, FakeSession("update"), render)
+        await redis.incr(MENU_VERSION_KEY)
+        renamed = await cache.get_or_render("carts", ORDER_ID, FakeSession("update"), render)
+        return [first, cached, renamed]
+
+    assert asyncio.run(scenario()) == [["Борщ"], ["Борщ"], ["Суп"]]
+
+
+def test_shared_render_survives_cancelled_leader():
+    cache, _, session_pool = make_cache()
+    started = asyncio.Event()
+    release = asyncio.Event()
+    used_sessions = []
+
+    async def render(session) -> list[str]:
+        used_sessions.append(session)
+        started.set()
+        await release.wait()
+        assert not session.closed
+        return [f"rendered in {session.name}"]
+
+    async def scenario() -> list[str]:
+        leader_session = FakeSession("leader")
+        leader = asyncio.create_task(cache.get_or_render("carts", ORDER_ID, leader_session, render))
+        await started.wait()
+        follower = asyncio.create_task(cache.get_or_render("carts", ORDER_ID, FakeSession("follower"), render))
+        await asyncio.sleep(0)
+
+        # Апдейт лидера отменен, его сессия закрыта middleware
+        leader.cancel()
+        leader_session.closed = True
+        release.set()
+        return await follower
+
+    assert asyncio.run(scenario()) == ["rendered in cache-0"]
+    assert used_sessions == [session_pool.sessions[0]]
+    assert session_pool.sessions[0].closed
@@ -0,0 +1,198 @@
+"""
+Одна сессия и одна загрузка пользователя на апдейт.
+
+Апдейт проходит цепочки update, errors и aiogd_update с теми же middleware,
+что регистрирует setup_dispatcher. Пул сессий и репозиторий пользователей
+заменены счетчиками, поэтому Postgres и Redis не нужны.
+"""
+import asyncio
+from datetime import datetime
+
+import pytest
+from aiogram import Bot, Dispatcher
+from aiogram.dispatcher.event.telegram import TelegramEventObserver
+from aiogram.types import Chat, Message, Update, User
+from aiogram_dialog.api.entities import DIALOG_EVENT_NAME, DialogAction, DialogUpdate, DialogUpdateEvent
+
+from app.bot.middlewares import get_user
+from app.bot.middlewares.database import DbSessionMiddleware
+from app.bot.middlewares.get_user import GetUserMiddleware
+from app.bot.middlewares.i18n import TranslatorRunnerMiddleware
+from app.bot.middlewares.shadow_ban import ShadowBanMiddleware
+from app.infrastructure.database.enums.user_roles import UserRole
+
+TELEGRAM_ID = 100
+
+
+class FakeSession:
+    def __init__(self, pool: "CountingSessionPool"):
+        self.pool = pool
+
+    async def execute(self, statement):
+        self.pool.queries += 1
+
+    async def close(self) -> None:
+        self.pool.closed += 1
+
+
+class CountingSessionPool:
+    """Вместо async_sessionmaker: считает открытые сессии и запросы"""
+
+    def __init__(self):
+        self.opened = 0
+        self.closed = 0
+        self.queries = 0
+
+    def __call__(self) -> FakeSession:
+        self.opened += 1
+        return FakeSession(self)
+
+
+class FakeUser:
+    id = 1
+    telegram_id = TELEGRAM_ID
+    username = "user"
+    first_name = "User"
+    last_name = None
+    language_code = "ru"
+    role = UserRole.MEMBER
+    is_active = True
+    phone_number = None
+    preferred_bank = None
+    created_at = datetime(2026, 1, 1)
+
+
+class CountingUserRepository:
+    loads = 0
+
+    def __init__(self, session):
+        self.session = session
+
+    async def get_user_by_telegram_id(self, telegram_id: int) -> FakeUser:
+        type(self).loads += 1
+        await self.session.execute("SELECT users")
+        return FakeUser()
+
+
+class MissingUserCache:
+    """Кеш пользователей всегда промахивается, чтобы каждая загрузка шла в репозиторий"""
+
+    async def get(self, telegram_id: int) -> None:
+        return None
+
+    async def set(self, snapshot) -> None:
+        pass
+
+
+class CountingTranslatorHub:
+    def __init__(self):
+        self.resolved = 0
+
+    def get_translator_by_locale(self, locale: str) -> str:
+        self.resolved += 1
+        return f"translator:{locale}"
+
+
+@pytest.fixture
+def session_pool(monkeypatch) -> CountingSessionPool:
+    monkeypatch.setattr(get_user, "UserRepository", CountingUserRepository)
+    monkeypatch.setattr(get_user, "user_cache", MissingUserCache())
+    CountingUserRepository.loads = 0
+    return CountingSessionPool()
+
+
+def build_dispatcher(session_pool: CountingSessionPool, seen: list) -> Dispatcher:
+    """Диспетчер с middleware в том же порядке, что в setup_dispatcher"""
+    dp = Dispatcher(translator_hub=CountingTranslatorHub())
+    dp.observers[DIALOG_EVENT_NAME] = TelegramEventObserver(router=dp, event_name=DIALOG_EVENT_NAME)
+
+    for register in (
+            dp.update.outer_middleware,
+            dp.errors.middleware,
+            dp.observers[DIALOG_EVENT_NAME].outer_middleware,
+    ):
+        register(DbSessionMiddleware(session_pool))
+        register(GetUserMiddleware())
+        register(ShadowBanMiddleware())
+        register(TranslatorRunnerMiddleware())
+
+    @dp.message()
+    async def failing_handler(message: Message, session, user_row, i18n) -> None:
+        await session.execute("SELECT cart")
+        seen.append(("message", session, user_row, i18n))
+        raise RuntimeError("handler failed")
+
+    @dp.errors()
+    async def error_handler(event, session, user_row, i18n) -> bool:
+        await session.execute("SELECT order")
+        seen.append(("error", session, user_row, i18n))
+        return True
+
+    @dp.observers[DIALOG_EVENT_NAME]()
+    async def dialog_handler(event, session, user_row, i18n) -> None:
+        await session.execute("SELECT dialog")
+        seen.append(("dialog", session, user_row, i18n))
+
+    return dp
+
+
+def user() -> User:
+    return User(id=TELEGRAM_ID, is_bot=False, first_name="User", language_code="ru")
+
+
+def chat() -> Chat:
+    return Chat(id=TELEGRAM_ID, type="private")
+
+
+def assert_shared(seen: list, expected_chains: list[str]) -> None:
+    assert [chain for chain, *_ in seen] == expected_chains
+    _, session, user_row, i18n = seen[0]
+    for _, other_session, other_user_row, other_i18n in seen[1:]:
+        assert other_session is session
+        assert other_user_row is user_row
+        assert other_i18n is i18n
+    assert user_row.telegram_id == TELEGRAM_ID
+
+
+def test_update_and_errors_chains_share_session_and_user(session_pool):
+    seen = []
+    dp = build_dispatcher(session_pool, seen)
+    update = Update(
+        update_id=1,
+        message=Message(message_id=1, date=datetime(2026, 1, 1), chat=chat(), from_user=user(), text="hi"),
+    )
+
+    asyncio.run(dp.feed_update(Bot("42:TEST"), update))
+
+    assert_shared(seen, ["message", "error"])
+    assert session_pool.opened == 1
+    assert session_pool.closed >= 1
+    assert session_pool.queries == 3
+    assert CountingUserRepository.loads == 1
+    assert dp["translator_hub"].resolved == 1
+
+
+def test_dialog_update_chain_shares_session_and_user(session_pool):
+    seen = []
+    dp = build_dispatcher(session_pool, seen)
+    update = DialogUpdate(aiogd_update=DialogUpdateEvent(
+        from_user=user(), chat=chat(), action=DialogAction.UPDATE, data={},
+        intent_id=None, stack_id=None, thread_id=None, business_connection_id=None,
+    ))
+
+    # Так фоновые апдейты диалогов отправляет Updater из aiogram_dialog
+    asyncio.run(dp.propagate_event(
+        update_type="update",
+        event=update,
+        bot=Bot("42:TEST"),
+        event_from_user=update.event.from_user,
+        event_chat=update.event.chat,
+        event_thread_id=None,
+        **dp.workflow_data,
+    ))
+
+    assert_shared(seen, ["dialog"])
+    assert session_pool.opened == 1
+    assert session_pool.queries == 2
+    assert CountingUserRepository.loads == 1
+    assert dp["translator_hub"].resolved == 1
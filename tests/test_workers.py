@@ -0,0 +1,87 @@
+"""
+Перезапуск упавших воркеров супервизором.
+
+Процессы заменены объектами, которые сообщают, живы ли они, поэтому
+настоящие процессы не запускаются.
+"""
+import asyncio
+
+import pytest
+
+from app.bot import workers
+
+
+class FakeProcess:
+    def __init__(self, target, args, name):
+        self.index, self.queue = args
+        self.name = name
+        self.alive = False
+        self.exitcode = None
+
+    def start(self) -> None:
+        self.alive = True
+
+    def is_alive(self) -> bool:
+        return self.alive
+
+    def join(self) -> None:
+        pass
+
+    def crash(self) -> None:
+        self.alive = False
+        self.exitcode = 1
+
+
+class FakeContext:
+    def __init__(self):
+        self.started: list[FakeProcess] = []
+
+    def Process(self, target, args, name) -> FakeProcess:
+        process = FakeProcess(target, args, name)
+        self.started.append(process)
+        return process
+
+
+def start_workers(context: FakeContext, count: int) -> tuple[list[FakeProcess], list[str]]:
+    queues = [f"queue-{index}" for index in range(count)]
+    return [workers._start_worker(context, index, queue) for index, queue in enumerate(queues)], queues
+
+
+def test_crashed_worker_is_restarted_on_its_queue():
+    context = FakeContext()
+    processes, queues = start_workers(context, 2)
+    crashed = processes[1]
+    crashed.crash()
+
+    async def scenario() -> None:
+        watcher = asyncio.create_task(workers._watch_workers(context, processes, queues, interval=0))
+        await asyncio.sleep(0.01)
+        watcher.cancel()
+
+    asyncio.run(scenario())
+
+    assert processes[1] is not crashed
+    assert processes[1].is_alive()
+    assert (processes[1].index, processes[1].queue) == (1, "queue-1")
+    assert len(context.started) == 3
+
+
+def test_supervisor_stops_when_worker_keeps_crashing(monkeypatch):
+    monkeypatch.setattr(workers, "WORKER_MAX_RESTARTS", 2)
+    context = FakeContext()
+    processes, queues = start_workers(context, 1)
+
+    async def scenario() -> None:
+        async def crash_forever() -> None:
+            while True:
+                processes[0].crash()
+                await asyncio.sleep(0)
+
+        crasher = asyncio.create_task(crash_forever())
+        try:
+            await workers._watch_workers(context, processes, queues, interval=0)
+        finally:
+            crasher.cancel()
+
+    with pytest.raises(RuntimeError, match="Worker 0 exited 3 times"):
+        asyncio.run(scenario())